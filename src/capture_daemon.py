@@ -0,0 +1,38 @@
+import logging as log
+import optparse as cl  # cl = command line.
+import signal
+import threading as thr
+
+import pyvr
+
+log.basicConfig(filename="pyvr-capture.log",
+                filemode="w",
+                format="%(asctime)s %(filename)15.15s %(funcName)15.15s %(levelname)5.5s %(lineno)4.4s %(message)s",
+                datefmt="%Y%m%d %H%M%S"
+                )
+log.getLogger().setLevel(log.DEBUG)
+
+
+def main() -> None:
+    parser = cl.OptionParser(usage="python capture_daemon.py [options]")
+    parser.add_option("-c", "--config",
+                      dest="config",
+                      default="pyvr.ini",
+                      help="Configuration file describing the capture devices (default pyvr.ini)."
+                      )
+    options, _ = parser.parse_args()
+    pyvr.load_config(options.config)
+
+    # RUN UNTIL TERMINATED (kill or ctrl-c)
+    stop_requested = thr.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_requested.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_requested.set())
+
+    with pyvr.CaptureDaemon():
+        print("Capturing.  Attach with Source=Shared in [VIDEO] and Library=Shared in [AUDIO].  Ctrl-C to stop.")
+        while not stop_requested.wait(1):
+            pass
+
+
+if "__main__" == __name__:
+    main()
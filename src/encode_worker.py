@@ -0,0 +1,69 @@
+import logging as log
+import optparse as cl  # cl = command line.
+import os
+import signal
+import threading as thr
+
+import pyvr
+
+log.basicConfig(filename="pyvr-encode.log",
+                filemode="a",
+                format="%(asctime)s %(filename)15.15s %(funcName)15.15s %(levelname)5.5s %(lineno)4.4s %(message)s",
+                datefmt="%Y%m%d %H%M%S"
+                )
+log.getLogger().setLevel(log.DEBUG)
+
+
+def main() -> None:
+    parser = cl.OptionParser(usage="python encode_worker.py [options]")
+    parser.add_option("-c", "--config",
+                      dest="config",
+                      default="pyvr.ini",
+                      help="Configuration file with the [ENCODE] settings (default pyvr.ini)."
+                      )
+    parser.add_option("-j", "--jobs",
+                      dest="jobs",
+                      type="int",
+                      help="Number of recordings encoded at the same time (default QueueWorkers in pyvr.ini)."
+                      )
+    parser.add_option("-n", "--nice",
+                      dest="nice",
+                      type="int",
+                      help="Niceness added to the worker and its encodes (default QueueNice in pyvr.ini)."
+                      )
+    parser.add_option("--once",
+                      dest="once",
+                      default=False,
+                      action="store_true",
+                      help="Encode the recordings already queued (retrying any that fail), then exit."
+                      )
+    options, _ = parser.parse_args()
+    pyvr.load_config(options.config)
+    encode_config = pyvr.load_encode_config()
+
+    jobs = options.jobs if options.jobs is not None else int(encode_config[pyvr.EncodeCfg.QUEUE_WORKERS])
+    nice = options.nice if options.nice is not None else int(encode_config[pyvr.EncodeCfg.QUEUE_NICE])
+    os.nice(nice)
+
+    queue = pyvr.EncodeQueue(encode_config[pyvr.EncodeCfg.QUEUE_FILE])
+    worker = pyvr.EncodeWorker(queue, jobs, int(encode_config[pyvr.EncodeCfg.QUEUE_RETRIES]), options.once)
+    if options.once:
+        worker.start()
+        worker.wait()
+        print(f"Queue: {queue.counts()}")
+        return
+
+    # RUN UNTIL TERMINATED (kill or ctrl-c).  ENCODES ALREADY RUNNING ARE FINISHED FIRST.
+    stop_requested = thr.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_requested.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_requested.set())
+
+    with worker:
+        print(f"Encoding queued recordings ({jobs} at a time).  Ctrl-C to stop.")
+        while not stop_requested.wait(1):
+            pass
+        print("Finishing the encodes in progress ...")
+
+
+if "__main__" == __name__:
+    main()
@@ -20,7 +20,6 @@ def main() -> None:
                         # Save some cpu for other people. Sleep and only show an occasional update.
                         time.sleep(0.25)
                     ap.processing = False
-                    ai.new_audio_sample = False
 
 
 if "__main__" == __name__:
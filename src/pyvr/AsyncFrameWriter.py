@@ -0,0 +1,190 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">AsyncFrameWriter</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Callable
+
+import logging as log
+import numpy as np
+import queue
+import threading as thr
+import time
+
+from .FrameRing import FrameRing
+from .Telemetry import shared_telemetry
+
+
+class AsyncFrameWriter:
+    """
+    Writes video frames on a thread of its own so that a slow encode or a disk stall does
+    not delay the thread pacing the recording.  :py:meth:`write` only adds the frame to a
+    bounded queue.  The video-writer-thread takes the frames off the queue in batches and
+    hands them to the real writer (a cv2.VideoWriter) in order.
+
+    Frames from the :py:class:`FrameRing<pyvr.FrameRing.FrameRing>` are not copied.  They
+    are acquired from the ring (so the capture thread cannot overwrite them) until they
+    have been written.  Frames from anywhere else, or from a ring that cannot hold frames
+    (a :py:class:`SharedFrameRing<pyvr.SharedFrameRing.SharedFrameRing>`), are copied.
+
+    Each file gets its own AsyncFrameWriter, so while the last frames of one segment are
+    written (and the file is closed) the next segment is already being written by another
+    thread.  A queue of 0 frames writes on the caller's thread, as if there were no queue.
+    """
+    def __init__(self,
+                 writer,
+                 name: str,
+                 max_frames: int = 30,
+                 batch_frames: int = 4,
+                 ring: FrameRing | None = None
+                 ) -> None:
+        """
+        :about: AsyncFrameWriter constructor.  The video-writer-thread is started at once.
+        :param writer: the object that encodes the frames (it needs write and release methods)
+        :param name: name of the file being written (used when logging)
+        :param max_frames: most frames waiting to be written before :py:meth:`write` waits.
+                           0 to write on the caller's thread.
+        :param batch_frames: most frames written each time the writer thread wakes up
+        :param ring: the frame ring the frames come from (so they can be held instead of copied
+                     when the ring allows it)
+        """
+        self.writer = writer
+        self.name: str = name
+        self.max_frames: int = max(0, max_frames)
+        self.batch_frames: int = max(1, batch_frames)
+        self.ring: FrameRing | None = ring
+        self.on_closed: Callable[[], None] | None = None
+
+        # STATISTICS
+        self.frames_written: int = 0
+        self.high_water: int = 0
+        self.waits: int = 0
+        self.errors: int = 0
+        self.close_failed: bool = False
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.frames: queue.Queue = queue.Queue(maxsize=self.max_frames)
+        self.write_thread: thr.Thread | None = None
+        if self.max_frames > 0:
+            # THE QUEUE, A BATCH BEING WRITTEN AND A FRAME WAITING FOR ROOM CAN ALL BE HELD AT ONCE.
+            if self.ring is not None and self.ring.can_hold:
+                self.ring.reserve_spares(self.max_frames + self.batch_frames + 1)
+            self.write_thread = thr.Thread(name="video-writer-thread", target=self.write_frames)
+            self.write_thread.start()
+
+    def write(self, frame: np.ndarray, seq: int | None = None) -> None:
+        """
+        :about: Queue a frame to be written.  Waits only if the queue is full.
+        :param frame: the frame
+        :param seq: sequence number of the frame in the ring (None if it is not from the ring)
+        """
+        if self.write_thread is None:
+            self.write_frame(frame)
+            return
+
+        # A FRAME IS ONLY HELD IF THE RING PROMISES NOT TO OVERWRITE IT UNTIL IT IS RELEASED.
+        can_hold = self.ring is not None and self.ring.can_hold and seq is not None and seq >= 0
+        held = self.ring.acquire(seq) if can_hold else None
+        if held is None or held.image.shape != frame.shape:
+            if held is not None:
+                self.ring.release(seq)
+            held, frame = None, frame.copy()
+
+        item = (frame, held.seq if held is not None else None, time.monotonic())
+        try:
+            self.frames.put_nowait(item)
+        except queue.Full:
+            # THE WRITER IS FURTHER BEHIND THAN THE QUEUE CAN ABSORB.  WAIT FOR IT.
+            self.waits += 1
+            shared_telemetry().count("writer_queue_full", stage="video_writer")
+            self.frames.put(item)
+
+        depth = self.frames.qsize()
+        if depth > self.high_water:
+            self.high_water = depth
+            shared_telemetry().set_gauge("writer_queue_high_water", depth, stage="video_writer")
+
+    def write_frames(self) -> None:
+        """
+        :about: Code executed by the video-writer-thread.  Write the queued frames (several at
+                a time) until the writer is released.
+        """
+        log.info(f"video-writer-thread has started ({self.name}).")
+        telemetry = shared_telemetry()
+        while True:
+            batch = [self.frames.get()]
+            while len(batch) < self.batch_frames:
+                try:
+                    batch.append(self.frames.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is None:
+                    self.close()
+                    return
+
+                frame, seq, queued_at = item
+                telemetry.observe("writer_queue_wait", 1000 * (time.monotonic() - queued_at), stage="video_writer")
+                self.write_frame(frame)
+                if seq is not None:
+                    self.ring.release(seq)
+
+            telemetry.set_gauge("writer_queue_depth", self.frames.qsize(), stage="video_writer")
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        """
+        :about: Hand one frame to the real writer.  A frame that cannot be written is logged
+                and skipped so the rest of the recording is kept.
+        """
+        started = time.monotonic()
+        try:
+            self.writer.write(frame)
+            self.frames_written += 1
+        except Exception as err:
+            self.errors += 1
+            shared_telemetry().count("writer_errors", stage="video_writer")
+            if self.errors == 1:
+                log.error(f"Unable to write a frame to {self.name}.")
+                log.exception(err)
+        shared_telemetry().observe("frame_write", 1000 * (time.monotonic() - started), stage="video_writer")
+
+    def close(self) -> None:
+        """
+        :about: Close the real writer (finishing the file) and report that it is closed.  The
+                report is made even if closing fails, so whoever waits on it is not stuck.
+                The failure is logged and counted in *errors* (and *close_failed* is set).
+        """
+        try:
+            self.writer.release()
+        except Exception as err:
+            self.errors += 1
+            self.close_failed = True
+            shared_telemetry().count("writer_errors", stage="video_writer")
+            log.error(f"Unable to close {self.name}.  The file may be incomplete.")
+            log.exception(err)
+        finally:
+            log.info(f"Wrote {self.frames_written} frames to {self.name}.  (queue high water {self.high_water} frames, "
+                     f"waited on a full queue {self.waits} times)")
+            if self.on_closed is not None:
+                self.on_closed()
+
+    def release(self, wait: bool = True, on_closed: Callable[[], None] | None = None) -> None:
+        """
+        :about: Write the frames still queued, then close the file.
+        :param wait: TRUE to return once the file is closed.  FALSE to return at once.
+        :param on_closed: called (on the writer thread) once the file is closed
+        """
+        self.on_closed = on_closed
+        if self.write_thread is None:
+            self.close()
+            return
+
+        self.frames.put(None)
+        if wait:
+            self.write_thread.join()
@@ -0,0 +1,145 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">AudioChannel</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import deque, namedtuple
+
+import logging as log
+import threading as thr
+
+AudioChunk = namedtuple("AudioChunk", "timestamp data")
+"""
+**Named tuple** holding a chunk of captured audio.  *timestamp* is the
+:py:class:`MediaClock<pyvr.MediaClock.MediaClock>` time the last sample in the chunk was
+captured and *data* is the raw audio.
+"""
+
+
+class AudioChannel:
+    """
+    A bounded, blocking hand-off of audio chunks from the audio-capture-thread to the
+    thread that records or plays them.  Neither side polls.  The consumer sleeps until a
+    chunk arrives.  If the consumer falls behind and the channel fills up, the event is
+    counted as an overflow and either:
+
+    - the producer waits for room (*wait_when_full*).  Only suitable when nothing is lost
+      while the producer waits (e.g. generated audio).
+    - the oldest chunk is discarded to make room.  A producer reading from a device must
+      never wait, or the device's own buffer overruns and the audio is lost there instead.
+      The channel is sized so this never happens (see *QueueSecs* in pyvr.ini).  When it
+      does, audio is lost and each time is logged as a warning.
+
+    During a pre-roll (before anyone consumes the audio) the channel keeps a rolling window
+    of the most recent chunks instead.  The producer never waits and the oldest chunk is
+    discarded to make room.
+    """
+    def __init__(self, capacity: int, wait_when_full: bool = True) -> None:
+        """
+        :about: AudioChannel constructor
+        :param capacity: maximum number of chunks held before the channel is full.
+        :param wait_when_full: TRUE for the producer to wait for room.  FALSE to discard the
+                               oldest chunk instead.
+        """
+        assert capacity >= 1
+
+        self.capacity: int = capacity
+        self.chunks: deque = deque()
+        self.changed: thr.Condition = thr.Condition()
+        self.closed: bool = False
+        self.window: int | None = None
+        self.wait_when_full: bool = wait_when_full
+
+        # STATISTICS
+        self.chunks_in: int = 0
+        self.overflows: int = 0
+        self.chunks_dropped: int = 0
+        self.high_water: int = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def put(self, chunk: bytes, timestamp: float) -> bool:
+        """
+        :about: Add a chunk of audio to the channel.  If the channel is full either wait for
+                room or discard the oldest chunk (see *wait_when_full*).
+        :param chunk: the audio data
+        :param timestamp: clock time the last sample of the chunk was captured
+        :returns: TRUE if the chunk was accepted, FALSE if the channel was closed.
+        """
+        with self.changed:
+            while self.window is not None and len(self.chunks) >= max(1, self.window):
+                self.chunks.popleft()
+
+            if len(self.chunks) >= self.capacity and not self.closed:
+                self.overflows += 1
+                if self.wait_when_full:
+                    log.warning(f"Audio channel full ({self.capacity} chunks). Capture is waiting on the consumer.")
+                    self.changed.wait_for(lambda: len(self.chunks) < self.capacity or self.closed)
+                else:
+                    # THE DEVICE CANNOT WAIT.  LOSE THE OLDEST AUDIO HERE, WHERE IT IS COUNTED.
+                    while len(self.chunks) >= self.capacity:
+                        self.chunks.popleft()
+                        self.chunks_dropped += 1
+                    log.warning(f"Audio channel full ({self.capacity} chunks). The consumer has stalled.  "
+                                f"Discarded the oldest audio ({self.chunks_dropped} chunks lost so far).")
+
+            if self.closed:
+                return False
+
+            self.chunks.append(AudioChunk(timestamp, chunk))
+            self.chunks_in += 1
+            self.high_water = max(self.high_water, len(self.chunks))
+            self.changed.notify_all()
+            return True
+
+    def get(self, timeout: float | None = None) -> AudioChunk | None:
+        """
+        :about: Remove the oldest chunk of audio from the channel, waiting for one if needed.
+                Chunks still queued when the channel is closed are returned before None.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the audio data or None if nothing arrived in time.
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: len(self.chunks) > 0 or self.closed, timeout)
+            if len(self.chunks) == 0:
+                return None
+
+            chunk = self.chunks.popleft()
+            self.changed.notify_all()
+            return chunk
+
+    def start_pre_roll(self, window: int) -> None:
+        """
+        :about: Keep only the most recent audio until :py:meth:`end_pre_roll` is called.
+        :param window: number of chunks to keep (the newest chunk is always kept)
+        """
+        with self.changed:
+            self.window = window
+
+    def end_pre_roll(self, keep: bool) -> None:
+        """
+        :about: Stop discarding old audio.  The consumer is about to start.
+        :param keep: TRUE to deliver the audio kept during the pre-roll.  FALSE to discard it.
+        """
+        with self.changed:
+            self.window = None
+            if not keep:
+                self.chunks.clear()
+            self.changed.notify_all()
+
+    def close(self) -> None:
+        """
+        :about: Stop accepting audio and wake up anyone waiting on the channel.
+        """
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+        log.info(f"Audio channel: {self.chunks_in} chunks, high water {self.high_water} of {self.capacity}, "
+                 f"{self.overflows} overflows ({self.chunks_dropped} chunks dropped).")
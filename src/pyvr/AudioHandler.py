@@ -12,10 +12,9 @@ from abc import abstractmethod
 
 import logging as log
 import threading as thr
-import time
 
 from .AudioInput import AudioInput
-from .configuration import load_config, AudioCfg
+from .Telemetry import shared_telemetry
 
 
 class AudioHandler:
@@ -27,6 +26,9 @@ class AudioHandler:
 
     ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
+    # TRUE TO START WITH THE AUDIO CAPTURED IN THE LAST PreRollSecs (SEE pyvr.ini)
+    pre_roll: bool = False
+
     def __init__(self, audio_input: AudioInput):
         """
         :about: AudioRecorder constructor
@@ -35,7 +37,8 @@ class AudioHandler:
         # MEMBERS USED TO INTERACT WITH THE AUDIO HARDWARE
         self.audio_input = audio_input
 
-        self.time_to_sleep = (self.audio_input.buffer_size/self.audio_input.sample_rate) / 250
+        # HOW LONG TO WAIT FOR AUDIO BEFORE CHECKING IF PROCESSING SHOULD STOP
+        self.time_to_wait = self.audio_input.buffer_size / self.audio_input.sample_rate
         self.processing = False
         self.process_thread = None
 
@@ -47,6 +50,7 @@ class AudioHandler:
         log.info("Start processing audio.")
         # capture (record) the input from the audio input device and play on default speakers.
         if not self.processing:
+            self.audio_input.end_pre_roll(self.pre_roll)
             self.processing = True
             self.process_thread = thr.Thread(name="audio-process-thread", target=self.process)
             self.process_thread.start()
@@ -66,8 +70,16 @@ class AudioHandler:
     def process(self):
         self.before_processing()
 
+        # HOW FULL THE CHANNEL IS AFTER EACH CHECK SHOWS WHETHER THIS HANDLER IS KEEPING UP.
+        telemetry = shared_telemetry()
+        stage = type(self).__name__
         while self.processing:
             self.check_buffer()
+            telemetry.set_gauge("audio_buffer_fill", self.audio_input.buffer_fill(), stage=stage)
+
+        # handle any audio that was captured before processing stopped.
+        while self.audio_input.new_audio_avail():
+            self.check_buffer()
 
         self.after_processing()
 
@@ -78,6 +90,7 @@ class AudioHandler:
         log.info("Stop processing audio.")
         self.processing = False
         self.process_thread.join()
+        self.audio_input.start_pre_roll()
 
     def __enter__(self):
         """ __enter__ and __exit__ allow objects of this class to use the with notation."""
@@ -8,17 +8,32 @@
         Date:   October 2023</pre>
     </div>
 """
-import alsaaudio as aa
 import enum
 import logging as log
-import pyaudio as pa
-import sounddevice as sd
+import math
 import threading as thr
 import time
 
 from typing import Self
 
+from .AudioChannel import AudioChannel, AudioChunk
+from .AudioRing import AudioRing
 from .configuration import load_config, AudioCfg
+from .DeadlineScheduler import DeadlineScheduler
+from .LazyModule import LazyModule
+from .MediaClock import MediaClock, shared_clock
+from .SharedAudioRing import SharedAudioRing
+from .SignalGenerator import SignalGenerator
+from .Telemetry import shared_telemetry
+
+# ONLY THE AUDIO LIBRARY SELECTED IN pyvr.ini (SEE *Library*) IS EVER LOADED.
+aa = LazyModule("alsaaudio")
+pa = LazyModule("pyaudio")
+sd = LazyModule("sounddevice")
+
+# THE CHANNEL FROM A DEVICE HOLDS AT LEAST THIS MANY SECONDS OF AUDIO (SEE QueueSecs), SO IT
+# ONLY FILLS WHEN THE CONSUMER HAS STALLED, NOT WHEN IT IS MERELY SLOW FOR A MOMENT.
+MIN_QUEUE_SECS = 2
 
 
 class SdAttr(str, enum.Enum):
@@ -64,16 +79,23 @@ class AudioInput:
         audio_config, _, _ = load_config()
 
         audio_library_name: str = audio_config[AudioCfg.AUDIO_LIBRARY]
-        assert (audio_library_name.lower() == "pyaudio" or audio_library_name.lower() == "alsaaudio")
+        assert audio_library_name.lower() in ("pyaudio", "pyaudiocallback", "alsaaudio", "synthetic", "shared")
         self.audio_lib: str = audio_library_name.lower()
         if self.audio_lib == "pyaudio":
             self.thread_target = self.pyaudio_listen
+        elif self.audio_lib in ("pyaudiocallback", "shared"):
+            self.thread_target = None
+        elif self.audio_lib == "synthetic":
+            self.thread_target = self.synthetic_listen
         else:
             self.thread_target = self.alsaaudio_listen
 
         self.seconds_of_buffer: float = float(audio_config[AudioCfg.SECS_OF_BUFFER])
         self.pre_start_delay: float = float(audio_config[AudioCfg.PRE_START_DELAY])
-        if audio_library_name.lower() == "pyaudio":
+        self.queue_secs: float = float(audio_config[AudioCfg.QUEUE_SECS])
+        self.pre_roll_secs: float = float(audio_config[AudioCfg.PRE_ROLL_SECS])
+        self.period_size: int = int(audio_config[AudioCfg.PERIOD_SIZE])
+        if self.audio_lib in ("pyaudio", "pyaudiocallback"):
             self.audio_input_device = lookup_device(audio_config[AudioCfg.DEVICE_NAME])
             if self.audio_input_device is None:
                 log.critical(f'Unable to find device: {audio_config[AudioCfg.DEVICE_NAME]}')
@@ -92,12 +114,27 @@ class AudioInput:
             self.channels: int = self.audio_input_device[SdAttr.INPUT_CHANNELS]
             self.buffer_size: int = int(self.sample_rate * self.seconds_of_buffer)
 
+        elif self.audio_lib == "shared":
+            # THE CAPTURE DAEMON OWNS THE DEVICE.  READ ITS AUDIO (AND USE ITS CLOCK).
+            self.audio_device_name: str = audio_config[AudioCfg.SHARED_NAME]
+            shared_ring = SharedAudioRing(self.audio_device_name)
+            self.sample_rate: int = shared_ring.sample_rate
+            self.channels: int = shared_ring.channels
+            self.buffer_size: int = int(self.sample_rate * self.seconds_of_buffer)
+            shared_clock().epoch = shared_ring.epoch
+
         else:
             self.audio_device_name: str = audio_config[AudioCfg.DEVICE_NAME]
             self.sample_rate: int = int(audio_config[AudioCfg.SAMPLE_RATE])
             self.channels: int = int(audio_config[AudioCfg.CHANNEL_COUNT])
             self.buffer_size: int = int(self.sample_rate * self.seconds_of_buffer)
 
+        if self.audio_lib == "synthetic":
+            self.signal: str = audio_config[AudioCfg.SIGNAL].lower()
+            self.tone_hz: float = float(audio_config[AudioCfg.TONE_HZ])
+            self.real_time: bool = bool(audio_config[AudioCfg.REAL_TIME])
+            log.debug(f"    - signal      = {self.signal}")
+
         log.debug(f"    - channels    = {self.channels}")
         log.debug(f"    - sample rate = {self.sample_rate}")
         log.debug(f"    - buffer_size = {self.buffer_size}")
@@ -105,19 +142,50 @@ class AudioInput:
         # VARIABLES TO ALLOW THREAD INTERACTIONS
         self.listening: bool = False
         self.listen_thread: thr.Thread | None = None
-        self.latest_audio: bytes | None = None
-        self.new_audio_sample: bool = False
+        self.audio_interface = None
+        self.audio_stream = None
+        self.input_overflows: int = 0
+        self.clock: MediaClock = shared_clock()
+        # THE CHANNEL ALSO HOLDS THE LAST PreRollSecs OF AUDIO SO RECORDINGS CAN START IN THE PAST.
+        frame_bytes: int = 2 * self.channels
+        held_secs: float = self.queue_secs + self.pre_roll_secs
+        if self.audio_lib == "shared":
+            self.channel: AudioChannel | AudioRing | SharedAudioRing = shared_ring
+            self.pre_roll_window: int = int(self.sample_rate * self.pre_roll_secs) * frame_bytes
+        elif self.audio_lib == "pyaudiocallback":
+            log.debug(f"    - period_size = {self.period_size}")
+            self.channel = AudioRing(int(self.sample_rate * held_secs) * frame_bytes, frame_bytes)
+            self.pre_roll_window = int(self.sample_rate * self.pre_roll_secs) * frame_bytes
+        else:
+            # EACH CHUNK IS SecsOfBuffer LONG.  ONLY GENERATED AUDIO CAN WAIT FOR ROOM.  A DEVICE
+            # WOULD OVERRUN WHILE CAPTURE WAITED, SO ITS CHANNEL IS SIZED TO NEVER FILL UP.
+            if self.audio_lib != "synthetic":
+                held_secs = max(held_secs, MIN_QUEUE_SECS + self.pre_roll_secs)
+            self.channel = AudioChannel(max(2, math.ceil(held_secs / self.seconds_of_buffer)),
+                                        wait_when_full=self.audio_lib == "synthetic")
+            self.pre_roll_window = math.ceil(self.pre_roll_secs / self.seconds_of_buffer)
+
+        self.in_pre_roll: bool = False
+        if self.pre_roll_secs > 0:
+            log.debug(f"    - pre-roll    = {self.pre_roll_secs} seconds")
+            self.start_pre_roll()
 
     def start_listening(self) -> None:
         """
         :about: Start monitoring this device and storing the audio data locally.  This will
-                start a thread devoted to the process and then return.
+                start a thread devoted to the process and then return.  In callback mode
+                PortAudio delivers the audio on its own thread, so no thread is started.
         """
         log.info("Starting audio capture.")
         if not self.listening:
             self.listening = True
-            self.listen_thread = thr.Thread(name="audio-capture-thread", daemon=True, target=self.thread_target)
-            self.listen_thread.start()
+            if self.audio_lib == "shared":
+                log.info(f"Reading audio published by the capture daemon ({self.audio_device_name}).")
+            elif self.thread_target is None:
+                self.pyaudio_callback_start()
+            else:
+                self.listen_thread = thr.Thread(name="audio-capture-thread", daemon=True, target=self.thread_target)
+                self.listen_thread.start()
             time.sleep(0.1)
 
     def alsaaudio_listen(self) -> None:
@@ -135,14 +203,16 @@ class AudioInput:
                               )
 
         while self.listening:
-            _, new_audio = audio_stream.read()
-            while self.new_audio_sample:
-                time.sleep(.01)
-
-            self.latest_audio = new_audio
-            self.new_audio_sample = True
+            length, new_audio = audio_stream.read()
+            if length < 0:
+                # THE DEVICE OVERRAN (-EPIPE).  COUNT IT AND CARRY ON WITH THE AUDIO THAT FOLLOWS.
+                self.input_overflows += 1
+                shared_telemetry().count("audio_input_overflows", stage="audio_capture")
+                continue
+            self.store_audio(new_audio)
 
         audio_stream.close()
+        log.info(f"alsaaudio capture stopped. ({self.input_overflows} input overflows)")
 
     def pyaudio_listen(self) -> None:
         """
@@ -160,35 +230,138 @@ class AudioInput:
                                             )
 
         while self.listening:
-            wait_count = 0
-            new_audio = audio_stream.read(self.buffer_size)
-            while self.new_audio_sample:
-                wait_count += 1
-                print(f"Wait count: {wait_count}")
-                time.sleep(.01)
-
-            self.latest_audio = new_audio
-            self.new_audio_sample = True
+            # AN OVERFLOW (A LATE READ) MUST NOT END CAPTURE.  THE AUDIO THAT FOLLOWS IS STILL WANTED.
+            new_audio = audio_stream.read(self.buffer_size, exception_on_overflow=False)
+            self.store_audio(new_audio)
 
         audio_stream.stop_stream()
         audio_stream.close()
         audio_interface.terminate()
 
+    def synthetic_listen(self) -> None:
+        """
+        :about: Code executed by the audio-capture-thread when no audio hardware is used.
+                Generate a chunk of audio every *SecsOfBuffer* seconds (or as fast as the
+                consumer accepts it when *RealTime* is off).
+        """
+        log.info("synthetic-audio-thread has started.")
+        generator = SignalGenerator(self.signal, self.sample_rate, self.channels, self.tone_hz)
+
+        # EACH CHUNK IS DELIVERED ONCE IT WOULD HAVE BEEN CAPTURED (ONE BUFFER AFTER IT BEGINS).
+        scheduler = DeadlineScheduler(self.seconds_of_buffer, self.clock, name="synthetic audio")
+        scheduler.start(self.clock.now() + self.seconds_of_buffer)
+        while self.listening:
+            if self.real_time:
+                scheduler.wait()
+
+            self.store_audio(generator.generate(self.buffer_size))
+
+    def store_audio(self, new_audio: bytes) -> None:
+        """
+        :about: Stamp a chunk of captured audio and hand it to the consumer.  An overrun
+                (the channel was full) is counted along with how full the channel is.
+        """
+        overflows = self.channel.overflows
+        self.channel.put(new_audio, self.clock.now())
+
+        telemetry = shared_telemetry()
+        telemetry.count("audio_chunks_captured", stage="audio_capture")
+        if self.channel.overflows > overflows:
+            telemetry.count("audio_overruns", self.channel.overflows - overflows, stage="audio_capture")
+        telemetry.set_gauge("audio_buffer_fill", self.buffer_fill(), stage="audio_capture")
+
+    def buffer_fill(self) -> float:
+        """
+        :about: How full the channel between capture and the consumer is (0.0 to 1.0).
+        """
+        return round(len(self.channel) / self.channel.capacity, 3)
+
+    def pyaudio_callback_start(self) -> None:
+        """
+        :about: Open the input device in PortAudio callback (non-blocking) mode.  PortAudio
+                calls :py:meth:`pyaudio_callback` every *PeriodSize* frames.
+        """
+        log.info("pyaudio callback capture is starting.")
+        self.audio_interface = pa.PyAudio()
+        self.audio_stream = self.audio_interface.open(format=pa.paInt16,
+                                                      channels=self.channels,
+                                                      rate=self.sample_rate,
+                                                      frames_per_buffer=self.period_size,
+                                                      input_device_index=self.audio_device_idx,
+                                                      input=True,
+                                                      stream_callback=self.pyaudio_callback
+                                                      )
+        self.audio_stream.start_stream()
+
+    def pyaudio_callback(self, in_data: bytes, frame_count: int, time_info: dict, status: int) -> (None, int):
+        """
+        :about: Called by PortAudio (on its own thread) with each new period of audio.
+                It must never block, so the audio is copied into the ring and nothing else.
+        """
+        if status & pa.paInputOverflow:
+            self.input_overflows += 1
+            shared_telemetry().count("audio_input_overflows", stage="audio_capture")
+
+        self.store_audio(in_data)
+        return None, pa.paContinue
+
+    def pyaudio_callback_stop(self) -> None:
+        """
+        :about: Stop the PortAudio callback stream and release the device.
+        """
+        self.audio_stream.stop_stream()
+        self.audio_stream.close()
+        self.audio_interface.terminate()
+        log.info(f"pyaudio callback capture stopped. ({self.input_overflows} input overflows)")
+
+    def start_pre_roll(self) -> None:
+        """
+        :about: Called when the audio stops being consumed (between recordings).  Only the
+                last *PreRollSecs* of audio are kept until it is consumed again, so capture
+                never waits on a consumer that is not there.
+        """
+        if not self.in_pre_roll:
+            self.in_pre_roll = True
+            self.channel.start_pre_roll(self.pre_roll_window)
+
+    def end_pre_roll(self, keep: bool) -> None:
+        """
+        :about: Called when the audio starts being consumed.  Until then only the last
+                *PreRollSecs* of audio are kept (see pyvr.ini).
+        :param keep: TRUE to deliver that audio first (a recorder).  FALSE to discard it (a
+                     player).
+        """
+        if self.in_pre_roll:
+            self.in_pre_roll = False
+            self.channel.end_pre_roll(keep)
+            log.info(f"End of audio pre-roll. ({'kept' if keep else 'discarded'})")
+
     def new_audio_avail(self) -> bool:
         """
         :about:   determine if the recorder has unsaved data.
         :returns: TRUE if it is time to save some data, FALSE if not.
         """
-        return self.new_audio_sample
+        return len(self.channel) > 0
 
-    def get_latest_audio(self) -> bytes:
+    def get_latest_audio(self, timeout: float | None = None) -> bytes | None:
         """
-        :about:   obtain the latest audio data the input device has provided.
-        :returns: the binary audio data to be saved in the audio file.
+        :about:   obtain the next chunk of audio data the input device has provided.  Chunks
+                  are delivered in the order they were captured.  Waits for one to arrive if
+                  necessary.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the binary audio data to be saved in the audio file or None if no audio
+                  arrived before the timeout.
         """
-        return_val = self.latest_audio
-        self.new_audio_sample = False
-        return return_val
+        chunk = self.get_audio_chunk(timeout)
+        return None if chunk is None else chunk.data
+
+    def get_audio_chunk(self, timeout: float | None = None) -> AudioChunk | None:
+        """
+        :about:   obtain the next chunk of audio data along with the time it was captured.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the chunk or None if no audio arrived before the timeout.
+        """
+        return self.channel.get(timeout)
 
     def stop_listening(self) -> None:
         """
@@ -197,8 +370,13 @@ class AudioInput:
         """
         log.info("Ending audio capture.")
         self.listening = False
-        self.new_audio_sample = False
-        self.listen_thread.join()
+        if self.audio_lib == "pyaudiocallback":
+            self.pyaudio_callback_stop()
+        self.channel.close()
+        if self.listen_thread is not None:
+            self.listen_thread.join()
+        if self.audio_lib == "shared":
+            self.channel.detach()
 
     def __enter__(self) -> Self:
         self.start_listening()
@@ -9,13 +9,16 @@
     </div>
 """
 from abc import abstractmethod
-import alsaaudio as aa
 import logging as log
-import pyaudio as pa
 
 from .AudioHandler import AudioHandler
 from .AudioInput import AudioInput
 from .configuration import load_config, AudioCfg
+from .LazyModule import LazyModule
+
+# ONLY THE AUDIO LIBRARY SELECTED IN pyvr.ini (SEE *Library*) IS EVER LOADED.
+aa = LazyModule("alsaaudio")
+pa = LazyModule("pyaudio")
 
 
 class AudioPlayer(AudioHandler):
@@ -38,9 +41,9 @@ class AudioPlayer(AudioHandler):
         audio_config, _, _ = load_config()
 
         audio_library_name: str = audio_config[AudioCfg.AUDIO_LIBRARY]
-        assert (audio_library_name.lower() == "pyaudio" or audio_library_name.lower() == "alsaaudio")
+        assert audio_library_name.lower() in ("pyaudio", "pyaudiocallback", "alsaaudio", "synthetic", "shared")
         self.audio_lib: str = audio_library_name.lower()
-        if self.audio_lib == "pyaudio":
+        if self.audio_lib in ("pyaudio", "pyaudiocallback", "synthetic", "shared"):
             self.pyaudio = True
             self.alsaaudio = False
         else:
@@ -73,10 +76,17 @@ class AudioPlayer(AudioHandler):
                 it becomes available.
         """
         log.info("pyaudio-play-thread is starting.")
+        # SMALL OUTPUT PERIODS KEEP LATENCY LOW WHEN CAPTURE RUNS IN CALLBACK MODE.
+        if self.audio_lib == "pyaudiocallback":
+            frames_per_buffer = self.audio_input.period_size
+        else:
+            frames_per_buffer = pa.paFramesPerBufferUnspecified
+
         self.audio_interface = pa.PyAudio()
         self.audio_stream = self.audio_interface.open(rate=self.audio_input.sample_rate,
                                                       format=pa.paInt16,
                                                       channels=2,
+                                                      frames_per_buffer=frames_per_buffer,
                                                       output=True
                                                       )
         log.info("pyaudio-play-thread has started.")
@@ -94,6 +104,6 @@ class AudioPlayer(AudioHandler):
         self.pyaudio_stop()
 
     def check_buffer(self) -> None:
-        if self.audio_input.new_audio_sample:
-            audio_buffer = self.audio_input.get_latest_audio()
+        audio_buffer = self.audio_input.get_latest_audio(timeout=self.time_to_wait)
+        if audio_buffer is not None:
             self.audio_stream.write(audio_buffer)
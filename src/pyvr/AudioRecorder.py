@@ -9,10 +9,14 @@
     </div>
 """
 import logging as log
-import wave
+import math
 
 from .AudioHandler import AudioHandler
 from .AudioInput import AudioInput
+from .PcmWriter import PcmWriter
+from .SegmentManifest import SegmentManifest, AUDIO
+from .Telemetry import shared_telemetry
+from .TimingLog import TimingLog
 
 
 class AudioRecorder(AudioHandler):
@@ -24,7 +28,17 @@ class AudioRecorder(AudioHandler):
 
     ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
-    def __init__(self, audio_input: AudioInput, filename: str):
+    # A RECORDING STARTS WITH THE PRE-ROLL (SEE PreRollSecs IN pyvr.ini)
+    pre_roll: bool = True
+
+    def __init__(self, audio_input: AudioInput, filename: str, manifest: SegmentManifest | None = None):
+        """
+        :about: AudioRecorder constructor
+        :param audio_input: the source of the audio
+        :param filename: filename (must end with .wav) to record audio to.
+        :param manifest: split the recording into the segments it describes instead of
+                         recording to filename.
+        """
         AudioHandler.__init__(self, audio_input)
         assert filename.endswith(".wav")
 
@@ -34,31 +48,75 @@ class AudioRecorder(AudioHandler):
         self.recording: bool = False
         self.record_thread = None
 
+        # MEMBERS RELATED TO SEGMENTS (SEE SegmentMins IN pyvr.ini)
+        self.manifest: SegmentManifest | None = manifest
+        self.segment: int = 1
+        self.frame_bytes: int = 2 * self.audio_input.channels
+        if manifest is not None:
+            filename = manifest.open_segment(self.segment, AUDIO)
+
         # MEMBERS USED TO INTERACT WITH THE DISK
         self.filename = filename
-        self.wav_file = None
+        self.wav_file: PcmWriter = PcmWriter(filename, self.audio_input.channels, self.audio_input.sample_rate)
+        self.timing = TimingLog(filename, self.audio_input.sample_rate)
 
         log.info(f"    - Audio output sent to {self.filename}")
 
     def before_processing(self) -> None:
         log.info(f"audio-write-thread is starting")
 
-        self.wav_file = wave.open(self.filename, 'wb')
-        self.wav_file.setnchannels(self.audio_input.channels)
-        self.wav_file.setsampwidth(2)
-        self.wav_file.setframerate(self.audio_input.sample_rate)
+        # THE HEADER IS KEPT UP TO DATE WHILE RECORDING, SO A CRASH LEAVES A VALID FILE.
+        self.wav_file.open()
+        self.wav_file.write_silence(int(self.audio_input.sample_rate * self.audio_input.pre_start_delay))
 
-        silence = b'\x00' * int(self.audio_input.sample_rate * 2 *
-                                self.audio_input.channels *
-                                self.audio_input.pre_start_delay
-                                )
-        self.wav_file.setnframes(self.audio_input.buffer_size)
-        self.wav_file.writeframesraw(silence)
+        self.timing.open()
 
     def after_processing(self) -> None:
         self.wav_file.close()
+        self.timing.close()
+        if self.manifest is not None:
+            self.manifest.close_segment(self.segment, AUDIO)
+
+    def next_segment(self) -> None:
+        """
+        :about: Close the current segment and start the next.
+        """
+        self.after_processing()
+
+        self.segment += 1
+        self.filename = self.manifest.open_segment(self.segment, AUDIO)
+        self.wav_file = PcmWriter(self.filename, self.audio_input.channels, self.audio_input.sample_rate)
+        self.timing = TimingLog(self.filename, self.audio_input.sample_rate)
+        self.wav_file.open()
+        self.timing.open()
+
+    def write_chunk(self, data, timestamp: float) -> None:
+        """
+        :about: Write audio to the current file and note when it was captured.
+        :param data: whole frames of audio
+        :param timestamp: clock time the last frame was captured
+        """
+        self.wav_file.write(data)
+        self.timing.write(self.wav_file.frames_written, timestamp)
+        shared_telemetry().observe("capture_to_write", 1000 * (self.audio_input.clock.now() - timestamp), stage=type(self).__name__)
 
     def check_buffer(self) -> None:
-        if self.audio_input.new_audio_sample:
-            audio_buffer = self.audio_input.get_latest_audio()
-            self.wav_file.writeframesraw(audio_buffer)
+        chunk = self.audio_input.get_audio_chunk(timeout=self.time_to_wait)
+        if chunk is None:
+            return
+
+        if self.manifest is None or chunk.timestamp < self.manifest.boundary(self.segment):
+            self.write_chunk(chunk.data, chunk.timestamp)
+            return
+
+        # THE CHUNK CROSSES THE END OF THE SEGMENT.  CUT IT AT THE SAMPLE CAPTURED AT THE BOUNDARY.
+        rate = self.audio_input.sample_rate
+        frames = len(chunk.data) // self.frame_bytes
+        first_timestamp = chunk.timestamp - (frames - 1) / rate
+        split = max(0, min(frames, math.ceil((self.manifest.boundary(self.segment) - first_timestamp) * rate)))
+        if split > 0:
+            self.write_chunk(chunk.data[:split * self.frame_bytes], first_timestamp + (split - 1) / rate)
+
+        self.next_segment()
+        if split < frames:
+            self.write_chunk(chunk.data[split * self.frame_bytes:], chunk.timestamp)
@@ -0,0 +1,169 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">AudioRing</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import threading as thr
+
+from .AudioChannel import AudioChunk
+
+
+class AudioRing:
+    """
+    A preallocated ring of raw audio bytes filled from a PortAudio callback.  It offers
+    the same consumer interface as :py:class:`AudioChannel<pyvr.AudioChannel.AudioChannel>`
+    so the :py:class:`AudioHandler<pyvr.AudioHandler.AudioHandler>` classes work with either.
+
+    The producer never waits: it runs on PortAudio's real time thread.  If the consumer
+    falls so far behind that the ring is full, the new period is discarded and counted as
+    an overflow.  Size the ring (see *QueueSecs* in pyvr.ini) so that this never happens.
+
+    During a pre-roll (before anyone consumes the audio) the producer writes over the
+    oldest audio.  Only the consumer moves the read position: when the pre-roll ends it
+    skips ahead to the most recent window of audio.
+
+    The write position and the time of the newest audio are published together under the
+    lock, so a consumer always sees a time that belongs to the audio it takes.
+    """
+    def __init__(self, capacity: int, frame_bytes: int) -> None:
+        """
+        :about: AudioRing constructor
+        :param capacity: size of the ring in bytes.  Rounded down to a whole number of frames.
+        :param frame_bytes: size of one audio frame (one sample for every channel) in bytes.
+        """
+        capacity -= capacity % frame_bytes
+        assert capacity > 0
+
+        self.capacity: int = capacity
+        self.buffer: bytearray = bytearray(capacity)
+        self.view: memoryview = memoryview(self.buffer)
+
+        # TOTAL BYTES EVER WRITTEN AND READ.  WRITTEN ONLY BY THE PRODUCER, READ ONLY BY THE CONSUMER.
+        self.write_pos: int = 0
+        self.read_pos: int = 0
+        self.write_time: float = 0.0
+
+        self.changed: thr.Condition = thr.Condition()
+        self.closed: bool = False
+        self.window: int | None = None
+
+        # STATISTICS
+        self.chunks_in: int = 0
+        self.overflows: int = 0
+        self.bytes_dropped: int = 0
+        self.high_water: int = 0
+
+    def __len__(self) -> int:
+        return self.write_pos - self.read_pos
+
+    def put(self, chunk: bytes, timestamp: float) -> bool:
+        """
+        :about: Copy a period of audio into the ring.  Never waits.
+        :param chunk: the audio data
+        :param timestamp: clock time the last sample of the chunk was captured
+        :returns: TRUE if the chunk was stored, FALSE if there was no room (or the ring is closed).
+        """
+        size = len(chunk)
+        if self.closed:
+            return False
+
+        if self.window is not None:
+            # NOBODY IS READING, SO THE LOCK IS FREE.  HOLDING IT WHILE THE OLDEST AUDIO IS
+            # WRITTEN OVER MEANS end_pre_roll(...) SEES ALL OF A PERIOD OR NONE OF IT.
+            with self.changed:
+                if self.window is not None and size <= self.capacity:
+                    self.write(chunk, timestamp)
+                    return True
+
+        if size > self.capacity - len(self):
+            self.overflows += 1
+            self.bytes_dropped += size
+            return False
+
+        self.write(chunk, timestamp)
+        return True
+
+    def write(self, chunk: bytes, timestamp: float) -> None:
+        """
+        :about: Copy a period into the ring at the write position and publish it (producer only).
+        :param chunk: the audio data (no larger than the capacity)
+        :param timestamp: clock time the last sample of the chunk was captured
+        """
+        size = len(chunk)
+        data = memoryview(chunk)
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self.view[start:start + first] = data[:first]
+        if first < size:
+            self.view[:size - first] = data[first:]
+
+        with self.changed:
+            self.write_time = timestamp
+            self.write_pos += size
+            self.chunks_in += 1
+            self.high_water = max(self.high_water, min(len(self), self.capacity))
+            self.changed.notify_all()
+
+    def get(self, timeout: float | None = None) -> AudioChunk | None:
+        """
+        :about: Remove all of the audio currently held in the ring, waiting for some to
+                arrive if the ring is empty.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the audio data or None if nothing arrived in time.
+        """
+        with self.changed:
+            if len(self) == 0 and not self.closed:
+                self.changed.wait_for(lambda: len(self) > 0 or self.closed, timeout)
+            write_pos = self.write_pos
+            timestamp = self.write_time
+
+        size = write_pos - self.read_pos
+        if size == 0:
+            return None
+
+        start = self.read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        chunk = bytes(self.view[start:start + first])
+        if first < size:
+            chunk += bytes(self.view[:size - first])
+
+        self.read_pos = write_pos
+        return AudioChunk(timestamp, chunk)
+
+    def start_pre_roll(self, window: int) -> None:
+        """
+        :about: Keep only the most recent audio until :py:meth:`end_pre_roll` is called.
+        :param window: number of bytes to keep (a whole number of frames, no more than the capacity)
+        """
+        with self.changed:
+            self.window = min(window, self.capacity)
+
+    def end_pre_roll(self, keep: bool) -> None:
+        """
+        :about: Stop writing over old audio and move the read position (consumer only).  The
+                consumer is about to start.
+        :param keep: TRUE to deliver the most recent window of audio.  FALSE to discard it all.
+        """
+        with self.changed:
+            if self.window is not None and keep:
+                self.read_pos = max(self.read_pos, self.write_pos - self.window)
+            elif not keep:
+                self.read_pos = self.write_pos
+            self.window = None
+
+    def close(self) -> None:
+        """
+        :about: Stop accepting audio and wake up anyone waiting on the ring.
+        """
+        self.closed = True
+        with self.changed:
+            self.changed.notify_all()
+
+        log.info(f"Audio ring: {self.chunks_in} periods, high water {self.high_water} of {self.capacity} bytes, "
+                 f"{self.overflows} overflows ({self.bytes_dropped} bytes dropped).")
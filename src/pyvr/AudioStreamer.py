@@ -0,0 +1,106 @@
+"""
+... RAW:: html
+
+    <h3 class="cls_header">AudioStreamer</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import deque
+
+import logging as log
+
+from .AudioChannel import AudioChunk
+from .AudioHandler import AudioHandler
+from .AudioInput import AudioInput
+from .FfmpegMuxer import FfmpegMuxer
+
+# LET THE AUDIO WANDER THIS FAR (IN SECONDS) FROM THE VIDEO BEFORE CORRECTING IT.
+SYNC_TOLERANCE = 0.04
+
+
+class AudioStreamer(AudioHandler):
+    """
+    An AudioStreamer object will start a thread that sends the chunks of audio supplied
+    by a :py:class:`AudioInput<pyvr.AudioInput.AudioInput>` object straight to a
+    :py:class:`FfmpegMuxer<pyvr.FfmpegMuxer.FfmpegMuxer>`.
+
+    Raw PCM carries no timestamps, so the audio is kept in sync by position instead.  Using
+    the capture time of each chunk, samples are dropped or silence is inserted whenever the
+    audio drifts more than SYNC_TOLERANCE seconds from the video.
+
+    ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
+    """
+    # A RECORDING STARTS WITH THE PRE-ROLL (SEE PreRollSecs IN pyvr.ini)
+    pre_roll: bool = True
+
+    def __init__(self, audio_input: AudioInput, muxer: FfmpegMuxer):
+        AudioHandler.__init__(self, audio_input)
+
+        log.info("Setup audio streamer.")
+        self.muxer: FfmpegMuxer = muxer
+
+        # MEMBERS USED TO KEEP THE AUDIO IN SYNC WITH THE VIDEO
+        self.frame_bytes: int = 2 * self.audio_input.channels
+        self.tolerance: int = int(SYNC_TOLERANCE * self.audio_input.sample_rate)
+        self.frames_written: int = 0
+        self.frames_dropped: int = 0
+        self.frames_padded: int = 0
+        # AUDIO CAPTURED BEFORE THE FIRST VIDEO FRAME.  ONLY THE PRE-ROLL AND THE SYNC WINDOW
+        # CAN BE USED (OLDER AUDIO WOULD BE DROPPED TO ALIGN IT), SO NO MORE THAN THAT IS KEPT.
+        self.early_secs: float = self.audio_input.pre_roll_secs + SYNC_TOLERANCE
+        self.early_chunks: deque[AudioChunk] = deque()
+
+    def before_processing(self) -> None:
+        log.info(f"audio-stream-thread is starting")
+
+        self.muxer.open_audio()
+
+    def after_processing(self) -> None:
+        self.muxer.close_audio()
+        log.info(f"Audio sync: {self.frames_dropped} samples dropped, {self.frames_padded} samples of silence added.")
+
+    def check_buffer(self) -> None:
+        chunk = self.audio_input.get_audio_chunk(timeout=self.time_to_wait)
+        if chunk is None:
+            return
+
+        # HOLD THE AUDIO UNTIL THE FIRST VIDEO FRAME HAS BEEN SENT.
+        if self.muxer.video_start is None:
+            self.early_chunks.append(chunk)
+            while chunk.timestamp - self.early_chunks[0].timestamp > self.early_secs:
+                self.frames_dropped += len(self.early_chunks.popleft().data) // self.frame_bytes
+            return
+
+        for early_chunk in self.early_chunks:
+            self.write_aligned(early_chunk)
+        self.early_chunks.clear()
+
+        self.write_aligned(chunk)
+
+    def write_aligned(self, chunk: AudioChunk) -> None:
+        """
+        :about: Send a chunk of audio to ffmpeg, first dropping samples or adding silence if
+                the chunk would otherwise end too far from where its capture time says it
+                belongs.
+        :param chunk: the audio chunk
+        """
+        data = chunk.data
+        frames = len(data) // self.frame_bytes
+        target_end = round((chunk.timestamp - self.muxer.video_start) * self.audio_input.sample_rate)
+        drift = self.frames_written + frames - target_end
+
+        if drift > self.tolerance:
+            drop = min(drift, frames)
+            data = data[drop * self.frame_bytes:]
+            frames -= drop
+            self.frames_dropped += drop
+        elif drift < -self.tolerance:
+            self.muxer.write_audio(b'\x00' * (-drift * self.frame_bytes))
+            self.frames_written -= drift
+            self.frames_padded -= drift
+
+        self.muxer.write_audio(data)
+        self.frames_written += frames
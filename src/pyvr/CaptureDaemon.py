@@ -0,0 +1,110 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">CaptureDaemon</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import threading as thr
+
+from .AudioInput import AudioInput
+from .configuration import load_config, AudioCfg, VideoCfg
+from .SharedAudioRing import SharedAudioRing
+from .VideoCard import VideoCard
+
+
+class CaptureDaemon:
+    """
+    Owns the capture devices (a :py:class:`VideoCard<pyvr.VideoCard.VideoCard>` and an
+    :py:class:`AudioInput<pyvr.AudioInput.AudioInput>`) and publishes what they capture in
+    named shared memory.  Frames are decoded straight into a
+    :py:class:`SharedFrameRing<pyvr.SharedFrameRing.SharedFrameRing>` and audio periods
+    are copied into a :py:class:`SharedAudioRing<pyvr.SharedAudioRing.SharedAudioRing>`.
+
+    Players, previews and recorders in other processes use *Source=Shared* in [VIDEO] and
+    *Library=Shared* in [AUDIO] to attach.  The devices stay open between them, so moving
+    from a preview to a recording has no gap.
+
+    .. SEEALSO:: capture_daemon.py
+    """
+    def __init__(self) -> None:
+        """
+        :about: CaptureDaemon constructor.  The devices are configured by pyvr.ini as usual.
+                *SharedName* in each section names the shared memory.
+        """
+        audio_config, video_config, _ = load_config()
+
+        log.info("Setup capture daemon.")
+        self.card: VideoCard = VideoCard(publish_as=video_config[VideoCfg.SHARED_NAME])
+        self.audio_input: AudioInput = AudioInput()
+
+        # READERS CAN REWIND OVER THE PRE-ROLL, SO THE RING HOLDS IT AS WELL.
+        frame_bytes = 2 * self.audio_input.channels
+        held_secs = self.audio_input.queue_secs + self.audio_input.pre_roll_secs
+        self.audio_ring: SharedAudioRing = SharedAudioRing(audio_config[AudioCfg.SHARED_NAME],
+                                                           True,
+                                                           int(self.audio_input.sample_rate * held_secs) * frame_bytes,
+                                                           frame_bytes,
+                                                           self.audio_input.sample_rate,
+                                                           self.audio_input.channels,
+                                                           self.card.clock.epoch
+                                                           )
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.publishing: bool = False
+        self.publish_thread: thr.Thread | None = None
+
+    def publish_audio(self) -> None:
+        """
+        :about: Code executed by the audio-publish-thread.  Copy each chunk of captured
+                audio into shared memory.
+        """
+        log.info("audio-publish-thread has started.")
+        while self.publishing:
+            chunk = self.audio_input.get_audio_chunk(timeout=self.audio_input.seconds_of_buffer)
+            if chunk is not None:
+                self.audio_ring.put(chunk.data, chunk.timestamp)
+
+    def start_capture(self) -> None:
+        """
+        :about: Open the devices and start publishing.
+        """
+        log.info("Start capture daemon.")
+        if not self.publishing:
+            self.card.start_viewing()
+            self.audio_input.start_listening()
+            self.audio_input.end_pre_roll(False)
+            self.publishing = True
+            self.publish_thread = thr.Thread(name="audio-publish-thread", daemon=True, target=self.publish_audio)
+            self.publish_thread.start()
+
+    def stop_capture(self) -> None:
+        """
+        :about: Tell the attached processes capture is over, close the devices and remove
+                the shared memory.
+        """
+        log.info("Stop capture daemon.")
+        self.publishing = False
+        self.audio_input.stop_listening()
+        if self.publish_thread is not None:
+            self.publish_thread.join()
+
+        self.audio_ring.close()
+        self.audio_ring.detach()
+        self.card.stop_viewing()
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start_capture()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.stop_capture()
+        return exc_type is None
@@ -0,0 +1,142 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">ConsoleControl</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import signal
+import sys
+import threading as thr
+
+# SECONDS BETWEEN STATUS REPORTS
+STATUS_SECS = 5.0
+
+
+class ConsoleControl:
+    """
+    Controls a recording when there is no preview window (see *Headless* in the [PREVIEW]
+    section of pyvr.ini).  Commands are typed on stdin (one per line) or sent as signals.
+
+    ====================  ==========================================================
+    Command               Action
+    ====================  ==========================================================
+    status (or ENTER)     report the status now (also SIGUSR1)
+    stop                  end the current recording
+    quit                  end the current recording and cancel the rest (also SIGINT
+                          and SIGTERM)
+    ====================  ==========================================================
+
+    Signal handlers can only be installed by the main thread.  Start the control there.
+    """
+    def __init__(self, on_quit=None) -> None:
+        """
+        :about: ConsoleControl constructor
+        :param on_quit: function (taking no arguments) called when quit is requested
+        """
+        self.on_quit = on_quit
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.stop_requested: thr.Event = thr.Event()
+        self.quit_requested: thr.Event = thr.Event()
+        self.status_requested: thr.Event = thr.Event()
+        self.wakeup: thr.Event = thr.Event()
+        self.previous_handlers: dict = {}
+        self.command_thread: thr.Thread | None = None
+
+    def start(self) -> None:
+        """
+        :about: Install the signal handlers and start reading commands from stdin.
+        """
+        for signum, action in ((signal.SIGINT, self.request_quit),
+                               (signal.SIGTERM, self.request_quit),
+                               (signal.SIGUSR1, self.request_status)):
+            self.previous_handlers[signum] = signal.signal(signum, lambda *_, act=action: act())
+
+        if sys.stdin is not None and not sys.stdin.closed:
+            self.command_thread = thr.Thread(name="console-command-thread", daemon=True, target=self.read_commands)
+            self.command_thread.start()
+
+        log.info("Headless mode.  Type status, stop or quit (or send SIGUSR1, SIGTERM).")
+
+    def read_commands(self) -> None:
+        """
+        :about: Code executed by the console-command-thread.  Act on each line typed.  The
+                thread ends quietly when stdin is closed.
+        """
+        for line in sys.stdin:
+            command = line.strip().lower()
+            if command in ("", "status"):
+                self.request_status()
+            elif command == "stop":
+                self.request_stop()
+            elif command in ("quit", "exit"):
+                self.request_quit()
+            else:
+                print(f"Unknown command: {command}.  Use status, stop or quit.")
+
+    def request_status(self) -> None:
+        self.status_requested.set()
+        self.wakeup.set()
+
+    def request_stop(self) -> None:
+        log.info("Stop requested from the console.")
+        self.stop_requested.set()
+        self.wakeup.set()
+
+    def request_quit(self) -> None:
+        log.info("Quit requested from the console.")
+        self.quit_requested.set()
+        self.stop_requested.set()
+        if self.on_quit is not None:
+            self.on_quit()
+        self.wakeup.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        :about: Sleep until a command arrives or the timeout passes.
+        :param timeout: maximum number of seconds to wait
+        :returns: TRUE if the current recording should stop.
+        """
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        return self.stop_requested.is_set()
+
+    def status_due(self) -> bool:
+        """
+        :about: TRUE (once) if a status report was asked for.
+        """
+        requested = self.status_requested.is_set()
+        self.status_requested.clear()
+        return requested
+
+    def next_recording(self) -> None:
+        """
+        :about: Forget a stop request once the recording it ended is over.
+        """
+        if not self.quit_requested.is_set():
+            self.stop_requested.clear()
+
+    def stop(self) -> None:
+        """
+        :about: Put the original signal handlers back.
+        """
+        for signum, handler in self.previous_handlers.items():
+            signal.signal(signum, handler)
+        self.previous_handlers.clear()
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.stop()
+        return exc_type is None
@@ -0,0 +1,155 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">DeadlineScheduler</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import deque
+
+import enum
+import logging as log
+import threading as thr
+
+from .MediaClock import MediaClock, shared_clock
+
+# NUMBER OF RECENT WAKEUPS KEPT TO CALCULATE JITTER PERCENTILES
+JITTER_SAMPLES = 1000
+
+
+class PacingPolicy(str, enum.Enum):
+    """
+    What a :py:class:`DeadlineScheduler` does when its user falls behind schedule.
+    """
+    CATCH_UP = "catchup"  # run the missed ticks back to back until on schedule again.
+    SKIP = "skip"  # drop the missed ticks and continue with the next deadline.
+
+
+class DeadlineScheduler:
+    """
+    Releases a thread at fixed intervals of a
+    :py:class:`MediaClock<pyvr.MediaClock.MediaClock>`.  Tick n is due exactly
+    start + n * period, so time spent working between ticks never accumulates as drift.
+    Each wait is a single timed wait for the absolute deadline (no polling) that
+    :py:meth:`stop` can interrupt.  Handlers that use the shared clock are all paced by
+    the same timeline.
+
+    How late each wakeup is (its jitter) is measured and reported by :py:meth:`stats`.
+    """
+    def __init__(self,
+                 period: float,
+                 clock: MediaClock | None = None,
+                 policy: PacingPolicy = PacingPolicy.CATCH_UP,
+                 name: str = "scheduler"
+                 ) -> None:
+        """
+        :about: DeadlineScheduler constructor
+        :param period: seconds between ticks (1 / fps)
+        :param clock: clock the deadlines are measured on.  Defaults to the shared clock.
+        :param policy: what to do when ticks are missed
+        :param name: name used when logging statistics
+        """
+        assert period > 0
+
+        self.period: float = period
+        self.clock: MediaClock = shared_clock() if clock is None else clock
+        self.policy: PacingPolicy = policy
+        self.name: str = name
+
+        self.start_time: float | None = None
+        self.tick: int = -1
+        self.stopped: thr.Event = thr.Event()
+
+        # STATISTICS
+        self.ticks: int = 0
+        self.late_ticks: int = 0
+        self.skipped_ticks: int = 0
+        self.jitter_total: float = 0.0
+        self.jitter_max: float = 0.0
+        self.jitter_samples: deque = deque(maxlen=JITTER_SAMPLES)
+
+    def start(self, start_time: float | None = None) -> float:
+        """
+        :about: Begin a new timeline.  Tick 0 is due at start_time.
+        :param start_time: clock time of the first tick.  Defaults to now.
+        :returns: the start time
+        """
+        self.start_time = self.clock.now() if start_time is None else start_time
+        self.tick = -1
+        self.stopped.clear()
+        return self.start_time
+
+    def deadline(self, tick: int) -> float:
+        """
+        :about: Clock time a tick is due.
+        """
+        return self.start_time + tick * self.period
+
+    def wait(self) -> int | None:
+        """
+        :about: Sleep until the next tick is due.  If it is already past due the tick is
+                released at once (CATCH_UP) or the missed ticks are skipped (SKIP).
+        :returns: the number of the tick released or None if the scheduler was stopped.
+        """
+        if self.start_time is None:
+            self.start()
+
+        tick = self.tick + 1
+        now = self.clock.now()
+        behind = int((now - self.deadline(tick)) / self.period)
+        if behind > 0 and self.policy == PacingPolicy.SKIP:
+            self.skipped_ticks += behind
+            tick += behind
+
+        due = self.deadline(tick)
+        if due > now:
+            # A TIMED WAIT CAN RETURN A LITTLE EARLY.  WAIT AGAIN FOR WHATEVER IS LEFT.
+            remaining = due - now
+            while remaining > 0:
+                if self.stopped.wait(remaining):
+                    return None
+                remaining = due - self.clock.now()
+
+            jitter = self.clock.now() - due
+            self.jitter_total += jitter
+            self.jitter_max = max(self.jitter_max, jitter)
+            self.jitter_samples.append(jitter)
+        elif self.stopped.is_set():
+            return None
+        else:
+            self.late_ticks += 1
+
+        self.tick = tick
+        self.ticks += 1
+        return tick
+
+    def stop(self) -> None:
+        """
+        :about: Wake the thread waiting on the scheduler.  Its wait returns None.
+        """
+        self.stopped.set()
+
+    def stats(self) -> dict:
+        """
+        :about: Pacing statistics.  Jitter is how long after its deadline a waiting thread
+                woke up (in milliseconds).  Late ticks were already due when requested.
+        """
+        on_time = self.ticks - self.late_ticks
+        ordered = sorted(self.jitter_samples)
+        return {
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "jitter_mean_ms": round(1000 * self.jitter_total / on_time, 3) if on_time > 0 else 0.0,
+            "jitter_p99_ms": round(1000 * ordered[int(0.99 * (len(ordered) - 1))], 3) if ordered else 0.0,
+            "jitter_max_ms": round(1000 * self.jitter_max, 3),
+        }
+
+    def log_stats(self) -> None:
+        """
+        :about: Write the pacing statistics to the log.
+        """
+        log.info(f"Pacing ({self.name}): {self.stats()}")
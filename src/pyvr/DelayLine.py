@@ -0,0 +1,86 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">DelayLine</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import numpy as np
+
+from .LazyModule import LazyModule
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+
+class DelayLine:
+    """
+    A fixed size circular delay line of video frames.  Each frame pushed in is copied into
+    one preallocated block of memory and the frame pushed *depth* frames earlier comes out.
+    Every push costs the same (a single copy) and the memory used never changes.
+
+    The depth can be changed at any time (up to capacity - 1) without reallocating.  When
+    it grows, the output holds on its current frame until the extra frames have been
+    buffered.  When it shrinks, the output skips ahead.
+    """
+    def __init__(self, capacity: int, height: int, width: int, channels: int = 3) -> None:
+        """
+        :about: DelayLine constructor
+        :param capacity: number of frames stored (the largest depth is capacity - 1)
+        :param height: height (in pixels) of each frame
+        :param width: width (in pixels) of each frame
+        :param channels: color channels in each frame (3 for BGR)
+        """
+        assert capacity >= 1
+
+        self.capacity: int = capacity
+        self.height: int = height
+        self.width: int = width
+        self.block: np.ndarray = np.zeros((capacity, height, width, channels), dtype=np.uint8)
+        self.depth: int = 0
+
+        # NUMBER OF FRAMES PUSHED AND THE NUMBER (0 BASED) OF THE LAST FRAME RETURNED
+        self.pushed: int = 0
+        self.output_seq: int = -1
+
+        log.debug(f"Delay line: {capacity} frames of {width} x {height} ({self.block.nbytes // 2**20} MB)")
+
+    def set_depth(self, frames: int) -> int:
+        """
+        :about: Change the number of frames the output trails the input by.
+        :param frames: the delay in frames.  Limited to 0 .. capacity - 1.
+        :returns: the depth actually set
+        """
+        self.depth = max(0, min(self.capacity - 1, frames))
+        return self.depth
+
+    def push(self, frame: np.ndarray) -> np.ndarray | None:
+        """
+        :about: Add a frame and retrieve the delayed one.  Frames of a different size are
+                scaled to fit.
+        :param frame: the newest frame
+        :returns: the delayed frame (a view into the delay line that is valid until the next
+                  push) or None while the delay line is still filling.
+        """
+        slot = self.block[self.pushed % self.capacity]
+        if frame.shape == slot.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (self.width, self.height), dst=slot)
+        self.pushed += 1
+
+        wanted = self.pushed - 1 - self.depth
+        if wanted > self.output_seq:
+            self.output_seq = wanted
+
+        if self.output_seq < 0:
+            return None
+        return self.block[self.output_seq % self.capacity]
+
+    def __len__(self) -> int:
+        """ Number of frames waiting in the delay line. """
+        return max(0, self.pushed - 1 - self.output_seq)
@@ -0,0 +1,204 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">EncodeQueue</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import namedtuple
+from contextlib import closing
+
+import logging as log
+import os
+import sqlite3
+import time
+
+EncodeJob = namedtuple("EncodeJob", "job_id filename_no_ext delete_files segmented attempts profile")
+"""
+**Named tuple** describing a recording waiting to be encoded.  *segmented* is TRUE when
+the recording was split into segments (see *SegmentMins*) and FALSE for a single
+.mp4/.wav pair.  *attempts* counts the earlier tries that failed.  *profile* names the
+encoding profile (None for the configured *Profile*).
+"""
+
+# JOB STATES
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# SECONDS TO WAIT BEFORE RETRYING A FAILED JOB (MULTIPLIED BY THE NUMBER OF FAILURES)
+RETRY_DELAY_SECS = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename_no_ext TEXT NOT NULL,
+    delete_files    INTEGER NOT NULL,
+    segmented       INTEGER NOT NULL,
+    state           TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    not_before      REAL NOT NULL DEFAULT 0,
+    worker_pid      INTEGER,
+    last_error      TEXT,
+    queued_at       REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    profile         TEXT
+)
+"""
+
+
+def process_is_running(pid: int) -> bool:
+    """
+    :about: TRUE if a process with this id is running on this machine.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class EncodeQueue:
+    """
+    A queue of recordings waiting to be encoded, kept in a SQLite database so that it
+    survives restarts.  Recorders add jobs (see *Queue* in the [ENCODE] section of
+    pyvr.ini) and return straight away.  An
+    :py:class:`EncodeWorker<pyvr.EncodeWorker.EncodeWorker>` (encode_worker.py) takes
+    the jobs in the order they were queued.
+
+    Each call uses its own connection, so one EncodeQueue can be shared by threads and
+    any number of processes can use the same file.
+    """
+    def __init__(self, filename: str = "pyvr-encode.db") -> None:
+        """
+        :about: EncodeQueue constructor.  The database is created if it does not exist.
+        :param filename: the SQLite database holding the queue
+        """
+        self.filename: str = filename
+        with closing(self.connect()) as db:
+            db.execute(SCHEMA)
+            # QUEUES CREATED BEFORE ENCODING PROFILES EXISTED
+            if "profile" not in [column[1] for column in db.execute("PRAGMA table_info(jobs)")]:
+                db.execute("ALTER TABLE jobs ADD COLUMN profile TEXT")
+
+    def connect(self) -> sqlite3.Connection:
+        # AUTOCOMMIT.  TRANSACTIONS ARE STARTED EXPLICITLY WHERE THEY ARE NEEDED.
+        return sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+
+    def enqueue(self,
+                filename_no_ext: str,
+                delete_files: bool,
+                segmented: bool = False,
+                profile: str | None = None
+                ) -> int:
+        """
+        :about: Add a finished recording to the queue.
+        :param filename_no_ext: the name of the recording (without any extension)
+        :param delete_files: TRUE to remove the intermediate files once it is encoded
+        :param segmented: TRUE if the recording was split into segments
+        :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+        :returns: the job's id.
+        """
+        now = time.time()
+        with closing(self.connect()) as db:
+            job_id = db.execute("INSERT INTO jobs (filename_no_ext, delete_files, segmented, state, queued_at, updated_at,"
+                                " profile) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                (filename_no_ext, delete_files, segmented, QUEUED, now, now, profile)
+                                ).lastrowid
+
+        log.info(f"Queued {filename_no_ext} to be encoded (job {job_id}).")
+        return job_id
+
+    def claim(self) -> EncodeJob | None:
+        """
+        :about: Take the oldest job that is ready to run.  No other worker can take it.
+        :returns: the job or None if there is nothing to do.
+        """
+        now = time.time()
+        with closing(self.connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT job_id, filename_no_ext, delete_files, segmented, attempts, profile FROM jobs"
+                             " WHERE state = ? AND not_before <= ? ORDER BY job_id LIMIT 1",
+                             (QUEUED, now)
+                             ).fetchone()
+            if row is not None:
+                db.execute("UPDATE jobs SET state = ?, worker_pid = ?, updated_at = ? WHERE job_id = ?",
+                           (RUNNING, os.getpid(), now, row[0])
+                           )
+            db.execute("COMMIT")
+
+        if row is None:
+            return None
+        return EncodeJob(row[0], row[1], bool(row[2]), bool(row[3]), row[4], row[5])
+
+    def complete(self, job: EncodeJob) -> None:
+        """
+        :about: Record that a job finished successfully.
+        """
+        with closing(self.connect()) as db:
+            db.execute("UPDATE jobs SET state = ?, last_error = NULL, updated_at = ? WHERE job_id = ?",
+                       (DONE, time.time(), job.job_id)
+                       )
+
+    def fail(self, job: EncodeJob, error: str, retries: int) -> bool:
+        """
+        :about: Record that a job failed.  It is tried again later unless it has already
+                been tried retries more times.
+        :param job: the job that failed
+        :param error: what went wrong
+        :param retries: number of times a job may be retried
+        :returns: TRUE if the job will be retried.
+        """
+        attempts = job.attempts + 1
+        retry = attempts <= retries
+        with closing(self.connect()) as db:
+            db.execute("UPDATE jobs SET state = ?, attempts = ?, not_before = ?, last_error = ?, updated_at = ?"
+                       " WHERE job_id = ?",
+                       (QUEUED if retry else FAILED,
+                        attempts,
+                        time.time() + RETRY_DELAY_SECS * attempts,
+                        error,
+                        time.time(),
+                        job.job_id
+                        )
+                       )
+        return retry
+
+    def recover(self) -> int:
+        """
+        :about: Put jobs back in the queue if the worker running them has died.
+        :returns: the number of jobs recovered.
+        """
+        recovered = 0
+        with closing(self.connect()) as db:
+            for job_id, pid in db.execute("SELECT job_id, worker_pid FROM jobs WHERE state = ?", (RUNNING,)).fetchall():
+                if pid is None or not process_is_running(pid):
+                    db.execute("UPDATE jobs SET state = ?, updated_at = ? WHERE job_id = ? AND state = ?",
+                               (QUEUED, time.time(), job_id, RUNNING)
+                               )
+                    recovered += 1
+
+        if recovered > 0:
+            log.warning(f"Requeued {recovered} jobs left running by a worker that stopped.")
+        return recovered
+
+    def next_retry(self) -> float | None:
+        """
+        :returns: when the next queued job may be claimed (a time.time() value, possibly in
+                  the past).  None if no job is queued.
+        """
+        with closing(self.connect()) as db:
+            return db.execute("SELECT MIN(not_before) FROM jobs WHERE state = ?", (QUEUED,)).fetchone()[0]
+
+    def counts(self) -> dict:
+        """
+        :returns: the number of jobs in each state.
+        """
+        with closing(self.connect()) as db:
+            return dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
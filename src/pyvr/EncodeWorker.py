@@ -0,0 +1,126 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">EncodeWorker</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import threading as thr
+import time
+
+from .EncodeQueue import EncodeJob, EncodeQueue
+
+# SECONDS BETWEEN CHECKS OF AN EMPTY QUEUE
+POLL_SECS = 5.0
+
+
+class EncodeWorker:
+    """
+    Encodes the recordings waiting in an
+    :py:class:`EncodeQueue<pyvr.EncodeQueue.EncodeQueue>`, several at a time if asked.
+    A job that fails is retried later (up to *retries* times).  The intermediate files
+    are removed after a successful encode when the recording was made with --delete.
+
+    Jobs left running by a worker that died are put back in the queue when a worker
+    starts.  A worker that stops once the queue is empty still waits for failed jobs that
+    are due to be retried.
+
+    .. SEEALSO:: encode_worker.py
+    """
+    def __init__(self, queue: EncodeQueue, jobs: int = 1, retries: int = 3, exit_when_idle: bool = False) -> None:
+        """
+        :about: EncodeWorker constructor
+        :param queue: the jobs to run
+        :param jobs: number of recordings encoded at the same time
+        :param retries: number of times a failed job is retried
+        :param exit_when_idle: TRUE to stop once no job is queued (instead of waiting
+                               for more jobs).  Jobs waiting to be retried are still run.
+        """
+        self.queue: EncodeQueue = queue
+        self.jobs: int = max(1, jobs)
+        self.retries: int = retries
+        self.exit_when_idle: bool = exit_when_idle
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.stopping: thr.Event = thr.Event()
+        self.worker_threads: [thr.Thread] = []
+
+    def start(self) -> None:
+        """
+        :about: Start taking jobs from the queue.
+        """
+        log.info(f"Start encode worker ({self.jobs} at a time).")
+        self.queue.recover()
+        self.stopping.clear()
+        self.worker_threads = [thr.Thread(name=f"encode-worker-thread-{idx}", target=self.work)
+                               for idx in range(self.jobs)]
+        for thread in self.worker_threads:
+            thread.start()
+
+    def work(self) -> None:
+        """
+        :about: Code executed by each encode-worker-thread.  Run jobs until stopped.
+        """
+        while not self.stopping.is_set():
+            job = self.queue.claim()
+            if job is not None:
+                self.run(job)
+            elif self.exit_when_idle:
+                # A FAILED JOB IS PUT BACK WITH A DELAY.  WAIT FOR IT RATHER THAN GIVE UP ON IT.
+                retry_at = self.queue.next_retry()
+                if retry_at is None:
+                    break
+                self.stopping.wait(min(POLL_SECS, max(0.0, retry_at - time.time())))
+            else:
+                self.stopping.wait(POLL_SECS)
+
+    def run(self, job: EncodeJob) -> None:
+        """
+        :about: Encode one recording and record the outcome in the queue.
+        """
+        from . import encode_recording
+
+        log.info(f"Encode {job.filename_no_ext} (job {job.job_id}, attempt {job.attempts + 1}).")
+        try:
+            encode_recording(job.filename_no_ext, job.delete_files, job.segmented, job.profile)
+        except Exception as err:
+            log.exception(err)
+            if self.queue.fail(job, repr(err), self.retries):
+                log.warning(f"Encoding {job.filename_no_ext} failed.  It will be retried.")
+            else:
+                log.error(f"Encoding {job.filename_no_ext} failed {job.attempts + 1} times.  Giving up.")
+            return
+
+        self.queue.complete(job)
+        log.info(f"Encoded {job.filename_no_ext} (job {job.job_id}).")
+
+    def wait(self) -> None:
+        """
+        :about: Wait for the worker threads to end (see *exit_when_idle*).
+        """
+        for thread in self.worker_threads:
+            thread.join()
+
+    def stop(self) -> None:
+        """
+        :about: Stop taking jobs.  Encodes already running are finished first.
+        """
+        log.info("Stop encode worker.")
+        self.stopping.set()
+        self.wait()
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.stop()
+        return exc_type is None
@@ -0,0 +1,280 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">FfmpegMuxer</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import errno
+import logging as log
+import os
+import shutil
+import subprocess as proc
+import tempfile
+import threading as thr
+import time
+
+from .AudioInput import AudioInput
+from .configuration import load_encode_config, load_encode_profile, EncodeCfg, EncodeProfileCfg
+from .encoding import audio_codec_args, video_codec_args, FFMPEG_PROC_NAME
+from .VideoCard import VideoCard
+
+# SECONDS BETWEEN ATTEMPTS TO OPEN THE AUDIO FIFO BEFORE FFMPEG HAS OPENED ITS END.
+FIFO_OPEN_RETRY_SECS = 0.05
+
+# SECONDS ALLOWED FOR FFMPEG TO EXIT (AND FINISH WRITING ITS ERRORS) ONCE A PIPE BREAKS.
+FAILURE_WAIT_SECS = 5
+
+
+class FfmpegMuxer:
+    """
+    A FfmpegMuxer owns a single long-lived ffmpeg process that encodes and muxes the
+    recording while it is being made.  Raw BGR frames are written to ffmpeg's stdin and
+    raw PCM audio is written to a named pipe (FIFO).  The finished .mkv is ready as soon
+    as both pipes are closed and ffmpeg flushes its last frames.
+
+    If ffmpeg stops early (a bad codec option, a full disk, ...) its pipes break.  The
+    failure is logged along with ffmpeg's error output, *failed* is set so the recording
+    can be stopped and everything sent after that is discarded.
+
+    .. SEEALSO:: :py:class:`VideoStreamer<pyvr.VideoStreamer.VideoStreamer>` and
+                 :py:class:`AudioStreamer<pyvr.AudioStreamer.AudioStreamer>`
+    """
+    def __init__(self,
+                 filename: str,
+                 card: VideoCard,
+                 audio_input: AudioInput,
+                 profile: str | None = None,
+                 stop_event: thr.Event | None = None
+                 ) -> None:
+        """
+        :about: FfmpegMuxer constructor
+        :param filename: file (must end with .mkv) to store the recording in.
+        :param card: video card supplying the frames (used for the frame size and rate)
+        :param audio_input: audio device supplying the audio (used for the sample format)
+        :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+                        *StreamPreset* replaces the profile's preset so ffmpeg keeps up.
+        :param stop_event: optional event that is also set if ffmpeg fails (ie: to end the recording)
+        """
+        assert filename.endswith(".mkv")
+
+        log.info("Setup streaming muxer.")
+        encode_config = load_encode_config()
+        self.profile: dict = dict(load_encode_profile(profile))
+        if self.profile[EncodeProfileCfg.REMUX.value]:
+            raise ValueError("a remux profile cannot be used in Stream mode (the raw frames must be encoded)")
+
+        self.filename: str = filename
+        self.width: int = card.width
+        self.height: int = card.height
+        self.fps: int = card.fps
+        self.sample_rate: int = audio_input.sample_rate
+        self.channels: int = audio_input.channels
+        self.preset: str = encode_config[EncodeCfg.STREAM_PRESET]
+        self.profile[EncodeProfileCfg.PRESET.value] = self.preset
+
+        # CLOCK TIME THE FIRST FRAME SENT TO FFMPEG WAS CAPTURED.  THE AUDIO IS ALIGNED TO IT.
+        self.video_start: float | None = None
+
+        self.fifo_dir: str | None = None
+        self.audio_fifo: str | None = None
+        self.audio_pipe = None
+        self.error_file = None
+        self.process: proc.Popen | None = None
+
+        # SET WHEN FFMPEG STOPS READING ITS INPUT.  THE RECORDING SHOULD BE STOPPED.
+        self.failed: thr.Event = thr.Event()
+        self.stop_event: thr.Event | None = stop_event
+
+        log.debug(f"    - output = {self.filename}")
+        log.debug(f"    - codecs = {self.profile[EncodeProfileCfg.VIDEO_CODEC.value]}/"
+                  f"{self.profile[EncodeProfileCfg.AUDIO_CODEC.value]}")
+        log.debug(f"    - preset = {self.preset}")
+
+    def ffmpeg_args(self) -> [str]:
+        """
+        :about: Build the ffmpeg command line.  Input 0 is the raw video on stdin and input 1
+                is the raw audio on the FIFO.  The stream layout matches the one created by
+                :py:func:`combine_video_and_audio<pyvr.combine_video_and_audio>` and the codecs
+                are chosen by the encoding profile the same way.
+        """
+        return \
+            [
+                FFMPEG_PROC_NAME,
+                "-y",
+                "-loglevel", "error",
+                "-thread_queue_size", "512",
+                "-f", "rawvideo",  # video input: raw frames from the capture card
+                "-pix_fmt", "bgr24",
+                "-video_size", f"{self.width}x{self.height}",
+                "-framerate", str(self.fps),
+                "-i", "pipe:0",
+                "-thread_queue_size", "512",
+                "-f", "s16le",  # audio input: signed 16 bit little endian pcm
+                "-ar", str(self.sample_rate),
+                "-ac", str(self.channels),
+                "-i", self.audio_fifo,
+                "-map", "0:v:0",  # Use 1st video stream
+                "-map", "1:a",  # Keep all audio streams
+            ] \
+            + video_codec_args(self.profile) \
+            + audio_codec_args(self.profile) \
+            + [self.filename]  # output file name
+
+    def start(self) -> None:
+        """
+        :about: Create the audio FIFO and start the ffmpeg process.
+        """
+        log.info("Starting streaming muxer.")
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+        self.fifo_dir = tempfile.mkdtemp(prefix="pyvr-")
+        self.audio_fifo = os.path.join(self.fifo_dir, "audio.pcm")
+        os.mkfifo(self.audio_fifo)
+
+        # FFMPEG'S ERRORS ARE KEPT SO THEY CAN BE LOGGED IF IT FAILS.
+        self.error_file = open(os.path.join(self.fifo_dir, "ffmpeg.log"), "w+b")
+        self.process = proc.Popen(self.ffmpeg_args(), stdin=proc.PIPE, stderr=self.error_file)
+
+    def ffmpeg_errors(self) -> str:
+        """
+        :about: The error output of ffmpeg so far.
+        """
+        if self.error_file is None:
+            return ""
+        self.error_file.seek(0)
+        return self.error_file.read().decode(errors="replace").strip()
+
+    def pipe_broken(self, stream: str) -> None:
+        """
+        :about: ffmpeg stopped reading one of its inputs.  Log why (once) and mark the muxer
+                as failed so the recording is stopped.
+        :param stream: the input that broke (video or audio)
+        """
+        if self.failed.is_set():
+            return
+
+        try:
+            self.process.wait(timeout=FAILURE_WAIT_SECS)
+        except proc.TimeoutExpired:
+            pass
+        log.error(f"ffmpeg stopped reading the {stream} (exit code {self.process.returncode}) "
+                  f"while writing {self.filename}.  The recording is stopped.  ffmpeg reported: {self.ffmpeg_errors()}")
+        self.failed.set()
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    def write_video(self, frame: bytes, timestamp: float) -> None:
+        """
+        :about: Send a single raw BGR frame to ffmpeg.  Frame n is presented n / fps seconds
+                after the first frame.
+        :param frame: the frame (exactly width x height x 3 bytes)
+        :param timestamp: clock time the frame was captured
+        """
+        if self.failed.is_set():
+            return
+        if self.video_start is None:
+            self.video_start = timestamp
+        try:
+            self.process.stdin.write(frame)
+        except BrokenPipeError:
+            self.pipe_broken("video")
+
+    def close_video(self) -> None:
+        """
+        :about: Signal the end of the video stream.
+        """
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            self.pipe_broken("video")
+
+    def open_audio(self) -> None:
+        """
+        :about: Open the audio FIFO for writing.  This waits until ffmpeg opens the other end
+                (or fails), so it must be called from the thread that writes the audio.
+        """
+        while not self.failed.is_set():
+            try:
+                fd = os.open(self.audio_fifo, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as exc:
+                # ENXIO: FFMPEG HAS NOT OPENED ITS END YET.
+                if exc.errno != errno.ENXIO:
+                    raise
+                if self.process.poll() is not None:
+                    self.pipe_broken("audio")
+                    return
+                time.sleep(FIFO_OPEN_RETRY_SECS)
+                continue
+
+            os.set_blocking(fd, True)
+            self.audio_pipe = open(fd, "wb")
+            return
+
+    def write_audio(self, chunk: bytes) -> None:
+        """
+        :about: Send raw PCM audio to ffmpeg.
+        :param chunk: the audio data
+        """
+        if self.failed.is_set() or self.audio_pipe is None:
+            return
+        try:
+            self.audio_pipe.write(chunk)
+        except BrokenPipeError:
+            self.pipe_broken("audio")
+
+    def close_audio(self) -> None:
+        """
+        :about: Signal the end of the audio stream.
+        """
+        if self.audio_pipe is None:
+            return
+        try:
+            self.audio_pipe.close()
+        except BrokenPipeError:
+            self.pipe_broken("audio")
+
+    def finish(self) -> None:
+        """
+        :about: Wait for ffmpeg to write the rest of the file and clean up the FIFO.
+        """
+        log.info("Waiting for streaming muxer to finish.")
+        if not self.process.stdin.closed:
+            self.close_video()
+
+        if self.audio_pipe is None:
+            # AUDIO NEVER STARTED. GIVE FFMPEG AN EMPTY AUDIO STREAM SO IT DOES NOT WAIT FOREVER.
+            try:
+                os.close(os.open(self.audio_fifo, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+
+        return_code = self.process.wait()
+        errors = self.ffmpeg_errors()
+        self.error_file.close()
+        shutil.rmtree(self.fifo_dir, ignore_errors=True)
+
+        if return_code != 0 or self.failed.is_set():
+            exc = IOError(f"ffmpeg exited with code {return_code} while writing {self.filename}.  {errors}")
+            log.exception(exc)
+            raise exc
+        if errors:
+            log.warning(f"ffmpeg reported: {errors}")
+
+        log.info(f"Streaming muxer finished writing {self.filename}")
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.finish()
+        return exc_type is None
@@ -0,0 +1,403 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">FrameRing</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import namedtuple
+
+import logging as log
+import numpy as np
+import tempfile
+import threading as thr
+
+from .LazyModule import LazyModule
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+RingFrame = namedtuple("RingFrame", "seq timestamp image")
+"""
+**Named tuple** returned by the :py:class:`FrameRing<pyvr.FrameRing.FrameRing>` consumer
+api.  *seq* is the sequence number of the frame (0 is the first frame captured), *timestamp*
+is the :py:class:`MediaClock<pyvr.MediaClock.MediaClock>` time the frame was captured and
+*image* is the frame itself.
+"""
+
+
+class FrameRing:
+    """
+    A fixed capacity ring of preallocated video frame buffers.  A single producer (the
+    video-capture-thread) decodes directly into the next free slot and then publishes it.
+    Consumers never block the producer.  They ask for the next frame they have not yet
+    seen and may wait for it to arrive.
+
+    Consumers that must hold a frame while they work on it :py:meth:`acquire` it.  The
+    buffer is reference counted.  While it is held, the producer gives its slot a spare
+    buffer instead of overwriting it.  A consumer that holds many frames (such as an
+    :py:class:`AsyncFrameWriter<pyvr.AsyncFrameWriter.AsyncFrameWriter>`) reserves the
+    spares it needs up front (see :py:meth:`reserve_spares`) so that nothing is allocated
+    while capturing.
+
+    A captured frame of the wrong size is only given a new ring when no frame is held.
+    Otherwise it is scaled to the ring's size (or rejected if it cannot be).
+
+    A *compressed* ring holds frames exactly as the capture device delivered them (MJPEG,
+    see *MjpegPassthrough* in pyvr.ini).  Each slot is a byte buffer as large as an
+    uncompressed frame and each frame's image is a 1 dimensional view of just its bytes.
+
+    .. NOTE:: A frame returned by :py:meth:`frame` or :py:meth:`wait_for_frame` is a view
+              into the ring's memory.  It remains valid until the producer wraps around to
+              its slot again (capacity - 1 frames later).  Copy or acquire it if it must be
+              kept longer than that.
+    """
+    # TRUE IF THE FRAMES ARE STORED AS CAPTURED (MJPEG) INSTEAD OF AS DECODED IMAGES
+    compressed: bool = False
+
+    # TRUE IF AN ACQUIRED FRAME IS KEPT UNTIL IT IS RELEASED (HOWEVER LONG THAT IS)
+    can_hold: bool = True
+
+    def __init__(self,
+                 capacity: int,
+                 height: int,
+                 width: int,
+                 channels: int = 3,
+                 backing_dir: str | None = None,
+                 compressed: bool = False
+                 ) -> None:
+        """
+        :about: FrameRing constructor
+        :param capacity: number of frames the ring holds (must be at least 2)
+        :param height: height (in pixels) of each frame
+        :param width: width (in pixels) of each frame
+        :param channels: color channels in each frame (3 for BGR)
+        :param backing_dir: directory for a temporary file the ring's memory is mapped onto.
+                            None keeps the ring in ordinary memory.  A large ring (a
+                            pre-roll, see *PreRollSecs* in pyvr.ini) can then be paged out
+                            by the operating system instead of being held in memory.
+        :param compressed: TRUE to hold compressed frames (of up to height x width x channels
+                           bytes) instead of decoded images.
+        """
+        assert capacity >= 2
+
+        self.capacity: int = capacity
+        self.backing_dir: str | None = backing_dir
+        self.compressed = compressed
+        self.lock: thr.Lock = thr.Lock()
+        self.shape: tuple = (height * width * channels,) if compressed else (height, width, channels)
+        self.buffers: [np.ndarray] = []
+        self.slot_buffer: [int] = []
+        self.refcount: [int] = []
+        self.pinned: {int: int} = {}
+        self.orphaned: set = set()
+        self.spares: [int] = []
+        self.spares_reserved: int = 0
+        self.spares_allocated: int = 0
+        self.frames_resized: int = 0
+        self.frames_rejected: int = 0
+        self.allocate(self.shape)
+
+        self.slot_seq: [int] = [-1] * capacity
+        self.slot_timestamp: [float] = [0.0] * capacity
+        self.slot_length: [int] = [0] * capacity
+
+        # sequence number of the most recently published frame (-1 = nothing captured yet)
+        self.latest_seq: int = -1
+        self.closed: bool = False
+        self.frame_arrived: thr.Condition = thr.Condition()
+
+        # COUNTERS DESCRIBING HOW WELL CONSUMERS ARE KEEPING UP (TOTALS FOR ALL CONSUMERS, SEE count_frames)
+        self.dropped: int = 0
+        self.duplicated: int = 0
+
+    def allocate(self, shape: (int, int, int)) -> None:
+        """
+        :about: (Re)allocate the memory used by the ring (and its reserved spares).  Each
+                buffer is a view into one contiguous block so that no memory is allocated
+                while capturing.  Only called when no frame is held.
+        :param shape: shape of a single frame (height, width, channels)
+        """
+        log.debug(f"Allocate frame ring: {self.capacity} frames (and {self.spares_reserved} spares) of {shape}")
+        self.shape = shape
+        total = self.capacity + self.spares_reserved
+        if self.backing_dir is None:
+            block = np.zeros((total, *shape), dtype=np.uint8)
+        else:
+            # The file has no name, so it disappears when the mapping is released.
+            with tempfile.TemporaryFile(prefix="pyvr-frames-", dir=self.backing_dir) as backing_file:
+                block = np.memmap(backing_file, dtype=np.uint8, mode="w+", shape=(total, *shape))
+        self.buffers = [block[idx] for idx in range(total)]
+        self.slot_buffer = list(range(self.capacity))
+        self.refcount = [0] * total
+        self.pinned = {}
+        self.orphaned = set()
+        self.spares = list(range(self.capacity, total))
+
+    def reserve_spares(self, count: int) -> None:
+        """
+        :about: Make sure at least count spare buffers exist, so a consumer can hold that
+                many frames without the producer allocating memory.  Call it before
+                capturing (or at least not from the capture thread).
+        :param count: number of spare buffers wanted in all
+        """
+        with self.lock:
+            while self.spares_reserved < count:
+                self.buffers.append(np.zeros(self.shape, dtype=np.uint8))
+                self.refcount.append(0)
+                self.spares.append(len(self.buffers) - 1)
+                self.spares_reserved += 1
+        log.debug(f"Frame ring has {self.spares_reserved} spare buffers.")
+
+    def spare_buffer(self) -> int:
+        """
+        :about: A buffer no slot or consumer is using.  One is allocated if none is free (more
+                frames are held than were reserved).
+        :returns: the index of the buffer
+        """
+        if len(self.spares) > 0:
+            return self.spares.pop()
+
+        self.buffers.append(np.zeros(self.shape, dtype=np.uint8))
+        self.refcount.append(0)
+        self.spares_allocated += 1
+        if self.spares_allocated == 1:
+            log.warning(f"Frame ring allocated a spare buffer while capturing ({self.spares_reserved} reserved).")
+        return len(self.buffers) - 1
+
+    def next_slot(self) -> np.ndarray:
+        """
+        :about: The buffer the producer should decode the next frame into.  The frame that
+                was in the slot can no longer be read or acquired.
+        """
+        with self.lock:
+            idx = (self.latest_seq + 1) % self.capacity
+            self.slot_seq[idx] = -1
+
+            # A CONSUMER STILL HOLDS THE OLD FRAME.  LEAVE IT ALONE AND USE ANOTHER BUFFER.
+            if self.refcount[self.slot_buffer[idx]] > 0:
+                self.orphaned.add(self.slot_buffer[idx])
+                self.slot_buffer[idx] = self.spare_buffer()
+
+            return self.buffers[self.slot_buffer[idx]]
+
+    def commit(self, frame: np.ndarray, timestamp: float) -> int:
+        """
+        :about: Publish the frame most recently written into :py:meth:`next_slot`.
+        :param frame: the captured frame.  Normally this is the slot itself.  If the capture
+                      device allocated its own buffer, the frame is copied into the ring.
+        :param timestamp: clock time the frame was captured
+        :returns: the sequence number assigned to the frame (-1 if the frame was rejected)
+        """
+        seq = self.latest_seq + 1
+        idx = seq % self.capacity
+        slot = self.buffers[self.slot_buffer[idx]]
+        if self.compressed:
+            if not self.store_compressed(idx, frame):
+                return -1
+        elif frame is not slot:
+            if frame.shape != slot.shape:
+                if self.reallocate(frame.shape):
+                    slot = self.next_slot()
+                elif not self.resize_into(frame, slot):
+                    return -1
+            if frame.shape == slot.shape:
+                np.copyto(slot, frame)
+
+        self.slot_seq[idx] = seq
+        self.slot_timestamp[idx] = timestamp
+
+        # A single assignment publishes the frame.  Readers never take a lock to read it.
+        self.latest_seq = seq
+        with self.frame_arrived:
+            self.frame_arrived.notify_all()
+
+        return seq
+
+    def reallocate(self, shape: tuple) -> bool:
+        """
+        :about: Give the ring frames of a new shape, but only if no frame is held (a held
+                frame must stay valid).
+        :param shape: shape of a single frame
+        :returns: TRUE if the ring was reallocated.
+        """
+        with self.lock:
+            if len(self.pinned) > 0:
+                return False
+            log.warning(f"Capture size {shape} does not match frame ring {self.shape}.  Reallocating.")
+            self.allocate(shape)
+            # THE FRAMES ALREADY CAPTURED WERE IN THE OLD MEMORY.
+            self.slot_seq[:] = [-1] * self.capacity
+            return True
+
+    def resize_into(self, frame: np.ndarray, slot: np.ndarray) -> bool:
+        """
+        :about: Scale a frame of the wrong size into a slot (frames are held, so the ring
+                cannot be reallocated).
+        :returns: FALSE if the frame was rejected because it cannot be scaled into the slot.
+        """
+        if frame.ndim != slot.ndim or frame.shape[2:] != slot.shape[2:]:
+            self.reject(f"Captured frame {frame.shape} cannot be stored in frame ring {slot.shape}.")
+            return False
+
+        self.frames_resized += 1
+        if self.frames_resized == 1:
+            log.warning(f"Capture size {frame.shape} does not match frame ring {slot.shape}.  Scaling frames.")
+        cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+        return True
+
+    def reject(self, reason: str) -> None:
+        """
+        :about: Count a captured frame that is not stored (the first is logged).
+        """
+        self.frames_rejected += 1
+        if self.frames_rejected == 1:
+            log.warning(f"{reason}  The frame is skipped.")
+
+    def store_compressed(self, idx: int, frame: np.ndarray) -> bool:
+        """
+        :about: Copy a compressed frame into a slot (unless it was read straight into it) and
+                note its length.
+        :param idx: the slot
+        :param frame: the frame's bytes
+        :returns: FALSE if the frame was rejected (too large while frames are held).
+        """
+        data = frame.reshape(-1)
+        slot = self.buffers[self.slot_buffer[idx]]
+        if data.size > slot.size:
+            if not self.reallocate((data.size,)):
+                self.reject(f"Compressed frame of {data.size} bytes does not fit the frame ring ({slot.size} bytes).")
+                return False
+            slot = self.next_slot()
+
+        if data.ctypes.data != slot.ctypes.data:
+            np.copyto(slot[:data.size], data)
+        self.slot_length[idx] = data.size
+        return True
+
+    def frame(self, seq: int) -> RingFrame | None:
+        """
+        :about: Retrieve a specific frame from the ring.
+        :param seq: sequence number of the frame
+        :returns: the frame or None if it has not been captured yet or was already overwritten.
+        """
+        if seq < 0 or seq > self.latest_seq:
+            return None
+
+        idx = seq % self.capacity
+        if self.slot_seq[idx] != seq:
+            return None
+
+        if self.compressed:
+            return RingFrame(seq, self.slot_timestamp[idx], self.buffers[self.slot_buffer[idx]][:self.slot_length[idx]])
+        return RingFrame(seq, self.slot_timestamp[idx], self.buffers[self.slot_buffer[idx]])
+
+    def acquire(self, seq: int) -> RingFrame | None:
+        """
+        :about: Retrieve a frame and keep the producer from overwriting it until it is
+                :py:meth:`released<release>`.  Each acquire must be matched by a release.
+        :param seq: sequence number of the frame
+        :returns: the frame (a read-only view) or None if it is not in the ring.
+        """
+        with self.lock:
+            ring_frame = self.frame(seq)
+            if ring_frame is None:
+                return None
+
+            buffer_idx = self.slot_buffer[seq % self.capacity]
+            self.refcount[buffer_idx] += 1
+            self.pinned[seq] = buffer_idx
+
+        image = ring_frame.image.view()
+        image.flags.writeable = False
+        return RingFrame(seq, ring_frame.timestamp, image)
+
+    def release(self, seq: int) -> None:
+        """
+        :about: Give back a frame retrieved by :py:meth:`acquire`.
+        :param seq: sequence number of the frame
+        """
+        with self.lock:
+            buffer_idx = self.pinned.get(seq)
+            if buffer_idx is None:
+                return
+
+            self.refcount[buffer_idx] -= 1
+            if self.refcount[buffer_idx] == 0:
+                del self.pinned[seq]
+                if buffer_idx in self.orphaned:
+                    self.orphaned.discard(buffer_idx)
+                    self.spares.append(buffer_idx)
+
+    def latest(self) -> RingFrame | None:
+        """
+        :about: Retrieve the most recently captured frame.
+        :returns: the frame or None if nothing has been captured yet.
+        """
+        return self.frame(self.latest_seq)
+
+    def oldest_seq(self) -> int:
+        """
+        :about: Sequence number of the oldest frame that can still safely be read.  The
+                slot after the latest frame is excluded because the producer may be
+                decoding into it.
+        """
+        return max(0, self.latest_seq - self.capacity + 2)
+
+    def wait_for_frame(self, after_seq: int, timeout: float | None = None) -> RingFrame | None:
+        """
+        :about: Return the next frame the caller has not seen.  Block (up to timeout seconds)
+                if it has not been captured yet.
+        :param after_seq: sequence number of the last frame the caller received (-1 if none)
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: The next unseen frame.  If the caller fell so far behind that frames were
+                  overwritten, the oldest available frame is returned and the skipped frames
+                  are counted as dropped.  If no new frame arrives in time, the caller's last
+                  frame (or the latest one) is returned and counted as a duplicate.  None is
+                  returned only when nothing is available at all.
+        """
+        wanted = after_seq + 1
+        if self.latest_seq < wanted and not self.closed:
+            self.wait_for_seq(wanted, timeout)
+
+        if self.latest_seq < wanted:
+            result = self.frame(after_seq) or self.latest()
+            if result is not None:
+                self.count_frames(duplicated=1)
+            return result
+
+        oldest = self.oldest_seq()
+        if wanted < oldest:
+            self.count_frames(dropped=oldest - wanted)
+            wanted = oldest
+
+        return self.frame(wanted)
+
+    def count_frames(self, dropped: int = 0, duplicated: int = 0) -> None:
+        """
+        :about: Add to the dropped/duplicated totals.  Every consumer thread updates them, so
+                they are only changed while holding the ring's lock.
+        """
+        with self.lock:
+            self.dropped += dropped
+            self.duplicated += duplicated
+
+    def wait_for_seq(self, seq: int, timeout: float | None) -> None:
+        """
+        :about: Block until a frame is published (or the ring is closed).
+        :param seq: sequence number of the frame wanted
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        """
+        with self.frame_arrived:
+            self.frame_arrived.wait_for(lambda: self.latest_seq >= seq or self.closed, timeout)
+
+    def close(self) -> None:
+        """
+        :about: Wake any consumers waiting for a frame.  Used when capturing stops.
+        """
+        self.closed = True
+        with self.frame_arrived:
+            self.frame_arrived.notify_all()
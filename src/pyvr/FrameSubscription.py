@@ -0,0 +1,178 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">FrameSubscription</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import threading as thr
+
+from .FrameRing import FrameRing, RingFrame
+from .Telemetry import shared_telemetry
+
+
+class FrameSubscription:
+    """
+    One consumer's view of the frames captured by a
+    :py:class:`VideoCard<pyvr.VideoCard.VideoCard>`.  Create it with
+    :py:meth:`VideoCard.subscribe<pyvr.VideoCard.VideoCard.subscribe>`.
+
+    Each subscription keeps its own place in the frame ring.  The frame it returns is
+    acquired from the ring (so it is not overwritten) until the next frame is requested.
+    Frames are shared, read-only, by every subscriber.  Nothing is copied.  A subscription
+    with a *size* receives frames scaled to that size.  Each frame is scaled once per size
+    no matter how many subscribers ask for it.
+
+    A new subscription starts with the most recent frame.  A subscription that *rewinds*
+    starts that many frames in the past instead (as far back as the ring allows) so a
+    recording can include the moments before it was started.
+    """
+    def __init__(self,
+                 card,
+                 name: str,
+                 size: tuple[int, int] | None = None,
+                 latest_only: bool = False,
+                 rewind: int = 0,
+                 raw: bool = False
+                 ) -> None:
+        """
+        :about: FrameSubscription constructor
+        :param card: the :py:class:`VideoCard<pyvr.VideoCard.VideoCard>` supplying the frames
+        :param name: name of the subscriber (used when logging)
+        :param size: (width, height) to scale the frames to.  None for the captured size.
+        :param latest_only: TRUE to always receive the most recent frame (a preview).  FALSE
+                            to receive every frame in order (a recorder).
+        :param rewind: number of frames already captured that this subscriber should
+                       receive before the most recent one.
+        :param raw: TRUE to receive compressed frames as they were captured (see
+                    *MjpegPassthrough* in pyvr.ini).  FALSE to receive decoded images.
+        """
+        self.card = card
+        self.ring: FrameRing = card.ring
+        self.name: str = name
+        self.size: tuple[int, int] | None = None if size is None else tuple(size)
+        self.latest_only: bool = latest_only
+        self.raw: bool = raw
+
+        self.last_seq: int = -1
+        if self.ring.latest_seq >= 0:
+            self.last_seq = max(self.ring.oldest_seq(), self.ring.latest_seq - rewind) - 1
+        self.held: RingFrame | None = None
+
+        # STATISTICS (THE STATUS LINE READS THEM FROM ANOTHER THREAD, SEE count_frames)
+        self.lock: thr.Lock = thr.Lock()
+        self.frames: int = 0
+        self.dropped: int = 0
+        self.duplicated: int = 0
+
+    def next_frame(self, timeout: float | None = None) -> RingFrame | None:
+        """
+        :about: Retrieve the next frame this subscriber has not seen, waiting for it if
+                necessary.  The previous frame is released.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the frame (scaled if requested).  If no new frame arrives in time, the
+                  previous frame is returned again.  None if nothing has been captured.
+        """
+        while True:
+            after_seq = self.last_seq
+            if self.latest_only:
+                after_seq = max(after_seq, self.ring.latest_seq - 1)
+
+            ring_frame = self.ring.wait_for_frame(after_seq, timeout)
+            if ring_frame is None:
+                return None
+
+            if ring_frame.seq <= self.last_seq and self.held is not None:
+                self.count_frames(duplicated=1)
+                shared_telemetry().count("frames_duplicated", stage=self.name)
+                return self.present(self.held)
+
+            acquired = self.ring.acquire(ring_frame.seq)
+            if acquired is not None:
+                break
+
+        if not self.latest_only and self.last_seq >= 0 and acquired.seq > self.last_seq + 1:
+            self.count_frames(dropped=acquired.seq - self.last_seq - 1)
+            shared_telemetry().count("frames_dropped", acquired.seq - self.last_seq - 1, stage=self.name)
+
+        self.release()
+        self.held = acquired
+        self.last_seq = acquired.seq
+        self.frames += 1
+        return self.present(acquired)
+
+    def skip_backlog(self) -> int:
+        """
+        :about: Skip the frames waiting for this subscriber so the next one it receives is
+                the most recent.  The skipped frames are counted as dropped.
+        :returns: the number of frames skipped.
+        """
+        if self.last_seq < 0:
+            return 0
+
+        skipped = max(0, self.ring.latest_seq - 1 - self.last_seq)
+        if skipped > 0:
+            self.last_seq += skipped
+            self.count_frames(dropped=skipped)
+            shared_telemetry().count("frames_dropped", skipped, stage=self.name)
+        return skipped
+
+    def count_frames(self, dropped: int = 0, duplicated: int = 0) -> None:
+        """
+        :about: Add to this subscriber's dropped/duplicated counts (while holding its lock).
+        """
+        with self.lock:
+            self.dropped += dropped
+            self.duplicated += duplicated
+
+    def pending(self) -> int:
+        """
+        :about: Number of frames captured that this subscriber has not received yet.
+        """
+        return max(0, self.ring.latest_seq - self.last_seq)
+
+    def present(self, ring_frame: RingFrame) -> RingFrame:
+        """
+        :about: Scale a frame to the size requested by this subscriber.  Compressed frames
+                are decoded unless the subscriber asked for them raw.
+        """
+        if self.ring.compressed:
+            if self.raw:
+                return ring_frame
+            size = self.size or (self.card.width, self.card.height)
+            return RingFrame(ring_frame.seq, ring_frame.timestamp, self.card.scaled_frame(ring_frame, size))
+
+        height, width = ring_frame.image.shape[:2]
+        if self.size is None or self.size == (width, height):
+            return ring_frame
+        return RingFrame(ring_frame.seq, ring_frame.timestamp, self.card.scaled_frame(ring_frame, self.size))
+
+    def release(self) -> None:
+        """
+        :about: Give the frame this subscriber holds back to the ring.
+        """
+        if self.held is not None:
+            self.ring.release(self.held.seq)
+            self.held = None
+
+    def close(self) -> None:
+        """
+        :about: Release any frame held and stop receiving frames.
+        """
+        self.release()
+        self.card.unsubscribe(self)
+        log.info(f"Subscriber {self.name}: {self.frames} frames, {self.dropped} dropped, "
+                 f"{self.duplicated} duplicated.")
+
+    def __enter__(self):
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback):
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.close()
+        return exc_type is None
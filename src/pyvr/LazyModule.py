@@ -0,0 +1,47 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">LazyModule</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import importlib
+import logging as log
+import time
+
+
+class LazyModule:
+    """
+    Stands in for a module that is slow to import (OpenCV, the audio libraries, msutils).
+    The module is imported the first time one of its attributes is used, so importing
+    pyvr only loads what the configuration actually uses.  Only the audio library named
+    by *Library* in pyvr.ini is ever loaded, and PortAudio is not started unless it is
+    needed.
+
+    .. code-block:: python
+        :caption: Used in place of an import statement.
+
+            cv2 = LazyModule("cv2")
+    """
+    def __init__(self, name: str) -> None:
+        """
+        :about: LazyModule constructor
+        :param name: the module's name (as it would appear in an import statement)
+        """
+        self._name: str = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        """ Called only for attributes the stand-in does not have: those of the real module."""
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            log.debug(f"Imported {self._name} in {round(1000 * (time.perf_counter() - start), 1)} ms.")
+
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name} ({'not ' if self._module is None else ''}loaded)>"
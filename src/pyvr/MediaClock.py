@@ -0,0 +1,50 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">MediaClock</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import time
+
+_SHARED_CLOCK = None
+
+
+class MediaClock:
+    """
+    A monotonic clock shared by every capture and recording thread.  Video frames and
+    audio periods are stamped with the same clock so that the recordings can be lined
+    up (and drift measured) afterwards.  Times are in seconds since the clock's epoch.
+    """
+    def __init__(self) -> None:
+        """
+        :about: MediaClock constructor.  The epoch is the moment the clock was created.
+        """
+        self.epoch: float = time.monotonic()
+
+    def now(self) -> float:
+        """
+        :about: Current time.
+        :returns: seconds since the epoch.
+        """
+        return time.monotonic() - self.epoch
+
+    def to_monotonic(self, clock_time: float) -> float:
+        """
+        :about: Convert a time from this clock to :py:func:`time.monotonic` time.
+        :param clock_time: seconds since the epoch
+        """
+        return clock_time + self.epoch
+
+
+def shared_clock() -> MediaClock:
+    """
+    :about: Retrieve the clock shared by the whole process (created on first use).
+    """
+    global _SHARED_CLOCK
+    if _SHARED_CLOCK is None:
+        _SHARED_CLOCK = MediaClock()
+    return _SHARED_CLOCK
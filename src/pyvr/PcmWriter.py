@@ -0,0 +1,177 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">PcmWriter</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import os
+import struct
+
+# THE FILE IS GROWN THIS MANY BYTES AT A TIME (ABOUT 6 MINUTES OF 48KHZ STEREO AUDIO)
+EXTENT_BYTES = 64 * 2**20
+
+# SECONDS OF AUDIO WRITTEN BETWEEN HEADER UPDATES
+HEADER_UPDATE_SECS = 1.0
+
+# LARGEST SIZE A RIFF HEADER CAN HOLD.  LARGER FILES ARE WRITTEN AS RF64.
+RIFF_LIMIT = 0xFFFFFFFF
+
+# HEADER LAYOUT (EBU TECH 3306).  A JUNK CHUNK RESERVES ROOM FOR THE ds64 CHUNK SO THE
+# FILE CAN BECOME RF64 WITHOUT MOVING THE AUDIO.
+DS64_OFFSET = 12
+FMT_OFFSET = 48
+DATA_SIZE_OFFSET = 76
+HEADER_BYTES = 80
+
+
+class PcmWriter:
+    """
+    Writes 16 bit PCM audio to a .wav file.  Unlike the wave module, the header is kept
+    correct while recording: it is rewritten every HEADER_UPDATE_SECS of audio, so a
+    recording that is cut short by a crash is still a valid file missing only its last
+    second.  Recordings over 4GB are written as RF64.
+
+    The file is grown EXTENT_BYTES at a time (with posix_fallocate where it is available)
+    and each chunk is written with a single os.pwrite.  Unused space at the end of the
+    last extent is removed when the file is closed.
+    """
+    def __init__(self, filename: str, channels: int, sample_rate: int, sample_width: int = 2) -> None:
+        """
+        :about: PcmWriter constructor
+        :param filename: the .wav file to create
+        :param channels: number of audio channels
+        :param sample_rate: frames per second
+        :param sample_width: bytes per sample
+        """
+        self.filename: str = filename
+        self.channels: int = channels
+        self.sample_rate: int = sample_rate
+        self.sample_width: int = sample_width
+        self.frame_bytes: int = channels * sample_width
+
+        # MEMBERS USED TO INTERACT WITH THE DISK
+        self.fd: int | None = None
+        self.data_bytes: int = 0
+        self.allocated_bytes: int = 0
+        self.header_bytes: int = 0
+        self.rf64: bool = False
+        self.header_interval: int = int(HEADER_UPDATE_SECS * sample_rate) * self.frame_bytes
+
+    @property
+    def frames_written(self) -> int:
+        return self.data_bytes // self.frame_bytes
+
+    def open(self) -> None:
+        """
+        :about: Create the file and write its header.
+        """
+        log.debug(f"Writing PCM audio to {self.filename}")
+        self.fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.data_bytes = self.allocated_bytes = self.header_bytes = 0
+        self.rf64 = False
+
+        fmt = struct.pack("<4sIHHIIHH",
+                          b"fmt ",
+                          16,
+                          1,  # PCM
+                          self.channels,
+                          self.sample_rate,
+                          self.sample_rate * self.frame_bytes,
+                          self.frame_bytes,
+                          8 * self.sample_width
+                          )
+        header = (struct.pack("<4sI4s", b"RIFF", HEADER_BYTES - 8, b"WAVE")
+                  + struct.pack("<4sI", b"JUNK", 28) + bytes(28)
+                  + fmt
+                  + struct.pack("<4sI", b"data", 0))
+        assert len(header) == HEADER_BYTES
+        os.pwrite(self.fd, header, 0)
+
+    def write(self, data) -> None:
+        """
+        :about: Append audio to the file.
+        :param data: whole frames of audio (bytes or any object supporting the buffer protocol)
+        """
+        data = memoryview(data).cast("B")
+        end = self.data_bytes + len(data)
+        if end > self.allocated_bytes:
+            self.allocate(end)
+
+        written = 0
+        while written < len(data):
+            written += os.pwrite(self.fd, data[written:], HEADER_BYTES + self.data_bytes + written)
+        self.data_bytes = end
+
+        if self.data_bytes - self.header_bytes >= self.header_interval:
+            self.update_header()
+
+    def write_silence(self, frames: int) -> None:
+        """
+        :about: Append silence to the file.
+        :param frames: number of frames of silence
+        """
+        self.write(bytes(frames * self.frame_bytes))
+
+    def allocate(self, needed: int) -> None:
+        """
+        :about: Grow the file by whole extents until it can hold needed bytes of audio.
+        """
+        grow_to = (needed // EXTENT_BYTES + 1) * EXTENT_BYTES
+        try:
+            os.posix_fallocate(self.fd, HEADER_BYTES + self.allocated_bytes, grow_to - self.allocated_bytes)
+        except (AttributeError, OSError) as err:
+            # NOT SUPPORTED BY THIS PLATFORM OR FILE SYSTEM.  THE FILE GROWS AS IT IS WRITTEN.
+            log.debug(f"Unable to preallocate {self.filename}: {err}")
+        self.allocated_bytes = grow_to
+
+    def update_header(self) -> None:
+        """
+        :about: Record the amount of audio written in the header.  The audio is always
+                written before the header that describes it.
+        """
+        riff_bytes = HEADER_BYTES - 8 + self.data_bytes
+        if riff_bytes > RIFF_LIMIT:
+            ds64 = struct.pack("<QQQI", riff_bytes, self.data_bytes, self.frames_written, 0)
+            os.pwrite(self.fd, ds64, DS64_OFFSET + 8)
+            if not self.rf64:
+                log.info(f"{self.filename} is over 4GB.  Switching to RF64.")
+                os.pwrite(self.fd, b"ds64", DS64_OFFSET)
+                os.pwrite(self.fd, struct.pack("<I", RIFF_LIMIT), DATA_SIZE_OFFSET)
+                os.pwrite(self.fd, struct.pack("<4sI", b"RF64", RIFF_LIMIT), 0)
+                self.rf64 = True
+        else:
+            os.pwrite(self.fd, struct.pack("<I", self.data_bytes), DATA_SIZE_OFFSET)
+            os.pwrite(self.fd, struct.pack("<I", riff_bytes), 4)
+
+        self.header_bytes = self.data_bytes
+
+    def close(self) -> None:
+        """
+        :about: Write the final header, remove the unused part of the last extent and
+                close the file.
+        """
+        if self.fd is None:
+            return
+
+        self.update_header()
+        os.ftruncate(self.fd, HEADER_BYTES + self.data_bytes)
+        os.close(self.fd)
+        self.fd = None
+        log.debug(f"Wrote {self.frames_written} frames to {self.filename}")
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.close()
+        return exc_type is None
@@ -0,0 +1,141 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">PreviewStage</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import time
+
+from .DeadlineScheduler import DeadlineScheduler, PacingPolicy
+from .FrameRing import RingFrame
+from .LazyModule import LazyModule
+from .Telemetry import shared_telemetry
+from .VideoCard import VideoCard
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+# THE KEY THAT ENDS A PREVIEW
+ESCAPE_KEY = 27
+
+
+class PreviewStage:
+    """
+    Shows a small, reduced rate copy of the video being captured.  The preview is updated
+    at most once each *interval* seconds (IntervalInSecs in the [PREVIEW] section of
+    pyvr.ini) however fast the video is captured, and only when a new frame has arrived.
+    A tick with nothing new costs one check of the
+    :py:class:`FrameRing<pyvr.FrameRing.FrameRing>`.  A frame that is shown is scaled
+    once by the :py:class:`VideoCard<pyvr.VideoCard.VideoCard>` (see
+    :py:func:`resize_image(...)<pyvr.imaging.resize_image>`) and not at all when it is
+    already the size of the window.
+
+    .. code-block:: python
+
+        with PreviewStage(vc, (640, 360), 0.1) as preview:
+            while preview.wait():
+                if not preview.show("Preview"):
+                    break
+    """
+    def __init__(self, card: VideoCard, size: (int, int), interval: float, name: str = "preview") -> None:
+        """
+        :about: PreviewStage constructor
+        :param card: video card supplying the frames
+        :param size: (width, height) of the preview
+        :param interval: fewest seconds between updates.  Never less than one frame.
+        :param name: name of the preview (used for its subscription and statistics)
+        """
+        self.card: VideoCard = card
+        self.size: (int, int) = size
+        self.name: str = name
+        self.interval: float = max(interval, 1 / card.fps) if card.fps > 0 else interval
+
+        # STATISTICS
+        self.frames_shown: int = 0
+        self.frames_skipped: int = 0
+        self.idle_ticks: int = 0
+        self.last_seq: int = -1
+
+        self.scheduler: DeadlineScheduler = DeadlineScheduler(self.interval, card.clock, PacingPolicy.SKIP, name=name)
+        self.subscription = None
+
+    def start(self) -> None:
+        """
+        :about: Subscribe to the most recent frames from the video card.
+        """
+        log.info(f"Preview {self.size[0]}x{self.size[1]} at most {round(1 / self.interval, 1)} frames/second.")
+        self.subscription = self.card.subscribe(self.name, self.size, latest_only=True)
+
+    def wait(self) -> bool:
+        """
+        :about: Sleep until the preview is next due.
+        :returns: FALSE once the preview has been stopped.
+        """
+        return self.scheduler.wait() is not None
+
+    def new_frame(self) -> RingFrame | None:
+        """
+        :about: The most recent frame, scaled to the size of the preview.
+        :returns: the frame or None if nothing new has been captured since the last one.
+        """
+        if self.subscription.pending() == 0:
+            self.idle_ticks += 1
+            return None
+
+        frame = self.subscription.next_frame(timeout=0)
+        if frame is None or frame.seq == self.last_seq:
+            self.idle_ticks += 1
+            return None
+
+        if self.last_seq >= 0 and frame.seq > self.last_seq + 1:
+            self.frames_skipped += frame.seq - self.last_seq - 1
+            shared_telemetry().count("preview_frames_skipped", frame.seq - self.last_seq - 1, stage=self.name)
+        self.last_seq = frame.seq
+        self.frames_shown += 1
+        shared_telemetry().count("preview_frames_shown", stage=self.name)
+        return frame
+
+    def show(self, window: str) -> bool:
+        """
+        :about: Show the most recent frame (if there is a new one) and handle key presses.
+        :param window: title of the window to show it in
+        :returns: FALSE if the escape key was pressed.
+        """
+        began = time.perf_counter()
+        frame = self.new_frame()
+        if frame is not None:
+            cv2.imshow(window, frame.image)
+            shared_telemetry().observe("preview_render", 1000 * (time.perf_counter() - began), stage=self.name)
+
+        keypress = cv2.waitKey(1)
+        return keypress & 0xFF != ESCAPE_KEY
+
+    def stop(self) -> None:
+        """
+        :about: Stop the preview and release the last frame shown.
+        """
+        self.scheduler.stop()
+        if self.subscription is not None:
+            self.subscription.close()
+            self.subscription = None
+
+        log.info(f"Preview showed {self.frames_shown} frames. ({self.frames_skipped} frames not shown, "
+                 f"{self.idle_ticks} updates with no new frame)")
+        self.scheduler.log_stats()
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.stop()
+        return exc_type is None
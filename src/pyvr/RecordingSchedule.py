@@ -0,0 +1,159 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">RecordingSchedule</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from collections import namedtuple
+
+import datetime as dt
+import logging as log
+import threading as thr
+import time
+
+ScheduledRecording = namedtuple("ScheduledRecording",
+                                "filename_no_ext start_at stop_at delete_files profile",
+                                defaults=(None,)
+                                )
+"""
+**Named tuple** describing one recording in a
+:py:class:`RecordingSchedule<pyvr.RecordingSchedule.RecordingSchedule>`.  *start_at* and
+*stop_at* are wall clock times (datetime).  A *start_at* of None starts immediately and a
+*stop_at* of None records until the recording is stopped by hand.  *profile* names the
+encoding profile (None for the configured *Profile*).
+"""
+
+# SECONDS THE CAPTURE DEVICES ARE OPENED BEFORE THE FIRST RECORDING STARTS
+WARM_UP_SECS = 5.0
+
+# A LONG WAIT IS CHECKED AGAINST THE WALL CLOCK THIS OFTEN IN CASE THE CLOCK WAS ADJUSTED
+RESYNC_SECS = 60.0
+
+
+def monotonic_deadline(when: dt.datetime) -> float:
+    """
+    :about: Convert a wall clock time into a time.monotonic() deadline.
+    """
+    return time.monotonic() + (when - dt.datetime.now()).total_seconds()
+
+
+class RecordingSchedule:
+    """
+    A queue of recordings made one after another by a single process.  The capture devices
+    are opened once (WARM_UP_SECS, or the pre-roll if longer, before the first start) and
+    stay open between recordings.
+
+    Waits are timed against time.monotonic() deadlines, so a recording starts within a
+    few milliseconds of the requested instant.  A long wait is re-checked against the wall
+    clock every RESYNC_SECS in case the clock is adjusted.  Recordings stop on a timer that
+    does not depend on the preview (see :py:meth:`stop_timer`).
+    """
+    def __init__(self, warm_up_secs: float = WARM_UP_SECS) -> None:
+        """
+        :about: RecordingSchedule constructor
+        :param warm_up_secs: seconds the devices are opened before the first start
+        """
+        self.warm_up_secs: float = warm_up_secs
+        self.queue: [ScheduledRecording] = []
+        self.cancelled: thr.Event = thr.Event()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def add(self, recording: ScheduledRecording) -> None:
+        """
+        :about: Add a recording to the schedule.  Recordings are made in order of start time.
+        """
+        now = dt.datetime.now()
+        self.queue.append(recording)
+        self.queue.sort(key=lambda rec: rec.start_at or now)
+
+        for earlier, later in zip(self.queue, self.queue[1:]):
+            if earlier.stop_at is None or earlier.stop_at > (later.start_at or now):
+                log.warning(f"{earlier.filename_no_ext} overlaps {later.filename_no_ext}. "
+                            f"{later.filename_no_ext} starts when {earlier.filename_no_ext} ends.")
+
+        log.info(f"Scheduled {recording.filename_no_ext}: {recording.start_at} to {recording.stop_at}")
+
+    def next_recording(self) -> ScheduledRecording | None:
+        """
+        :about: Remove the next recording from the schedule.
+        :returns: the recording or None if the schedule is empty.
+        """
+        return self.queue.pop(0) if self.queue else None
+
+    def warm_up_at(self, pre_roll_secs: float = 0.0) -> dt.datetime | None:
+        """
+        :about: When to open the capture devices.
+        :param pre_roll_secs: seconds of capture kept before each start (see *PreRollSecs*)
+        :returns: the time or None if the first recording starts immediately.
+        """
+        if not self.queue or self.queue[0].start_at is None:
+            return None
+        return self.queue[0].start_at - dt.timedelta(seconds=max(self.warm_up_secs, pre_roll_secs))
+
+    def wait_until(self, when: dt.datetime | None) -> bool:
+        """
+        :about: Sleep until a wall clock time.
+        :param when: the time.  None (or a time already passed) returns immediately.
+        :returns: TRUE when the time arrives, FALSE if the schedule was cancelled.
+        """
+        return self.wait_for(when, self.cancelled)
+
+    @staticmethod
+    def wait_for(when: dt.datetime | None, cancelled: thr.Event) -> bool:
+        """
+        :about: Sleep until a wall clock time unless an event is set first.
+        :param when: the time.  None (or a time already passed) returns immediately.
+        :param cancelled: event that ends the wait early
+        :returns: TRUE when the time arrives, FALSE if the event was set.
+        """
+        if when is None:
+            return not cancelled.is_set()
+
+        deadline = monotonic_deadline(when)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            if cancelled.wait(min(remaining, RESYNC_SECS)):
+                return False
+
+            if remaining > RESYNC_SECS:
+                deadline = monotonic_deadline(when)
+
+        log.debug(f"Reached {when} ({round(1000 * (time.monotonic() - deadline), 3)} ms late)")
+        return not cancelled.is_set()
+
+    def stop_timer(self, recording: ScheduledRecording, stop_recording) -> thr.Event | None:
+        """
+        :about: Start a thread that ends a recording at its stop time.
+        :param recording: the recording
+        :param stop_recording: function (taking no arguments) called at the stop time
+        :returns: an event to set if the recording ends early or None if the recording has
+                  no stop time.
+        """
+        if recording.stop_at is None:
+            return None
+
+        cancelled = thr.Event()
+
+        def stop_when_due() -> None:
+            if self.wait_for(recording.stop_at, cancelled):
+                log.info(f"Stop time reached for {recording.filename_no_ext}.")
+                stop_recording()
+
+        thr.Thread(name="recording-stop-thread", daemon=True, target=stop_when_due).start()
+        return cancelled
+
+    def cancel(self) -> None:
+        """
+        :about: Stop waiting.  No further recordings are started.
+        """
+        self.cancelled.set()
+        self.queue.clear()
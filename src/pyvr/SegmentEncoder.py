@@ -0,0 +1,172 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">SegmentEncoder</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from typing import Self
+
+import logging as log
+import os
+import queue
+import subprocess as proc
+import threading as thr
+
+from .encoding import join_segments
+from .SegmentManifest import SegmentManifest, AUDIO, VIDEO
+from .TimingLog import timing_filename
+
+
+class SegmentEncoder:
+    """
+    Encodes the segments of a recording (see
+    :py:class:`SegmentManifest<pyvr.SegmentManifest.SegmentManifest>`) in the background
+    as each one is closed, so only the last segment is left to encode when the recording
+    stops.  :py:meth:`finish` then joins the encoded segments (without re-encoding them)
+    into the final .mkv file.
+
+    A segment that cannot be encoded is recorded as failed in the manifest (its files are
+    kept) and encoded again by :py:meth:`finish`.  If it still fails no final file is made
+    and an IOError is raised, so the recording can be resumed later (see
+    :py:func:`resume_recording(...)<pyvr.resume_recording>`).  Only a segment that was
+    interrupted by a crash is left out when it cannot be read.
+    """
+    def __init__(self,
+                 manifest: SegmentManifest,
+                 resulting_file: str,
+                 delete_files: bool,
+                 profile: str | None = None
+                 ) -> None:
+        """
+        :about: SegmentEncoder constructor
+        :param manifest: the segments to encode
+        :param resulting_file: store the finished recording in this filename (must end in .mkv)
+        :param delete_files: TRUE to remove the segment files once they are no longer needed
+        :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+        """
+        assert resulting_file.endswith(".mkv")
+
+        self.manifest: SegmentManifest = manifest
+        self.resulting_file: str = resulting_file
+        self.delete_files: bool = delete_files
+        self.profile: str | None = profile
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.ready: queue.Queue = queue.Queue()
+        self.encode_thread: thr.Thread | None = None
+        self.manifest.on_ready = self.ready.put
+
+    def start(self) -> None:
+        """
+        :about: Start encoding segments as they are closed.  Segments already closed (when
+                finishing an interrupted recording) are encoded first.
+        """
+        for index in self.manifest.ready_segments():
+            self.ready.put(index)
+
+        self.encode_thread = thr.Thread(name="segment-encode-thread", target=self.encode_segments)
+        self.encode_thread.start()
+
+    def encode_segments(self) -> None:
+        """
+        :about: Code executed by the segment-encode-thread.  Encode each segment as it is
+                closed until :py:meth:`finish` is called.
+        """
+        log.info("segment-encode-thread has started.")
+        while (index := self.ready.get()) is not None:
+            self.encode_segment(index)
+
+    def encode_segment(self, index: int) -> bool:
+        """
+        :about: Encode one segment's video and audio into its own .mkv file.
+        :param index: the segment (the first is 1)
+        :returns: TRUE if the segment was encoded.
+        """
+        from . import combine_video_and_audio
+
+        segment = self.manifest.segment(index)
+        encoded_file = f"{os.path.splitext(segment[VIDEO])[0]}.mkv"
+        log.info(f"Encode segment {index} of {self.manifest.name}.")
+        try:
+            if os.path.isfile(encoded_file):
+                os.remove(encoded_file)
+            combine_video_and_audio(segment[VIDEO], segment[AUDIO], encoded_file, self.profile)
+            if not os.path.isfile(encoded_file):
+                raise IOError(f"Encoding did not create {encoded_file}.")
+        except (AssertionError, OSError, proc.CalledProcessError) as err:
+            log.error(f"Unable to encode segment {index} of {self.manifest.name}.  It will be tried again.")
+            log.exception(err)
+            self.manifest.mark_failed(index, repr(err))
+            return False
+
+        self.manifest.mark_encoded(index, encoded_file)
+        if self.delete_files:
+            self.remove_files(segment[VIDEO], segment[AUDIO])
+        return True
+
+    def finish(self) -> None:
+        """
+        :about: Wait for the last segments to be encoded, encode again any that failed,
+                then join them into the final file.
+        :raises IOError: if a complete segment still cannot be encoded.  Nothing is joined
+                         and every segment's files are kept.
+        :Side Effect: Creation of the .mkv file recording the requested audio and video.
+        """
+        self.ready.put(None)
+        if self.encode_thread is not None:
+            self.encode_thread.join()
+
+        # SEGMENTS THAT FAILED (OR WERE NEVER TRIED) GET ONE MORE ATTEMPT.
+        failed = [index for index in self.manifest.ready_segments() if not self.encode_segment(index)]
+        lost = [index for index in failed if not self.manifest.segment(index).get("interrupted", False)]
+        if len(lost) > 0:
+            raise IOError(f"Unable to encode segments {lost} of {self.manifest.name}.  "
+                          f"Their files are kept so the recording can be resumed.")
+
+        # A RECORDER CAN STOP JUST AFTER A BOUNDARY, LEAVING A FEW MOMENTS IN A SEGMENT WITH ONLY ONE PART.
+        encoded_files = [segment["encoded"] for segment in self.manifest.segments if segment["encoded"] is not None]
+        for segment in self.manifest.segments:
+            if segment["encoded"] is None:
+                log.warning(f"Segment {segment['index']} of {self.manifest.name} was not encoded "
+                            f"(closed: {', '.join(segment['closed']) or 'nothing'}).")
+
+        if len(encoded_files) == 0:
+            raise IOError(f"No segments of {self.manifest.name} were encoded.")
+
+        log.info(f"Join {len(encoded_files)} segments into {self.resulting_file}.")
+        if os.path.isfile(self.resulting_file):
+            os.remove(self.resulting_file)
+        join_segments(encoded_files, self.resulting_file)
+        self.manifest.mark_complete()
+
+        if self.delete_files:
+            self.remove_files(*encoded_files)
+            for segment in self.manifest.segments:
+                self.remove_files(segment[VIDEO], segment[AUDIO])
+            self.manifest.remove()
+
+        log.info(f"Process complete. Results stored in {self.resulting_file}")
+
+    @staticmethod
+    def remove_files(*media_files: str) -> None:
+        """
+        :about: Remove segment files (and their timing sidecars) that exist.
+        """
+        for media_file in media_files:
+            for filename in (media_file, timing_filename(media_file)):
+                if os.path.isfile(filename):
+                    os.remove(filename)
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.finish()
+        return exc_type is None
@@ -0,0 +1,208 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">SegmentManifest</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import json
+import logging as log
+import os
+import threading as thr
+
+MANIFEST_EXT = "segments.json"
+
+# THE PARTS OF A SEGMENT.  A SEGMENT IS READY TO ENCODE WHEN BOTH ARE CLOSED.
+VIDEO = "video"
+AUDIO = "audio"
+
+
+def manifest_filename(filename_no_ext: str) -> str:
+    """
+    :about: Name of the manifest that lists the segments of a recording.
+    :param filename_no_ext: the name of the recording (without any extension)
+    :returns: the manifest filename (ie: recording.segments.json)
+    """
+    return f"{filename_no_ext}.{MANIFEST_EXT}"
+
+
+class SegmentManifest:
+    """
+    Splits a recording into segments of *SegmentMins* minutes (see the [ENCODE] section of
+    pyvr.ini) and keeps a manifest of them on disk.  The
+    :py:class:`VideoRecorder<pyvr.VideoRecorder.VideoRecorder>` and
+    :py:class:`AudioRecorder<pyvr.AudioRecorder.AudioRecorder>` both cut at the same
+    :py:class:`MediaClock<pyvr.MediaClock.MediaClock>` times.  The video is cut at the
+    first frame captured at or after the boundary (a new file always starts with a
+    keyframe) and the audio is cut at the sample captured at the boundary.
+
+    The manifest is rewritten (atomically) whenever a segment is closed or encoded, so
+    an interrupted recording can be finished later from the segments it lists.
+
+    .. code-block:: json
+        :caption: recording.segments.json
+
+            {"name": "recording", "segment_secs": 600.0, "start_time": 12.5, "complete": false,
+             "segments": [{"index": 1, "video": "recording.seg0001.mp4", "audio": "recording.seg0001.wav",
+                           "closed": ["video", "audio"], "encoded": "recording.seg0001.mkv", "failed": null}]}
+    """
+    def __init__(self, filename_no_ext: str, segment_secs: float, start_time: float = 0.0) -> None:
+        """
+        :about: SegmentManifest constructor
+        :param filename_no_ext: the name of the recording (without any extension)
+        :param segment_secs: length of each segment
+        :param start_time: clock time the first segment starts
+        """
+        self.name: str = filename_no_ext
+        self.filename: str = manifest_filename(filename_no_ext)
+        self.segment_secs: float = segment_secs
+        self.start_time: float = start_time
+        self.complete: bool = False
+        self.segments: [dict] = []
+
+        # CALLED (WITH THE SEGMENT'S INDEX) WHEN BOTH PARTS OF A SEGMENT ARE CLOSED
+        self.on_ready = None
+
+        # BOTH RECORDER THREADS AND THE ENCODER UPDATE THE MANIFEST
+        self.lock: thr.Lock = thr.Lock()
+
+    @staticmethod
+    def load(filename_no_ext: str):
+        """
+        :about: Read the manifest of an earlier recording.
+        :param filename_no_ext: the name of the recording (without any extension)
+        :returns: the SegmentManifest
+        """
+        with open(manifest_filename(filename_no_ext), "r") as f:
+            saved = json.load(f)
+
+        manifest = SegmentManifest(saved["name"], saved["segment_secs"], saved["start_time"])
+        manifest.complete = saved["complete"]
+        manifest.segments = saved["segments"]
+        return manifest
+
+    def save(self) -> None:
+        """
+        :about: Write the manifest.  A crash never leaves a partly written manifest.
+        """
+        with self.lock:
+            contents = json.dumps({"name": self.name,
+                                   "segment_secs": self.segment_secs,
+                                   "start_time": self.start_time,
+                                   "complete": self.complete,
+                                   "segments": self.segments
+                                   }, indent=4)
+
+            with open(f"{self.filename}.tmp", "w") as f:
+                f.write(contents)
+            os.replace(f"{self.filename}.tmp", self.filename)
+
+    def boundary(self, index: int) -> float:
+        """
+        :about: Clock time a segment ends (and the next one starts).
+        :param index: the segment (the first is 1)
+        """
+        return self.start_time + index * self.segment_secs
+
+    def segment(self, index: int) -> dict:
+        """
+        :about: Describe a segment, adding it to the manifest if it is new.
+        :param index: the segment (the first is 1)
+        :returns: the segment's entry in the manifest.
+        """
+        with self.lock:
+            while len(self.segments) < index:
+                idx = len(self.segments) + 1
+                self.segments.append({"index": idx,
+                                      VIDEO: f"{self.name}.seg{idx:04}.mp4",
+                                      AUDIO: f"{self.name}.seg{idx:04}.wav",
+                                      "closed": [],
+                                      "encoded": None,
+                                      "failed": None
+                                      })
+            return self.segments[index - 1]
+
+    def open_segment(self, index: int, part: str) -> str:
+        """
+        :about: Called by a recorder as it starts writing a segment.
+        :param index: the segment (the first is 1)
+        :param part: VIDEO or AUDIO
+        :returns: the file to write.
+        """
+        filename = self.segment(index)[part]
+        self.save()
+        log.info(f"Recording {part} segment {index} to {filename}")
+        return filename
+
+    def close_segment(self, index: int, part: str) -> None:
+        """
+        :about: Called by a recorder once it has finished writing a segment.
+        :param index: the segment (the first is 1)
+        :param part: VIDEO or AUDIO
+        """
+        segment = self.segment(index)
+        with self.lock:
+            segment["closed"].append(part)
+            ready = VIDEO in segment["closed"] and AUDIO in segment["closed"]
+        self.save()
+
+        if ready:
+            log.info(f"Segment {index} of {self.name} is complete.")
+            if self.on_ready is not None:
+                self.on_ready(index)
+
+    def mark_encoded(self, index: int, encoded_file: str) -> None:
+        """
+        :about: Record the file a segment was encoded into.
+        :param index: the segment (the first is 1)
+        :param encoded_file: the encoded file
+        """
+        segment = self.segment(index)
+        with self.lock:
+            segment["encoded"] = encoded_file
+            segment["failed"] = None
+        self.save()
+
+    def mark_failed(self, index: int, error: str) -> None:
+        """
+        :about: Record that a segment could not be encoded.  Its files are kept so it can be
+                encoded again.
+        :param index: the segment (the first is 1)
+        :param error: what went wrong
+        """
+        segment = self.segment(index)
+        with self.lock:
+            segment["failed"] = error
+        self.save()
+
+    def failed_segments(self) -> [int]:
+        """
+        :returns: the segments whose last encode failed.
+        """
+        with self.lock:
+            return [seg["index"] for seg in self.segments if seg.get("failed") is not None and seg["encoded"] is None]
+
+    def ready_segments(self) -> [int]:
+        """
+        :returns: the segments that are closed but not yet encoded.
+        """
+        with self.lock:
+            return [seg["index"] for seg in self.segments
+                    if VIDEO in seg["closed"] and AUDIO in seg["closed"] and seg["encoded"] is None]
+
+    def mark_complete(self) -> None:
+        """
+        :about: Record that the final file was made from the segments.
+        """
+        self.complete = True
+        self.save()
+
+    def remove(self) -> None:
+        """
+        :about: Delete the manifest.
+        """
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
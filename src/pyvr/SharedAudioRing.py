@@ -0,0 +1,218 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">SharedAudioRing</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import numpy as np
+import time
+
+from .AudioChannel import AudioChunk
+from .sharedmem import aligned, attach_shared_memory, create_shared_memory, release_shared_memory, shared_array
+
+# LAYOUT OF THE HEADER AT THE START OF THE SHARED MEMORY (INDEXES INTO AN int64 ARRAY)
+HDR_CAPACITY = 0
+HDR_FRAME_BYTES = 1
+HDR_SAMPLE_RATE = 2
+HDR_CHANNELS = 3
+HDR_WRITE_POS = 4
+HDR_CLOSED = 5
+HDR_WRITE_TIME_NS = 6  # MediaClock time of the last sample written (nanoseconds)
+HDR_EPOCH_NS = 7  # epoch of the daemon's MediaClock (time.monotonic_ns)
+HDR_FIELDS = 8
+
+# LONGEST AN ATTACHED PROCESS SLEEPS BEFORE CHECKING FOR NEW AUDIO
+POLL_SECS = 0.005
+
+
+class SharedAudioRing:
+    """
+    A ring of raw audio bytes kept in named shared memory.  The capture daemon writes each
+    period of audio into it and never waits.  Any number of processes attach to it.  Each
+    keeps its own read position and receives every byte written after it attached.  It
+    offers the same consumer interface as
+    :py:class:`AudioChannel<pyvr.AudioChannel.AudioChannel>` so the
+    :py:class:`AudioHandler<pyvr.AudioHandler.AudioHandler>` classes work with it.
+
+    A reader that falls more than a full ring behind loses the oldest audio.  The loss is
+    counted as an overflow.
+
+    A reader in a pre-roll does nothing until :py:meth:`end_pre_roll`.  It then rewinds to
+    include the audio the daemon published during the window, even from before it attached.
+    """
+    def __init__(self,
+                 name: str,
+                 create: bool = False,
+                 capacity: int = 0,
+                 frame_bytes: int = 0,
+                 sample_rate: int = 0,
+                 channels: int = 0,
+                 epoch: float = 0.0
+                 ) -> None:
+        """
+        :about: SharedAudioRing constructor
+        :param name: name of the shared memory
+        :param create: TRUE to create the ring (the capture daemon).  FALSE to attach to it.
+        :param capacity: size of the ring in bytes (when creating).  Rounded down to a whole
+                         number of frames.
+        :param frame_bytes: size of one audio frame in bytes (when creating)
+        :param sample_rate: audio frames per second (when creating)
+        :param channels: number of audio channels (when creating)
+        :param epoch: epoch of the capture daemon's :py:class:`MediaClock<pyvr.MediaClock.MediaClock>` (when creating)
+        """
+        self.name: str = name
+        self.owner: bool = create
+
+        header_bytes = aligned(HDR_FIELDS * 8)
+        if create:
+            capacity -= capacity % frame_bytes
+            assert capacity > 0
+            self.shm = create_shared_memory(name, header_bytes + capacity)
+        else:
+            self.shm = attach_shared_memory(name)
+
+        self.header, offset = shared_array(self.shm, 0, (HDR_FIELDS,), np.int64)
+        if create:
+            self.header[:] = 0
+            self.header[HDR_CAPACITY] = capacity
+            self.header[HDR_FRAME_BYTES] = frame_bytes
+            self.header[HDR_SAMPLE_RATE] = sample_rate
+            self.header[HDR_CHANNELS] = channels
+            self.header[HDR_EPOCH_NS] = round(epoch * 1e9)
+
+        self.capacity: int = int(self.header[HDR_CAPACITY])
+        self.frame_bytes: int = int(self.header[HDR_FRAME_BYTES])
+        self.sample_rate: int = int(self.header[HDR_SAMPLE_RATE])
+        self.channels: int = int(self.header[HDR_CHANNELS])
+        self.epoch: float = int(self.header[HDR_EPOCH_NS]) / 1e9
+        self.data, _ = shared_array(self.shm, offset, (self.capacity,), np.uint8)
+
+        # A READER STARTS WITH THE NEXT AUDIO WRITTEN.
+        self.read_pos: int = int(self.header[HDR_WRITE_POS])
+        self.local_closed: bool = False
+        self.window: int = 0
+
+        # STATISTICS
+        self.chunks_in: int = 0
+        self.overflows: int = 0
+        self.bytes_dropped: int = 0
+
+        log.info(f"{'Created' if create else 'Attached to'} shared audio ring {name}: {self.capacity} bytes, "
+                 f"{self.channels} channels at {self.sample_rate}")
+
+    def __len__(self) -> int:
+        return int(self.header[HDR_WRITE_POS]) - self.read_pos
+
+    def closed(self) -> bool:
+        """
+        :about: TRUE once the daemon or this reader has closed the ring.
+        """
+        return self.local_closed or bool(self.header[HDR_CLOSED])
+
+    def put(self, chunk: bytes, timestamp: float) -> bool:
+        """
+        :about: Copy a period of audio into the ring (capture daemon only).  Never waits.
+        :param chunk: the audio data
+        :param timestamp: clock time the last sample of the chunk was captured
+        :returns: TRUE if the chunk was stored, FALSE if the ring is closed.
+        """
+        if self.closed():
+            return False
+
+        data = np.frombuffer(chunk, dtype=np.uint8)[-self.capacity:]
+        write_pos = int(self.header[HDR_WRITE_POS])
+        start = write_pos % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.data[start:start + first] = data[:first]
+        if first < len(data):
+            self.data[:len(data) - first] = data[first:]
+
+        # PUBLISH THE TIME BEFORE THE POSITION.  READERS LOOK AT THE POSITION FIRST.
+        self.header[HDR_WRITE_TIME_NS] = round(timestamp * 1e9)
+        self.header[HDR_WRITE_POS] = write_pos + len(data)
+        self.chunks_in += 1
+        return True
+
+    def get(self, timeout: float | None = None) -> AudioChunk | None:
+        """
+        :about: Retrieve all of the audio written since this reader last asked, waiting for
+                some to arrive if there is none.
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        :returns: the audio data or None if nothing arrived in time.
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while len(self) == 0 and not self.closed():
+            nap = POLL_SECS
+            if give_up_at is not None:
+                nap = min(nap, give_up_at - time.monotonic())
+                if nap <= 0:
+                    break
+            time.sleep(nap)
+
+        write_pos = int(self.header[HDR_WRITE_POS])
+        timestamp = int(self.header[HDR_WRITE_TIME_NS]) / 1e9
+        if write_pos == self.read_pos:
+            return None
+
+        if write_pos - self.read_pos > self.capacity:
+            self.overflows += 1
+            self.bytes_dropped += write_pos - self.capacity - self.read_pos
+            self.read_pos = write_pos - self.capacity
+
+        size = write_pos - self.read_pos
+        start = self.read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        chunk = self.data[start:start + first].tobytes()
+        if first < size:
+            chunk += self.data[:size - first].tobytes()
+
+        # THE DAEMON MAY HAVE WRITTEN OVER PART OF WHAT WAS JUST COPIED.  DROP IT IF SO.
+        overwritten = int(self.header[HDR_WRITE_POS]) - self.capacity - self.read_pos
+        if overwritten > 0:
+            overwritten += (-overwritten) % self.frame_bytes
+            self.overflows += 1
+            self.bytes_dropped += overwritten
+            chunk = chunk[overwritten:]
+
+        self.read_pos = write_pos
+        return AudioChunk(timestamp, chunk)
+
+    def start_pre_roll(self, window: int) -> None:
+        """
+        :about: Receive the most recent audio once :py:meth:`end_pre_roll` is called.
+        :param window: number of bytes to rewind (a whole number of frames)
+        """
+        self.window = min(window, self.capacity)
+
+    def end_pre_roll(self, keep: bool) -> None:
+        """
+        :about: Move this reader's position.  The consumer is about to start.
+        :param keep: TRUE to rewind over the pre-roll window.  FALSE to start with the next
+                     audio written.
+        """
+        write_pos = int(self.header[HDR_WRITE_POS])
+        self.read_pos = max(0, write_pos - self.window) if keep else write_pos
+        self.window = 0
+
+    def close(self) -> None:
+        """
+        :about: Stop using the ring.  When the daemon closes it, every reader is told.
+        """
+        self.local_closed = True
+        if self.owner:
+            self.header[HDR_CLOSED] = 1
+
+        log.info(f"Shared audio ring {self.name}: {self.overflows} overflows ({self.bytes_dropped} bytes dropped).")
+
+    def detach(self) -> None:
+        """
+        :about: Release this process's mapping of the shared memory.  The capture daemon
+                also removes the shared memory.
+        """
+        del self.header, self.data
+        release_shared_memory(self.shm, self.owner)
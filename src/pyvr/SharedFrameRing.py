@@ -0,0 +1,216 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">SharedFrameRing</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import numpy as np
+import threading as thr
+import time
+
+from .FrameRing import FrameRing, RingFrame
+from .sharedmem import aligned, attach_shared_memory, create_shared_memory, release_shared_memory, shared_array
+
+# LAYOUT OF THE HEADER AT THE START OF THE SHARED MEMORY (INDEXES INTO AN int64 ARRAY)
+HDR_CAPACITY = 0
+HDR_HEIGHT = 1
+HDR_WIDTH = 2
+HDR_CHANNELS = 3
+HDR_FPS = 4
+HDR_LATEST_SEQ = 5
+HDR_CLOSED = 6
+HDR_EPOCH_NS = 7  # epoch of the daemon's MediaClock (time.monotonic_ns)
+HDR_FIELDS = 8
+
+# LONGEST AN ATTACHED PROCESS SLEEPS BEFORE CHECKING FOR A NEW FRAME
+POLL_SECS = 0.002
+
+
+class SharedFrameRing(FrameRing):
+    """
+    A :py:class:`FrameRing<pyvr.FrameRing.FrameRing>` kept in named shared memory so that
+    other processes can read the frames captured by the capture daemon without copying
+    them.  The daemon creates the ring and decodes frames straight into it.  Players,
+    previews and recorders in other processes attach to it by name.
+
+    Frames cannot be held across processes.  :py:meth:`acquire` returns a read-only view
+    that remains valid for capacity - 1 frames (see *FrameBufferCount* in pyvr.ini).  A
+    slot being rewritten is marked invalid first, so a frame that has been overwritten is
+    never returned.  *can_hold* is FALSE, so anyone keeping frames longer than that (such
+    as an :py:class:`AsyncFrameWriter<pyvr.AsyncFrameWriter.AsyncFrameWriter>`) copies them.
+    """
+    # ACQUIRED FRAMES ARE ONLY VALID UNTIL THE DAEMON WRAPS AROUND TO THEIR SLOT.
+    can_hold: bool = False
+
+    def __init__(self,
+                 name: str,
+                 create: bool = False,
+                 capacity: int = 0,
+                 height: int = 0,
+                 width: int = 0,
+                 fps: int = 0,
+                 epoch: float = 0.0,
+                 channels: int = 3
+                 ) -> None:
+        """
+        :about: SharedFrameRing constructor
+        :param name: name of the shared memory
+        :param create: TRUE to create the ring (the capture daemon).  FALSE to attach to it.
+        :param capacity: number of frames the ring holds (when creating)
+        :param height: height (in pixels) of each frame (when creating)
+        :param width: width (in pixels) of each frame (when creating)
+        :param fps: frames per second captured (when creating)
+        :param epoch: epoch of the capture daemon's :py:class:`MediaClock<pyvr.MediaClock.MediaClock>` (when creating)
+        :param channels: color channels in each frame (when creating)
+        """
+        self.name: str = name
+        self.owner: bool = create
+
+        header_bytes = aligned(HDR_FIELDS * 8)
+        if create:
+            assert capacity >= 2
+            index_bytes = aligned(capacity * 8)
+            self.shm = create_shared_memory(name, header_bytes + 2 * index_bytes + capacity * height * width * channels)
+        else:
+            self.shm = attach_shared_memory(name)
+
+        self.header, offset = shared_array(self.shm, 0, (HDR_FIELDS,), np.int64)
+        if create:
+            self.header[:] = 0
+            self.header[HDR_CAPACITY] = capacity
+            self.header[HDR_HEIGHT] = height
+            self.header[HDR_WIDTH] = width
+            self.header[HDR_CHANNELS] = channels
+            self.header[HDR_FPS] = fps
+            self.header[HDR_LATEST_SEQ] = -1
+            self.header[HDR_EPOCH_NS] = round(epoch * 1e9)
+
+        self.capacity: int = int(self.header[HDR_CAPACITY])
+        self.shape: (int, int, int) = (int(self.header[HDR_HEIGHT]),
+                                       int(self.header[HDR_WIDTH]),
+                                       int(self.header[HDR_CHANNELS]))
+        self.fps: int = int(self.header[HDR_FPS])
+        self.epoch: float = int(self.header[HDR_EPOCH_NS]) / 1e9
+
+        self.slot_seq, offset = shared_array(self.shm, offset, (self.capacity,), np.int64)
+        self.slot_timestamp, offset = shared_array(self.shm, offset, (self.capacity,), np.float64)
+        self.block, _ = shared_array(self.shm, offset, (self.capacity, *self.shape), np.uint8)
+        if create:
+            self.slot_seq[:] = -1
+            self.slot_timestamp[:] = 0.0
+
+        # THE SAME MEMBERS AS A FrameRing.  SLOTS ALWAYS USE THEIR OWN BUFFER.
+        self.lock: thr.Lock = thr.Lock()
+        self.buffers: [np.ndarray] = [self.block[idx] for idx in range(self.capacity)]
+        self.slot_buffer: [int] = list(range(self.capacity))
+        self.refcount: [int] = [0] * self.capacity
+        self.pinned: {int: int} = {}
+        self.orphaned: set = set()
+        self.spares: [int] = []
+        self.spares_reserved: int = 0
+        self.spares_allocated: int = 0
+        self.frames_resized: int = 0
+        self.frames_rejected: int = 0
+        self.frame_arrived: thr.Condition = thr.Condition()
+        self.dropped: int = 0
+        self.duplicated: int = 0
+
+        log.info(f"{'Created' if create else 'Attached to'} shared frame ring {name}: "
+                 f"{self.capacity} frames of {self.shape}")
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self.header[HDR_LATEST_SEQ])
+
+    @latest_seq.setter
+    def latest_seq(self, seq: int) -> None:
+        self.header[HDR_LATEST_SEQ] = seq
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.header[HDR_CLOSED])
+
+    @closed.setter
+    def closed(self, closed: bool) -> None:
+        self.header[HDR_CLOSED] = int(closed)
+
+    def allocate(self, shape: (int, int, int)) -> None:
+        """
+        :about: The size of a shared ring is fixed when it is created.
+        :raises IOError: always.  The capture device delivered frames of the wrong size.
+        """
+        exc = IOError(f"Capture size {shape} does not match shared frame ring {self.shape}.")
+        log.exception(exc)
+        raise exc
+
+    def next_slot(self) -> np.ndarray:
+        """
+        :about: The buffer the producer should decode the next frame into.  The frame that
+                was in the slot is marked invalid before it is overwritten.
+        """
+        idx = (self.latest_seq + 1) % self.capacity
+        self.slot_seq[idx] = -1
+        return self.buffers[idx]
+
+    def acquire(self, seq: int) -> RingFrame | None:
+        """
+        :about: Retrieve a frame as a read-only view.  Frames are not reference counted
+                across processes.  See the class description.
+        :param seq: sequence number of the frame
+        :returns: the frame or None if it is not in the ring.
+        """
+        ring_frame = self.frame(seq)
+        if ring_frame is None:
+            return None
+
+        image = ring_frame.image.view()
+        image.flags.writeable = False
+        return RingFrame(seq, ring_frame.timestamp, image)
+
+    def release(self, seq: int) -> None:
+        """
+        :about: Nothing to do.  Shared frames are not reference counted.
+        """
+        pass
+
+    def wait_for_seq(self, seq: int, timeout: float | None) -> None:
+        """
+        :about: Block until a frame is published (or the ring is closed).  The producer can
+                not signal other processes, so an attached process checks for the frame every
+                POLL_SECS.
+        :param seq: sequence number of the frame wanted
+        :param timeout: maximum number of seconds to wait.  None waits forever.
+        """
+        if self.owner:
+            FrameRing.wait_for_seq(self, seq, timeout)
+            return
+
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while self.latest_seq < seq and not self.closed:
+            nap = POLL_SECS
+            if give_up_at is not None:
+                nap = min(nap, give_up_at - time.monotonic())
+                if nap <= 0:
+                    return
+            time.sleep(nap)
+
+    def close(self) -> None:
+        """
+        :about: The capture daemon is stopping.  Tell every attached process.
+        """
+        if self.owner:
+            FrameRing.close(self)
+
+    def detach(self) -> None:
+        """
+        :about: Release this process's mapping of the shared memory.  The capture daemon
+                also removes the shared memory.
+        """
+        self.buffers = []
+        del self.header, self.slot_seq, self.slot_timestamp, self.block
+        release_shared_memory(self.shm, self.owner)
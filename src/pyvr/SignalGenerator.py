@@ -0,0 +1,56 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">SignalGenerator</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import math
+import numpy as np
+
+# PEAK LEVEL OF THE GENERATED SIGNALS (ABOUT -12 dBFS)
+AMPLITUDE = 8192
+
+
+class SignalGenerator:
+    """
+    A deterministic source of 16 bit PCM audio used in place of a real audio device.  It
+    generates either a sine wave (tone) or white noise.  The noise is seeded, so every run
+    produces exactly the same audio.
+    """
+    def __init__(self, signal: str, sample_rate: int, channels: int, tone_hz: float = 440.0, seed: int = 0) -> None:
+        """
+        :about: SignalGenerator constructor
+        :param signal: "tone" or "noise"
+        :param sample_rate: samples per second
+        :param channels: number of audio channels
+        :param tone_hz: frequency of the tone
+        :param seed: seed for the noise generator
+        """
+        assert signal in ("tone", "noise")
+
+        self.signal: str = signal
+        self.sample_rate: int = sample_rate
+        self.channels: int = channels
+        self.tone_hz: float = tone_hz
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.position: int = 0
+
+    def generate(self, frames: int) -> bytes:
+        """
+        :about: Generate the next block of audio.  Successive blocks join without a gap.
+        :param frames: number of frames (one sample for every channel) to generate
+        :returns: interleaved signed 16 bit little endian samples
+        """
+        if self.signal == "tone":
+            positions = np.arange(self.position, self.position + frames, dtype=np.float64)
+            mono = AMPLITUDE * np.sin(2 * math.pi * self.tone_hz * positions / self.sample_rate)
+            samples = np.repeat(mono.astype("<i2")[:, np.newaxis], self.channels, axis=1)
+        else:
+            samples = self.rng.integers(-AMPLITUDE, AMPLITUDE, size=(frames, self.channels), dtype="<i2")
+
+        self.position += frames
+        return samples.tobytes()
@@ -0,0 +1,202 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">Telemetry</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import bisect
+import threading as thr
+import time
+
+_SHARED_TELEMETRY = None
+
+# UPPER BOUNDS (IN MILLISECONDS) OF THE LATENCY HISTOGRAM BUCKETS.  THE LAST BUCKET HOLDS EVERYTHING SLOWER.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 30, 40, 50, 75, 100, 200, 500, 1000, 2000, 5000)
+
+# EVERY METRIC NAME STARTS WITH THIS IN THE PROMETHEUS TEXT
+METRIC_PREFIX = "pyvr_"
+
+
+class Histogram:
+    """
+    Counts of observed latencies in fixed buckets (see LATENCY_BUCKETS_MS).  Observing a
+    value never allocates, so the capture and recording threads can afford it.
+    """
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self.last_ms: float = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.last_ms = value_ms
+
+    def quantile(self, fraction: float) -> float:
+        """
+        :about: Estimate a percentile.  The upper bound of the bucket holding it is returned
+                (the largest value seen for the last bucket).
+        """
+        wanted = fraction * self.count
+        seen = 0
+        for idx, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= wanted and bucket > 0:
+                return float(LATENCY_BUCKETS_MS[idx]) if idx < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count > 0 else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+class Telemetry:
+    """
+    Live statistics about the capture and recording pipeline, so a recording can be seen
+    degrading before it fails.  Each stage (the video capture thread, each video handler,
+    the audio capture and each audio handler) reports:
+
+    - counters: events such as frames captured, late frames, dropped frames and audio
+      overruns.  The time of the most recent event is kept with each count.
+    - gauges: the current value of something, such as how full a buffer is.
+    - histograms: latencies in milliseconds, such as from capture to write.
+
+    The values can be read at any time with :py:meth:`snapshot` or
+    :py:meth:`prometheus_text`.  A
+    :py:class:`TelemetryServer<pyvr.TelemetryServer.TelemetryServer>` publishes them over
+    http and/or dumps them to a file.  Use :py:func:`shared_telemetry` to retrieve the
+    statistics of the whole process.
+    """
+    def __init__(self) -> None:
+        """
+        :about: Telemetry constructor
+        """
+        self.lock: thr.Lock = thr.Lock()
+        self.started_at: float = time.time()
+        self.counters: dict[tuple[str, str], list] = {}
+        self.gauges: dict[tuple[str, str], float] = {}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+
+    def count(self, name: str, amount: int = 1, stage: str = "") -> None:
+        """
+        :about: Add to a counter.
+        :param name: what is counted (e.g. frames_dropped)
+        :param amount: number of events
+        :param stage: the part of the pipeline reporting it
+        """
+        with self.lock:
+            counter = self.counters.setdefault((name, stage), [0, 0.0])
+            counter[0] += amount
+            counter[1] = time.time()
+
+    def set_gauge(self, name: str, value: float, stage: str = "") -> None:
+        """
+        :about: Record the current value of a gauge (e.g. how full a buffer is).
+        """
+        with self.lock:
+            self.gauges[(name, stage)] = value
+
+    def observe(self, name: str, value_ms: float, stage: str = "") -> None:
+        """
+        :about: Add a latency to a histogram.
+        :param name: what is timed (e.g. capture_to_write)
+        :param value_ms: the latency in milliseconds
+        :param stage: the part of the pipeline reporting it
+        """
+        with self.lock:
+            histogram = self.histograms.get((name, stage))
+            if histogram is None:
+                histogram = self.histograms[(name, stage)] = Histogram()
+            histogram.observe(value_ms)
+
+    def reset(self) -> None:
+        """
+        :about: Forget every statistic (e.g. between recordings).
+        """
+        with self.lock:
+            self.started_at = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        """
+        :about: The current statistics as a dictionary that can be saved as JSON.  Each
+                metric holds a value for each stage that reported it.
+        """
+        with self.lock:
+            snapshot = {"time": time.time(), "uptime_secs": round(time.time() - self.started_at, 3),
+                        "counters": {}, "gauges": {}, "histograms": {}}
+            for (name, stage), (value, last_at) in sorted(self.counters.items()):
+                snapshot["counters"].setdefault(name, {})[stage] = {"value": value, "last_at": last_at}
+            for (name, stage), value in sorted(self.gauges.items()):
+                snapshot["gauges"].setdefault(name, {})[stage] = value
+            for (name, stage), histogram in sorted(self.histograms.items()):
+                snapshot["histograms"].setdefault(name, {})[stage] = histogram.summary()
+        return snapshot
+
+    def prometheus_text(self) -> str:
+        """
+        :about: The current statistics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name}_total counter")
+                for (other, stage), (value, _) in sorted(self.counters.items()):
+                    if other == name:
+                        lines.append(f"{METRIC_PREFIX}{name}_total{labels(stage)} {value}")
+
+            for name in sorted({name for name, _ in self.gauges}):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+                for (other, stage), value in sorted(self.gauges.items()):
+                    if other == name:
+                        lines.append(f"{METRIC_PREFIX}{name}{labels(stage)} {value}")
+
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name}_ms histogram")
+                for (other, stage), histogram in sorted(self.histograms.items()):
+                    if other != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket in zip(LATENCY_BUCKETS_MS + ("+Inf",), histogram.buckets):
+                        cumulative += bucket
+                        lines.append(f"{METRIC_PREFIX}{name}_ms_bucket{labels(stage, le=bound)} {cumulative}")
+                    lines.append(f"{METRIC_PREFIX}{name}_ms_sum{labels(stage)} {round(histogram.total_ms, 3)}")
+                    lines.append(f"{METRIC_PREFIX}{name}_ms_count{labels(stage)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def labels(stage: str, **extra) -> str:
+    """
+    :about: Prometheus labels for a metric reported by a stage.
+    """
+    pairs = ([("stage", stage)] if stage else []) + list(extra.items())
+    if len(pairs) == 0:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+def shared_telemetry() -> Telemetry:
+    """
+    :about: Retrieve the statistics shared by the whole process (created on first use).
+    """
+    global _SHARED_TELEMETRY
+    if _SHARED_TELEMETRY is None:
+        _SHARED_TELEMETRY = Telemetry()
+    return _SHARED_TELEMETRY
@@ -0,0 +1,153 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">TelemetryServer</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+
+import json
+import logging as log
+import os
+import threading as thr
+
+from .configuration import load_telemetry_config, TelemetryCfg
+from .Telemetry import Telemetry, shared_telemetry
+
+
+class TelemetryServer:
+    """
+    Publishes the pipeline :py:class:`Telemetry<pyvr.Telemetry.Telemetry>` while recording
+    (see the [TELEMETRY] section of pyvr.ini):
+
+    - http://Address:Port/metrics returns the Prometheus text format.
+    - http://Address:Port/metrics.json returns the same statistics as JSON.
+    - every DumpSecs seconds the JSON is written to DumpFile (replacing the last dump).
+
+    Nothing is started when Port is 0 and DumpFile is empty.
+    """
+    def __init__(self,
+                 port: int | None = None,
+                 address: str | None = None,
+                 dump_file: str | None = None,
+                 dump_secs: float | None = None,
+                 telemetry: Telemetry | None = None
+                 ) -> None:
+        """
+        :about: TelemetryServer constructor.  Settings that are not supplied are read from
+                pyvr.ini.
+        :param port: http port (0 for no http server)
+        :param address: address the http server listens on
+        :param dump_file: file to write the JSON statistics to ("" for none)
+        :param dump_secs: seconds between dumps
+        :param telemetry: the statistics to publish.  None for those of the whole process.
+        """
+        telemetry_config = load_telemetry_config()
+        self.port: int = int(telemetry_config[TelemetryCfg.PORT]) if port is None else port
+        self.address: str = telemetry_config[TelemetryCfg.ADDRESS] if address is None else address
+        self.dump_file: str = telemetry_config[TelemetryCfg.DUMP_FILE] if dump_file is None else dump_file
+        self.dump_secs: float = float(telemetry_config[TelemetryCfg.DUMP_SECS]) if dump_secs is None else dump_secs
+        self.telemetry: Telemetry = shared_telemetry() if telemetry is None else telemetry
+
+        # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
+        self.http_server: ThreadingHTTPServer | None = None
+        self.http_thread: thr.Thread | None = None
+        self.dump_thread: thr.Thread | None = None
+        self.stopping: thr.Event = thr.Event()
+
+    def start(self) -> None:
+        """
+        :about: Start the http server and/or the periodic dump.
+        """
+        self.stopping.clear()
+        if self.port > 0:
+            self.http_server = ThreadingHTTPServer((self.address, self.port), self.request_handler())
+            self.http_server.daemon_threads = True
+            self.port = self.http_server.server_address[1]
+            self.http_thread = thr.Thread(name="telemetry-http-thread", daemon=True, target=self.http_server.serve_forever)
+            self.http_thread.start()
+            log.info(f"Telemetry available at http://{self.address}:{self.port}/metrics")
+
+        if self.dump_file:
+            self.dump_thread = thr.Thread(name="telemetry-dump-thread", daemon=True, target=self.dump_loop)
+            self.dump_thread.start()
+            log.info(f"Telemetry written to {self.dump_file} every {self.dump_secs} seconds.")
+
+    def request_handler(self) -> type:
+        """
+        :about: The class the http server uses to answer each request.
+        """
+        telemetry = self.telemetry
+
+        class TelemetryRequest(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                path = self.path.split("?")[0]
+                if path in ("/", "/metrics"):
+                    body, content_type = telemetry.prometheus_text(), "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    body, content_type = json.dumps(telemetry.snapshot(), indent=2), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, fmt: str, *args) -> None:
+                log.debug(f"Telemetry request: {fmt % args}")
+
+        return TelemetryRequest
+
+    def dump_loop(self) -> None:
+        """
+        :about: Code executed by the telemetry-dump-thread.  Write the statistics every
+                dump_secs until stopped (and once more when stopping).
+        """
+        while not self.stopping.wait(self.dump_secs):
+            self.dump()
+        self.dump()
+
+    def dump(self) -> None:
+        """
+        :about: Write the statistics to dump_file.  The file is replaced in one step, so a
+                reader never sees half of it.
+        """
+        temp_file = f"{self.dump_file}.tmp"
+        try:
+            with open(temp_file, "w") as dump:
+                json.dump(self.telemetry.snapshot(), dump, indent=2)
+            os.replace(temp_file, self.dump_file)
+        except OSError as err:
+            log.warning(f"Unable to write telemetry to {self.dump_file}: {err}")
+
+    def stop(self) -> None:
+        """
+        :about: Stop publishing.  The statistics are dumped one last time.
+        """
+        self.stopping.set()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+        if self.dump_thread is not None:
+            self.dump_thread.join()
+            self.dump_thread = None
+
+    def __enter__(self) -> Self:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_traceback) -> bool:
+        """ __enter__ and __exit__ allow objects of this class to use the with notation."""
+        self.stop()
+        return exc_type is None
@@ -0,0 +1,109 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">TimingLog</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+
+TIMING_EXT = "timing"
+
+
+def timing_filename(media_file: str) -> str:
+    """
+    :about: Name of the timing sidecar that accompanies a recorded file.
+    :param media_file: the recorded file (ie: recording.mp4)
+    :returns: the sidecar filename (ie: recording.mp4.timing)
+    """
+    return f"{media_file}.{TIMING_EXT}"
+
+
+class TimingLog:
+    """
+    A timing sidecar written next to an intermediate recording file.  Each line maps a
+    position in the file (a frame number for video, a sample number for audio) to the
+    :py:class:`MediaClock<pyvr.MediaClock.MediaClock>` time it was captured.  The combine
+    step uses the two sidecars to line up the audio and video and remove drift.
+    """
+    def __init__(self, media_file: str, rate: float) -> None:
+        """
+        :about: TimingLog constructor
+        :param media_file: the recorded file the sidecar describes
+        :param rate: positions per second (frames per second or sample rate)
+        """
+        self.filename: str = timing_filename(media_file)
+        self.rate: float = rate
+        self.file = None
+
+    def open(self) -> None:
+        """
+        :about: Create the sidecar file.
+        """
+        log.debug(f"Writing timing information to {self.filename}")
+        self.file = open(self.filename, "w")
+        self.file.write(f"# rate={self.rate}\n")
+
+    def write(self, position: int, timestamp: float) -> None:
+        """
+        :about: Record the time a position in the file was captured.
+        :param position: frame or sample number
+        :param timestamp: clock time it was captured
+        """
+        self.file.write(f"{position},{timestamp:.6f}\n")
+
+    def close(self) -> None:
+        """
+        :about: Finish writing the sidecar file.
+        """
+        self.file.close()
+
+
+def read_timing(filename: str) -> (float, [(int, float)]):
+    """
+    :about: Load a timing sidecar.
+    :param filename: the sidecar file
+    :returns: the rate and a list of (position, timestamp) tuples.
+    """
+    rate = 0.0
+    points = []
+    with open(filename, "r") as f:
+        for line in f:
+            if line.startswith("# rate="):
+                rate = float(line[len("# rate="):])
+            elif line.strip():
+                position, timestamp = line.split(",")
+                points.append((int(position), float(timestamp)))
+
+    return rate, points
+
+
+def fit_timeline(rate: float, points: [(int, float)]) -> (float, float):
+    """
+    :about: Fit a straight line (least squares) through the timing points.  The line maps
+            the nominal time of a position in the file (position / rate) to the clock time
+            it was captured: clock_time = start + scale * (position / rate)
+    :param rate: positions per second
+    :param points: (position, timestamp) tuples
+    :returns: start and scale.  A scale greater than 1 means the file plays back faster
+              than it was captured.
+    """
+    count = len(points)
+    if count == 0:
+        return 0.0, 1.0
+    if count == 1:
+        position, timestamp = points[0]
+        return timestamp - position / rate, 1.0
+
+    mean_x = sum(position / rate for position, _ in points) / count
+    mean_y = sum(timestamp for _, timestamp in points) / count
+    var_x = sum((position / rate - mean_x) ** 2 for position, _ in points)
+    if var_x == 0:
+        return mean_y - mean_x, 1.0
+
+    cov = sum((position / rate - mean_x) * (timestamp - mean_y) for position, timestamp in points)
+    scale = cov / var_x
+    return mean_y - scale * mean_x, scale
@@ -11,12 +11,23 @@
 from collections import namedtuple
 from typing import Self
 
-import cv2
 import logging as log
+import numpy as np
 import threading as thr
 import time
 
-from .configuration import load_config, VideoCfg
+from .configuration import load_config, VideoCfg, VideoSourceType
+from .FrameRing import FrameRing, RingFrame
+from .FrameSubscription import FrameSubscription
+from .imaging import resize_image
+from .LazyModule import LazyModule
+from .MediaClock import MediaClock, shared_clock
+from .SharedFrameRing import SharedFrameRing
+from .Telemetry import shared_telemetry
+from .VideoSource import open_video_source, PacedSource
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
 
 VideoReadSpecs = namedtuple("VideoReadSpecs", "device height width")
 """
@@ -36,9 +47,12 @@ class VideoCard:
 
     .. SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
-    def __init__(self) -> None:
+    def __init__(self, publish_as: str | None = None) -> None:
         """
         :about: VideoCard object constructor.
+        :param publish_as: name of the shared memory to capture into so that other processes
+                           can read the frames (used by the
+                           :py:class:`CaptureDaemon<pyvr.CaptureDaemon.CaptureDaemon>`).
         """
         _, video_config, _ = load_config()
 
@@ -49,19 +63,53 @@ class VideoCard:
         self.height: int = int(video_config[VideoCfg.HEIGHT])
         self.device: str = video_config[VideoCfg.DEVICE]
         self.fps: int = int(video_config[VideoCfg.FPS])
-        self.time_to_sleep: float = (1.0 / self.fps) / 3
-
-        self.vid_source: cv2.VideoCapture = cv2.VideoCapture(self.device)
-        self.vid_source.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-        self.vid_source.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.frame_buffer_count: int = int(video_config[VideoCfg.FRAME_BUFFER_COUNT])
+        self.shared: bool = video_config[VideoCfg.SOURCE] == VideoSourceType.SHARED
+        self.pre_roll_secs: float = float(video_config[VideoCfg.PRE_ROLL_SECS])
+        self.passthrough: bool = bool(video_config[VideoCfg.MJPEG_PASSTHROUGH])
+        backing_dir: str | None = video_config[VideoCfg.PRE_ROLL_DIR] or None
 
         # MEMBERS FOR INTER-THREAD COMMUNICATION
         self.viewing: bool = False
         self.grab_vid_thread = None
-        self.latest_frame = None
+        self.clock: MediaClock = shared_clock()
+
+        if self.shared:
+            # THE CAPTURE DAEMON OWNS THE DEVICE.  READ ITS FRAMES (AND USE ITS CLOCK).
+            self.vid_source: cv2.VideoCapture | PacedSource | None = None
+            self.ring: FrameRing = SharedFrameRing(video_config[VideoCfg.SHARED_NAME])
+            self.height, self.width = self.ring.shape[:2]
+            self.fps = self.ring.fps
+            self.clock.epoch = self.ring.epoch
+            self.pre_roll_frames: int = min(round(self.fps * self.pre_roll_secs), self.ring.capacity - 2)
+        else:
+            # THE RING ALSO HOLDS THE LAST PreRollSecs OF VIDEO SO RECORDINGS CAN START IN THE PAST.
+            self.vid_source = open_video_source(video_config)
+            self.pre_roll_frames = round(self.fps * self.pre_roll_secs)
+            capacity = self.frame_buffer_count + self.pre_roll_frames
+            if publish_as is None:
+                self.ring = FrameRing(capacity, self.height, self.width, backing_dir=backing_dir,
+                                      compressed=self.passthrough)
+            elif self.passthrough:
+                exc = IOError("MjpegPassthrough cannot be used by the capture daemon.")
+                log.exception(exc)
+                raise exc
+            else:
+                self.ring = SharedFrameRing(publish_as, True, capacity, self.height, self.width,
+                                            self.fps, self.clock.epoch)
+
+        # MEMBERS FOR SHARING FRAMES BETWEEN SUBSCRIBERS
+        self.subscribers: [FrameSubscription] = []
+        self.scaled_cache: {(int, int): RingFrame} = {}
+        self.scale_lock: thr.Lock = thr.Lock()
+        self.frames_scaled: int = 0
+        self.frames_decoded: int = 0
 
         log.debug(f"    - device = {self.device}")
         log.debug(f"    - size   = {self.width} x {self.height}")
+        log.debug(f"    - frame buffers = {self.frame_buffer_count}")
+        log.debug(f"    - pre-roll = {self.pre_roll_frames} frames")
+        log.debug(f"    - mjpeg passthrough = {self.passthrough}")
 
     def start_viewing(self) -> None:
         """
@@ -70,7 +118,9 @@ class VideoCard:
         """
         log.info("Starting video capture.")
         if not self.viewing:
-            if self.vid_source.isOpened():
+            if self.shared:
+                self.viewing = True
+            elif self.vid_source.isOpened():
                 self.viewing = True
                 self.grab_vid_thread = thr.Thread(name="video-capture-thread", daemon=True, target=self.frame_loader)
                 self.grab_vid_thread.start()
@@ -83,14 +133,28 @@ class VideoCard:
     def frame_loader(self) -> None:
         """
         :about: Code executed by the video-capture-thread. Constantly examine the video from the
-                card and store it locally.
+                card and store it in the frame ring.  Frames are decoded directly into the
+                ring's preallocated buffers.  Reading blocks until the source delivers the
+                next frame, so the loop is paced by the source itself.
         """
         log.info("video-capture-thread has started.")
+        telemetry = shared_telemetry()
+        last_timestamp = None
         while self.viewing:
-            valid, frame = self.vid_source.read()
-            if valid:
-                self.latest_frame = frame
-            time.sleep(self.time_to_sleep)
+            valid, frame = self.vid_source.read(image=self.ring.next_slot())
+            if not valid:
+                telemetry.count("capture_read_failures", stage="video_capture")
+                continue
+
+            timestamp = self.clock.now()
+            if self.ring.commit(frame, timestamp) < 0:
+                telemetry.count("frames_rejected", stage="video_capture")
+                continue
+            telemetry.count("frames_captured", stage="video_capture")
+            if last_timestamp is not None:
+                # A SOURCE THAT STALLS SHOWS UP AS A LONG GAP BETWEEN FRAMES.
+                telemetry.observe("capture_interval", 1000 * (timestamp - last_timestamp), stage="video_capture")
+            last_timestamp = timestamp
 
     def most_recent_frame(self) -> bytes:
         """
@@ -98,7 +162,84 @@ class VideoCard:
                 view or record the contents of the video stream.
         :return: binary image as captured by the video capture device.
         """
-        return self.latest_frame
+        latest = self.ring.latest()
+        if latest is None:
+            return None
+        if self.ring.compressed:
+            return self.scaled_frame(latest, (self.width, self.height))
+        return latest.image
+
+    def next_unseen_frame(self, last_seq: int, timeout: float | None = None) -> RingFrame | None:
+        """
+        :about: Get the next frame after the last one the caller received, waiting for it
+                if necessary.  See :py:meth:`FrameRing.wait_for_frame<pyvr.FrameRing.FrameRing.wait_for_frame>`
+        :param last_seq: sequence number of the last frame received by the caller (-1 if none)
+        :param timeout: maximum number of seconds to wait for a new frame.
+        :return: the frame with its sequence number and capture time.
+        """
+        return self.ring.wait_for_frame(last_seq, timeout)
+
+    def subscribe(self,
+                  name: str,
+                  size: tuple[int, int] | None = None,
+                  latest_only: bool = False,
+                  pre_roll: bool = False,
+                  raw: bool = False
+                  ) -> FrameSubscription:
+        """
+        :about: Add a consumer of the captured frames.  See
+                :py:class:`FrameSubscription<pyvr.FrameSubscription.FrameSubscription>`
+        :param name: name of the subscriber (used when logging)
+        :param size: (width, height) to scale the frames to.  None for the captured size.
+        :param latest_only: TRUE to always receive the most recent frame (a preview).
+        :param pre_roll: TRUE to start with the frames captured in the last *PreRollSecs*
+                         (a recorder).
+        :param raw: TRUE to receive the frames exactly as captured (compressed when
+                    *MjpegPassthrough* is on).  FALSE to always receive images.
+        :return: the subscription.  Close it when finished.
+        """
+        rewind = self.pre_roll_frames if pre_roll else 0
+        subscription = FrameSubscription(self, name, size, latest_only, rewind, raw)
+        with self.scale_lock:
+            self.subscribers.append(subscription)
+        log.debug(f"{name} subscribed to video frames (size {size}).")
+        return subscription
+
+    def unsubscribe(self, subscription: FrameSubscription) -> None:
+        """
+        :about: Remove a consumer added by :py:meth:`subscribe`.
+        """
+        with self.scale_lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def scaled_frame(self, ring_frame: RingFrame, size: (int, int)) -> np.ndarray:
+        """
+        :about: A frame scaled to a new size.  The most recent result for each size is
+                cached so subscribers that want the same size share a single resize.  A
+                compressed (MJPEG) frame is decoded first.  Only frames someone asks for
+                are ever decoded.
+        :param ring_frame: the frame to scale
+        :param size: (width, height) wanted
+        :return: the scaled image (read-only)
+        """
+        with self.scale_lock:
+            cached = self.scaled_cache.get(size)
+        if cached is not None and cached.seq == ring_frame.seq:
+            return cached.image
+
+        image = ring_frame.image
+        if self.ring.compressed:
+            image = cv2.imdecode(image, cv2.IMREAD_COLOR)
+            self.frames_decoded += 1
+        if image.shape[1] != size[0] or image.shape[0] != size[1]:
+            image = resize_image(image, size)
+            self.frames_scaled += 1
+        if image is not ring_frame.image:
+            image.flags.writeable = False
+        with self.scale_lock:
+            self.scaled_cache[size] = RingFrame(ring_frame.seq, ring_frame.timestamp, image)
+        return image
 
     def stop_viewing(self) -> None:
         """
@@ -107,8 +248,19 @@ class VideoCard:
         """
         log.info("Ending video capture.")
         self.viewing = False
-        self.vid_source.release()
-        self.grab_vid_thread.join()
+        self.ring.close()
+        if self.grab_vid_thread is not None:
+            self.grab_vid_thread.join()
+        if self.vid_source is not None:
+            self.vid_source.release()
+
+        log.info(f"Captured {self.ring.latest_seq + 1} frames. "
+                 f"({self.ring.dropped} dropped, {self.ring.duplicated} duplicated across all subscribers, "
+                 f"{self.frames_scaled} scaled, {self.frames_decoded} decoded, "
+                 f"{self.ring.spares_reserved} spare buffers reserved, {self.ring.spares_allocated} allocated, "
+                 f"{self.ring.frames_resized} resized, {self.ring.frames_rejected} rejected)")
+        if isinstance(self.ring, SharedFrameRing):
+            self.ring.detach()
 
     def __enter__(self) -> Self:
         """ __enter__ and __exit__ allow objects of this class to use the with notation."""
@@ -9,15 +9,25 @@
     </div>
 """
 from abc import abstractmethod
+from collections import deque
 
-import cv2
 import logging as log
 import threading as thr
 import time
 
-from .configuration import load_config, VideoCfg
+from .configuration import load_config, OverloadPolicy, VideoCfg
+from .DeadlineScheduler import DeadlineScheduler, PacingPolicy
+from .FrameSubscription import FrameSubscription
+from .LazyModule import LazyModule
+from .Telemetry import shared_telemetry
 from .VideoCard import VideoCard
 
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+# NUMBER OF RECENT OVERLOAD EVENTS KEPT BY EACH HANDLER
+OVERLOAD_LOG_SIZE = 1000
+
 
 class VideoHandler:
     """
@@ -27,17 +37,38 @@ class VideoHandler:
 
     ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
-    def __init__(self, card: VideoCard) -> None:
+    # WHAT TO DO WHEN PROCESSING FALLS BEHIND.  A RECORDING MUST NOT LOSE FRAMES.
+    pacing_policy: PacingPolicy = PacingPolicy.CATCH_UP
+
+    # TRUE TO START WITH THE VIDEO CAPTURED IN THE LAST PreRollSecs (SEE pyvr.ini)
+    pre_roll: bool = False
+
+    # TRUE TO RECEIVE THE FRAMES AS CAPTURED (COMPRESSED WHEN MjpegPassthrough IS ON, SEE pyvr.ini)
+    raw_frames: bool = False
+
+    # FALSE IF FRAMES MAY NOT BE LEFT OUT OF THE OUTPUT (OverloadPolicy=Drop DUPLICATES INSTEAD)
+    can_drop_frames: bool = True
+
+    def __init__(self, card: VideoCard, frame_size: tuple[int, int] | None = None) -> None:
         """
         :about: VideoRecorder constructor
         :param card:  object used to retrieve the video frames from the hardware.
+        :param frame_size: (width, height) to scale the frames to.  None for the captured size.
         """
         log.info("Setup video player.")
 
         # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
         self.new_frame_avail: bool = False
         self.frame = None
+        self.last_seq: int = -1
+        self.frame_timestamp: float = 0.0
+        self.frame_is_new: bool = False
         self.card: VideoCard = card
+        self.subscription: FrameSubscription = card.subscribe(type(self).__name__,
+                                                                  frame_size,
+                                                                  pre_roll=self.pre_roll,
+                                                                  raw=self.raw_frames
+                                                                  )
 
         self.processing: bool = False
         self.process_thread: thr.Thread | None = None
@@ -49,6 +80,17 @@ class VideoHandler:
 
         log.debug(f"Video startup delay: {self.pre_start_delay} seconds.")
 
+        # WHAT TO DO WHEN A FRAME IS DUE AND NONE IS READY (SEE OverloadPolicy IN pyvr.ini)
+        self.overload_policy = OverloadPolicy(video_config[VideoCfg.OVERLOAD_POLICY])
+        if self.overload_policy == OverloadPolicy.DROP and not self.can_drop_frames:
+            self.overload_policy = OverloadPolicy.DUPLICATE
+        self.overload_frames: int = int(video_config[VideoCfg.OVERLOAD_FRAMES])
+        self.degrade_step: int = max(2, int(video_config[VideoCfg.DEGRADE_STEP]))
+        self.degraded: bool = False
+        self.overloads: dict[str, int] = {}
+        self.overload_log: deque = deque(maxlen=OVERLOAD_LOG_SIZE)
+        log.debug(f"    - overload policy = {self.overload_policy.value}")
+
         log.debug(f"    - codec = {self.codec}")
         log.debug(f"    - fps   = {self.card.fps}")
         log.debug(f"    - size  = {self.card.width} x {self.card.height}")
@@ -57,6 +99,13 @@ class VideoHandler:
         self.frame_count = 0
         self.time_per_frame = 1 / self.card.fps
         self.time_to_sleep = self.time_per_frame / 2
+        # DROPPING FRAMES MEANS THE MISSED TICKS ARE SKIPPED, NOT CAUGHT UP.
+        pacing_policy = PacingPolicy.SKIP if self.overload_policy == OverloadPolicy.DROP else self.pacing_policy
+        self.scheduler: DeadlineScheduler = DeadlineScheduler(self.time_per_frame,
+                                                              self.card.clock,
+                                                              pacing_policy,
+                                                              name=type(self).__name__
+                                                              )
 
     def ready_for_next_frame(self) -> bool:
         """
@@ -80,14 +129,81 @@ class VideoHandler:
 
         return False
 
-    def next_frame_at(self, start: float) -> float:
+    def fetch_frame(self) -> bool:
+        """
+        :about: Retrieve the next frame (in capture order) from the video card and cache it.
+                If no new frame arrives within half a frame, the previous frame is reused.
+        :returns: Return TRUE if a frame was accepted and FALSE otherwise.
+        """
+        ring_frame = self.subscription.next_frame(timeout=self.time_to_sleep)
+        if ring_frame is None:
+            return False
+
+        self.frame_is_new = ring_frame.seq != self.last_seq
+        self.frame_timestamp = ring_frame.timestamp
+        self.last_seq = ring_frame.seq
+        return self.next_frame(ring_frame.image)
+
+    def repeat_frame(self) -> bool:
+        """
+        :about: Use the cached frame again instead of fetching a new one (in degraded mode).
+        :returns: Return TRUE if the frame was accepted and FALSE otherwise.
+        """
+        self.frame_is_new = False
+        self.overload_event("overload_degraded_ticks")
+        return self.next_frame(self.frame)
+
+    def missing_frame(self) -> bool:
+        """
+        :about: Called when a frame is due and none is ready.  Depending on the overload
+                policy the last frame is cached again or the frame is dropped.
+        :returns: TRUE if the last frame should be output again, FALSE if nothing should be.
+        """
+        if self.frame is not None and self.overload_policy != OverloadPolicy.DROP:
+            self.overload_event("overload_duplicated")
+            self.frame_is_new = False
+            return self.next_frame(self.frame)
+
+        self.overload_event("overload_dropped")
+        return False
+
+    def overload_event(self, kind: str, amount: int = 1) -> None:
         """
-        :about: Determine the time the next frame should be recorded.
-        :param start: the time the video recording began (in seconds)
-        :returns: the results of a simple calculation of the time the
-                  next frame should be saved. (in seconds)
+        :about: Count and time-stamp a frame that could not be handled normally.  The counts
+                are logged when processing ends and published as telemetry.
+        :param kind: what happened (e.g. overload_duplicated)
+        :param amount: number of frames affected
         """
-        return start + self.frame_count / self.card.fps
+        now = self.card.clock.now()
+        if kind not in self.overloads:
+            log.warning(f"{type(self).__name__} is not keeping up at {self.card.fps} frames/second "
+                        f"({kind} at {round(now, 3)}).  See OverloadPolicy in pyvr.ini.")
+        self.overloads[kind] = self.overloads.get(kind, 0) + amount
+        self.overload_log.append((now, kind, amount))
+        shared_telemetry().count(kind, amount, stage=type(self).__name__)
+
+    def frames_behind(self) -> int:
+        """
+        :about: How many frames this handler is behind schedule (or behind the capture).
+        """
+        late = (self.card.clock.now() - self.scheduler.deadline(self.scheduler.tick)) / self.time_per_frame
+        return max(int(late), self.subscription.pending() - 1)
+
+    def check_load(self) -> None:
+        """
+        :about: Enter degraded mode when more than *OverloadFrames* behind and leave it once
+                caught up.  In degraded mode only one new frame is taken every *DegradeStep*
+                frames and the frames waiting in between are skipped.
+        """
+        behind = self.frames_behind()
+        if not self.degraded and behind > self.overload_frames:
+            self.degraded = True
+            self.overload_event("overload_degraded_entries")
+            log.warning(f"{type(self).__name__} is {behind} frames behind.  Taking 1 frame in {self.degrade_step} "
+                        f"until it catches up.")
+        elif self.degraded and behind <= 1:
+            self.degraded = False
+            log.warning(f"{type(self).__name__} has caught up.  Taking every frame again.")
 
     def start_processing(self) -> None:
         """
@@ -106,6 +222,7 @@ class VideoHandler:
         """
         log.info("Stop processing video.")
         self.processing = False
+        self.scheduler.stop()
         self.process_thread.join()
 
     def __enter__(self):
@@ -135,15 +252,42 @@ class VideoHandler:
 
         self.before_processing()
 
-        start_time = time.monotonic()
+        # START THE TIMELINE IN THE PAST SO THE PRE-ROLL IS PROCESSED AS QUICKLY AS POSSIBLE.
+        backlog = max(0, self.subscription.pending() - 1) if self.pre_roll else 0
+        start_time = self.scheduler.start(self.card.clock.now() - backlog * self.time_per_frame)
+        if backlog > 0:
+            log.info(f"Processing {backlog} frames of pre-roll.")
+        telemetry = shared_telemetry()
+        stage = type(self).__name__
         while self.processing:
-            process_at = self.next_frame_at(start_time)
-            while process_at > time.monotonic():
-                time.sleep(self.time_to_sleep)
+            late_ticks = self.scheduler.late_ticks
+            skipped_ticks = self.scheduler.skipped_ticks
+            if self.scheduler.wait() is None:
+                break
+            if self.scheduler.late_ticks > late_ticks:
+                telemetry.count("frames_late", stage=stage)
+            if self.scheduler.skipped_ticks > skipped_ticks:
+                self.overload_event("overload_dropped", self.scheduler.skipped_ticks - skipped_ticks)
 
-            self.next_frame(self.card.most_recent_frame())
+            if self.overload_policy == OverloadPolicy.DEGRADE:
+                self.check_load()
+            if self.degraded and self.frame is not None and self.frame_count % self.degrade_step != 0:
+                fetched = self.repeat_frame()
+            else:
+                if self.degraded:
+                    self.subscription.skip_backlog()
+                fetched = self.fetch_frame()
 
             self.frame_count += 1
             self.process_single_frame()
 
+            # HOW LONG A FRAME TOOK FROM THE CARD TO THIS HANDLER'S OUTPUT AND HOW MANY ARE WAITING BEHIND IT.
+            if fetched and self.frame_is_new:
+                telemetry.observe("capture_to_write", 1000 * (self.card.clock.now() - self.frame_timestamp), stage=stage)
+            telemetry.set_gauge("frames_pending", self.subscription.pending(), stage=stage)
+
+        self.scheduler.log_stats()
+        if len(self.overloads) > 0:
+            log.warning(f"Overload ({type(self).__name__}, {self.overload_policy.value}): {self.overloads}")
         self.after_processing(start_time)
+        self.subscription.close()
@@ -8,15 +8,23 @@
         Date:   February 2024</pre>
     </div>
 """
-import cv2
 import logging as log
 import math
-import time
 
 from .configuration import load_config, AudioCfg, PreviewCfg
+from .DeadlineScheduler import PacingPolicy
+from .DelayLine import DelayLine
+from .imaging import resize_image
+from .LazyModule import LazyModule
 from .VideoCard import VideoCard
 from .VideoHandler import VideoHandler
 
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+# EXTRA FRAMES IN THE DELAY LINE SO THE DELAY CAN BE INCREASED A LITTLE WHILE PLAYING
+DELAY_HEADROOM_FRAMES = 6
+
 
 class VideoPlayer(VideoHandler):
     """
@@ -26,20 +34,28 @@ class VideoPlayer(VideoHandler):
 
     ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
+    # A LATE FRAME IS NOT WORTH SHOWING.  SKIP IT AND STAY IN STEP WITH THE AUDIO.
+    pacing_policy: PacingPolicy = PacingPolicy.SKIP
+
     def __init__(self, card: VideoCard) -> None:
         """
         :about: VideoRecorder constructor
         :param card:  object used to retrieve the video frames from the hardware.
         """
-        VideoHandler.__init__(self, card)
+        audio_config, _, preview_config = load_config()
+        self.height = int(preview_config[PreviewCfg.HEIGHT])
+        self.width = int(preview_config[PreviewCfg.WIDTH])
+        delay_scaled = bool(preview_config[PreviewCfg.DELAY_SCALED])
+
+        # THE VIDEO CARD SCALES THE FRAMES TO THE SIZE OF THE WINDOW (UNLESS FULL SIZE FRAMES
+        # ARE DELAYED AND SCALED AS THEY ARE DISPLAYED).
+        VideoHandler.__init__(self, card, (self.width, self.height) if delay_scaled else None)
 
         # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
         self.playing: bool = False
         self.play_thread = None
 
         # DELAY VIDEO TO SYNC WITH AUDIO
-        audio_config, _, preview_config = load_config()
-        self.video_buffer: [bytes] = []
         if bool(audio_config[AudioCfg.SYNC_PLAYER]):
             startup_duration: float = (float(audio_config[AudioCfg.SECS_OF_BUFFER]) + self.pre_start_delay)
             startup_duration *= float(self.card.fps)
@@ -48,43 +64,45 @@ class VideoPlayer(VideoHandler):
         else:
             self.buffer_frame_count = 1
 
-        self.height = int(preview_config[PreviewCfg.HEIGHT])
-        self.width = int(preview_config[PreviewCfg.WIDTH])
+        # THE DELAY ITSELF (AND A LITTLE ROOM TO INCREASE IT WHILE PLAYING).
+        capacity = self.buffer_frame_count + 1 + DELAY_HEADROOM_FRAMES
+        if delay_scaled:
+            self.delay_line = DelayLine(capacity, self.height, self.width)
+        else:
+            self.delay_line = DelayLine(capacity, self.card.height, self.card.width)
+        self.delay_line.set_depth(self.buffer_frame_count)
+
+    def set_delay(self, seconds: float) -> float:
+        """
+        :about: Change how far the video trails the video card while playing.
+        :param seconds: the delay wanted
+        :returns: the delay (in seconds) actually used.  It is limited by the size of the
+                  delay line (DELAY_HEADROOM_FRAMES more than the delay it started with).
+        """
+        frames = self.delay_line.set_depth(round(seconds * self.card.fps))
+        log.info(f"Video delay set to {frames} frames.")
+        return frames / self.card.fps
 
     def before_processing(self):
         log.info("video-thread is starting.")
 
-        # fill buffer
-        start_time = time.monotonic()
-        while len(self.video_buffer) < self.buffer_frame_count:
-            process_at = self.next_frame_at(start_time)
-            while process_at > time.monotonic():
-                time.sleep(self.time_to_sleep)
-
-            self.next_frame(self.card.most_recent_frame())
-            self.video_buffer.append(self.frame)
-
     def after_processing(self, monotonic_start_time):
-        tm = time.monotonic() - monotonic_start_time
+        tm = self.card.clock.now() - monotonic_start_time
         calc_fps = round(self.frame_count / tm, 3)
 
         log.info(f"Displayed {self.frame_count} frames in {round(tm, 1)} seconds. ({calc_fps} frames/second)")
         cv2.destroyWindow("Display from Video Card")
 
     def process_single_frame(self):
-        self.next_frame(self.card.most_recent_frame())
-        self.video_buffer.append(self.frame)
-
-        if len(self.video_buffer) > 0:
-            frame = self.video_buffer.pop(0)
-            resized = cv2.resize(frame, (self.width, self.height))
-            cv2.imshow("Display from Video Card", resized)
-
-            self.new_frame_avail = False
-        else:
-            exc = IOError(f"Unable to display at {self.card.fps} frames/second.")
-            log.exception(exc)
-            raise exc
+        if not self.new_frame_avail:
+            return
+
+        # NOTHING IS DISPLAYED UNTIL THE DELAY LINE HAS FILLED.
+        frame = self.delay_line.push(self.frame)
+        self.new_frame_avail = False
+        if frame is not None:
+            frame = resize_image(frame, (self.width, self.height))
+            cv2.imshow("Display from Video Card", frame)
 
         keypress = cv2.waitKey(1)
         if keypress & 0xFF == 27:
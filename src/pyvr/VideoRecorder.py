@@ -8,13 +8,21 @@
         Date:   October 2023</pre>
     </div>
 """
-import cv2
+from functools import partial
+
 import logging as log
-import time
-import threading
 
+from .AsyncFrameWriter import AsyncFrameWriter
+from .configuration import load_config, VideoCfg
+from .LazyModule import LazyModule
+from .SegmentManifest import SegmentManifest, VIDEO
+from .TimingLog import TimingLog
 from .VideoCard import VideoCard
 from .VideoHandler import VideoHandler
+from .VideoSource import MJPEG_FOURCC
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
 
 
 class VideoRecorder(VideoHandler):
@@ -25,11 +33,19 @@ class VideoRecorder(VideoHandler):
 
     ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
     """
-    def __init__(self, filename: str, card: VideoCard) -> None:
+    # A RECORDING STARTS WITH THE PRE-ROLL (SEE PreRollSecs IN pyvr.ini)
+    pre_roll: bool = True
+
+    # WITH MjpegPassthrough (SEE pyvr.ini) THE COMPRESSED FRAMES ARE STORED WITHOUT BEING DECODED.
+    raw_frames: bool = True
+
+    def __init__(self, filename: str, card: VideoCard, manifest: SegmentManifest | None = None) -> None:
         """
         :about: VideoRecorder constructor
         :param filename: filename (currently must end with .mp4) to record video to.
         :param card:  object used to retrieve the video frames from the hardware.
+        :param manifest: split the recording into the segments it describes instead of
+                         recording to filename.
         """
         VideoHandler.__init__(self, card)
 
@@ -40,29 +56,95 @@ class VideoRecorder(VideoHandler):
         # MEMBERS RELATED TO INTER-THREAD COMMUNICATION
         self.recording = False
         self.record_thread = None
+
+        # FRAMES ARE WRITTEN ON THEIR OWN THREAD (SEE WriterQueueFrames IN pyvr.ini)
+        _, video_config, _ = load_config()
+        self.writer_queue_frames: int = int(video_config[VideoCfg.WRITER_QUEUE_FRAMES])
+        self.writer_batch_frames: int = int(video_config[VideoCfg.WRITER_BATCH_FRAMES])
+
+        # MEMBERS RELATED TO SEGMENTS (SEE SegmentMins IN pyvr.ini)
+        self.manifest: SegmentManifest | None = manifest
+        self.segment: int = 1
+        self.segment_frames: int = 0
+        if manifest is not None:
+            filename = manifest.open_segment(self.segment, VIDEO)
+
         self.filename = filename
+        self.timing = TimingLog(filename, self.card.fps)
+        self.writer = self.open_writer(filename)
+
+    def open_writer(self, filename: str) -> AsyncFrameWriter:
+        """
+        :about: Create the file the frames are written to.  MJPEG frames are stored in the
+                file as they were captured (nothing is decoded or encoded).
+        """
+        if self.card.passthrough:
+            video_writer = cv2.VideoWriter(filename,
+                                           cv2.CAP_FFMPEG,
+                                           cv2.VideoWriter.fourcc(*MJPEG_FOURCC),
+                                           self.card.fps,
+                                           (self.card.width, self.card.height),
+                                           [cv2.VIDEOWRITER_PROP_RAW_VIDEO, 1]
+                                           )
+        else:
+            video_writer = cv2.VideoWriter(filename,
+                                           self.codec,
+                                           self.card.fps,
+                                           (self.card.width, self.card.height)
+                                           )
+
+        return AsyncFrameWriter(video_writer,
+                                filename,
+                                self.writer_queue_frames,
+                                self.writer_batch_frames,
+                                self.card.ring
+                                )
 
-        self.writer = cv2.VideoWriter(self.filename,
-                                      self.codec,
-                                      self.card.fps,
-                                      (self.card.width, self.card.height)
-                                      )
+    def next_segment(self) -> None:
+        """
+        :about: Close the current segment and start the next.  The new file starts with a
+                keyframe.
+        """
+        # THE SEGMENT IS READY TO ENCODE ONCE ITS LAST FRAMES ARE WRITTEN.  RECORDING DOES NOT WAIT FOR THAT.
+        self.writer.release(wait=False, on_closed=partial(self.manifest.close_segment, self.segment, VIDEO))
+        self.timing.close()
+
+        self.segment += 1
+        self.segment_frames = 0
+        self.filename = self.manifest.open_segment(self.segment, VIDEO)
+        self.timing = TimingLog(self.filename, self.card.fps)
+        self.timing.open()
+        self.writer = self.open_writer(self.filename)
 
     def before_processing(self):
         log.info("video-write-thread started.")
+        self.timing.open()
 
     def after_processing(self, monotonic_start_time):
-        tm = time.monotonic() - monotonic_start_time
+        tm = self.card.clock.now() - monotonic_start_time
         calc_fps = round(self.frame_count / tm, 3)
 
         log.info(f"Recorded {self.frame_count} frames in {round(tm, 1)} seconds. ({calc_fps} frames/second)")
+        log.info(f"{self.subscription.name}: {self.subscription.dropped} frames dropped, "
+                 f"{self.subscription.duplicated} duplicated.")
         self.writer.release()
+        self.timing.close()
+        if self.manifest is not None:
+            self.manifest.close_segment(self.segment, VIDEO)
 
     def process_single_frame(self):
-        if self.new_frame_avail:
-            self.writer.write(self.frame)
-            self.new_frame_avail = False
-        else:
-            exc = IOError(f"Unable to record at {self.card.fps} frames/second.")
-            log.exception(exc)
-            raise exc
+        # NO FRAME IS READY.  THE OverloadPolicy (SEE pyvr.ini) DECIDES WHETHER THE LAST ONE IS WRITTEN AGAIN.
+        if not self.new_frame_avail and not self.missing_frame():
+            return
+
+        # A SEGMENT ENDS AT THE FIRST FRAME CAPTURED AT OR AFTER ITS BOUNDARY.
+        if self.manifest is not None and self.frame_is_new \
+                and self.frame_timestamp >= self.manifest.boundary(self.segment):
+            self.next_segment()
+
+        # POSITIONS COUNT THE FRAMES WRITTEN, SO DROPPED FRAMES STAY IN SYNC WITH THE AUDIO WHEN ENCODING.
+        self.writer.write(self.frame, self.last_seq)
+        if self.frame_is_new:
+            self.timing.write(self.segment_frames, self.frame_timestamp)
+        self.segment_frames += 1
+        self.new_frame_avail = False
@@ -0,0 +1,239 @@
+"""
+.. RAW:: html
+
+    <h3 class="cls_header">VideoSource</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+import numpy as np
+
+from .configuration import VideoCfg, VideoSourceType
+from .DeadlineScheduler import DeadlineScheduler, PacingPolicy
+from .LazyModule import LazyModule
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+# FOURCC OF THE ONLY COMPRESSED FORMAT STORED AS CAPTURED (SEE MjpegPassthrough IN pyvr.ini)
+MJPEG_FOURCC = "MJPG"
+
+
+def fourcc_name(fourcc: float) -> str:
+    """
+    :about: The 4 character name of a fourcc reported by cv2 (ie: MJPG).
+    """
+    return int(fourcc).to_bytes(4, "little").decode("ascii", errors="replace")
+
+
+def copy_packet(packet: np.ndarray, image: np.ndarray | None) -> np.ndarray:
+    """
+    :about: Copy a compressed frame into the start of image (when it fits).
+    :returns: the frame's bytes (a view of image if it was used)
+    """
+    data = packet.reshape(-1)
+    if image is None or image.ndim != 1 or image.size < data.size:
+        return data
+    np.copyto(image[:data.size], data)
+    return image[:data.size]
+
+
+class PacedSource:
+    """
+    Base class for video sources that do not come from hardware.  When running in real
+    time, :py:meth:`wait_for_next_frame` sleeps until the next frame is due, just as a
+    capture card would.  Otherwise frames are produced as fast as they are read.
+    """
+    def __init__(self, fps: int, real_time: bool) -> None:
+        self.fps: int = fps
+        self.real_time: bool = real_time
+        self.frame_count: int = 0
+        self.opened: bool = True
+
+        # LIKE A CAPTURE CARD, FRAMES THAT ARE NOT READ IN TIME ARE LOST.
+        self.scheduler: DeadlineScheduler = DeadlineScheduler(1 / fps, policy=PacingPolicy.SKIP, name="video source")
+
+    def wait_for_next_frame(self) -> None:
+        """
+        :about: Keep real time pacing.  Frame n is delivered n / fps seconds after the first.
+        """
+        if self.real_time:
+            self.scheduler.wait()
+
+        self.frame_count += 1
+
+    def isOpened(self) -> bool:
+        """ Same as :py:meth:`cv2.VideoCapture.isOpened` """
+        return self.opened
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """ Same as :py:meth:`cv2.VideoCapture.set`.  The properties of these sources are fixed. """
+        return False
+
+    def release(self) -> None:
+        """ Same as :py:meth:`cv2.VideoCapture.release` """
+        self.opened = False
+        self.scheduler.stop()
+        if self.real_time:
+            self.scheduler.log_stats()
+
+
+class SyntheticVideoSource(PacedSource):
+    """
+    A video source that generates a moving test pattern with the frame number drawn on it.
+    It behaves like a :py:class:`cv2.VideoCapture` so it can stand in for a capture card.
+    """
+    def __init__(self, width: int, height: int, fps: int, real_time: bool = True) -> None:
+        """
+        :about: SyntheticVideoSource constructor
+        :param width: width (in pixels) of the generated frames
+        :param height: height (in pixels) of the generated frames
+        :param fps: frames per second to generate
+        :param real_time: TRUE to deliver frames at fps, FALSE to deliver them as fast as possible
+        """
+        PacedSource.__init__(self, fps, real_time)
+        self.width: int = width
+        self.height: int = height
+
+        # A PATTERN TWICE AS WIDE AS A FRAME.  EACH FRAME IS A WINDOW INTO IT THAT SLIDES ACROSS.
+        ramp = np.linspace(0, 255, width, dtype=np.uint8)
+        row = np.stack([ramp, ramp[::-1], np.roll(ramp, width // 3)], axis=-1)
+        self.pattern: np.ndarray = np.ascontiguousarray(np.tile(np.concatenate([row, row[::-1]]), (height, 1, 1)))
+
+    def read(self, image: np.ndarray | None = None) -> (bool, np.ndarray):
+        """
+        :about: Same as :py:meth:`cv2.VideoCapture.read`.  Generate the next frame, into image if
+                it is supplied and the correct size.
+        """
+        if not self.opened:
+            return False, image
+
+        self.wait_for_next_frame()
+        if image is None or image.shape != (self.height, self.width, 3):
+            image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        offset = (self.frame_count * 8) % self.width
+        np.copyto(image, self.pattern[:, offset:offset + self.width])
+        cv2.putText(image, str(self.frame_count), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        return True, image
+
+
+class FileVideoSource(PacedSource):
+    """
+    A video source that replays the frames of a video file (looping at the end).  It
+    behaves like a :py:class:`cv2.VideoCapture` so it can stand in for a capture card.
+
+    With *passthrough* the file must hold MJPEG video (ie: an .avi or .mjpeg file) and
+    its frames are delivered as they are stored, without being decoded, just like a
+    capture card asked for MJPEG.
+    """
+    def __init__(self,
+                 filename: str,
+                 width: int,
+                 height: int,
+                 fps: int,
+                 real_time: bool = True,
+                 passthrough: bool = False
+                 ) -> None:
+        """
+        :about: FileVideoSource constructor
+        :param filename: the video file to replay
+        :param width: width (in pixels) of the frames delivered. Frames are resized if needed.
+        :param height: height (in pixels) of the frames delivered.
+        :param fps: frames per second to deliver
+        :param real_time: TRUE to deliver frames at fps, FALSE to deliver them as fast as possible
+        :param passthrough: TRUE to deliver the compressed MJPEG frames instead of images
+        """
+        PacedSource.__init__(self, fps, real_time)
+        self.filename: str = filename
+        self.width: int = width
+        self.height: int = height
+        self.passthrough: bool = passthrough
+        self.capture: cv2.VideoCapture = cv2.VideoCapture(filename)
+        self.opened = self.capture.isOpened()
+        self.scratch: np.ndarray | None = None
+
+        if self.opened and passthrough:
+            fourcc = fourcc_name(self.capture.get(cv2.CAP_PROP_FOURCC))
+            if fourcc != MJPEG_FOURCC:
+                self.capture.release()
+                exc = IOError(f"{filename} holds {fourcc} video.  MjpegPassthrough needs {MJPEG_FOURCC}.")
+                log.exception(exc)
+                raise exc
+            # DELIVER EACH FRAME AS IT IS STORED IN THE FILE.
+            self.capture.set(cv2.CAP_PROP_FORMAT, -1)
+
+    def read(self, image: np.ndarray | None = None) -> (bool, np.ndarray):
+        """
+        :about: Same as :py:meth:`cv2.VideoCapture.read`.  Decode the next frame of the file.
+        """
+        if not self.opened:
+            return False, image
+
+        self.wait_for_next_frame()
+        valid, self.scratch = self.capture.read(self.scratch)
+        if not valid:
+            # START OVER AT THE END OF THE FILE.
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            valid, self.scratch = self.capture.read(self.scratch)
+            if not valid:
+                return False, image
+
+        if self.passthrough:
+            return True, copy_packet(self.scratch, image)
+
+        if self.scratch.shape[0] == self.height and self.scratch.shape[1] == self.width:
+            if image is None:
+                return True, self.scratch.copy()
+            np.copyto(image, self.scratch)
+            return True, image
+
+        return True, cv2.resize(self.scratch, (self.width, self.height), dst=image)
+
+    def release(self) -> None:
+        """ Same as :py:meth:`cv2.VideoCapture.release` """
+        PacedSource.release(self)
+        self.capture.release()
+
+
+def open_video_source(video_config: dict) -> "cv2.VideoCapture | PacedSource":
+    """
+    :about: Open the video source selected by *Source* in the [VIDEO] section of pyvr.ini.
+    :param video_config: the [VIDEO] section of pyvr.ini
+    :returns: an object with the same interface as :py:class:`cv2.VideoCapture`
+    """
+    source = VideoSourceType(video_config[VideoCfg.SOURCE].lower())
+    width = int(video_config[VideoCfg.WIDTH])
+    height = int(video_config[VideoCfg.HEIGHT])
+    fps = int(video_config[VideoCfg.FPS])
+    real_time = bool(video_config[VideoCfg.REAL_TIME])
+    passthrough = bool(video_config[VideoCfg.MJPEG_PASSTHROUGH])
+
+    log.debug(f"    - source = {source.value}")
+    match source:
+        case VideoSourceType.SYNTHETIC:
+            return SyntheticVideoSource(width, height, fps, real_time)
+        case VideoSourceType.FILE:
+            return FileVideoSource(video_config[VideoCfg.SOURCE_FILE], width, height, fps, real_time, passthrough)
+
+    vid_source = cv2.VideoCapture(video_config[VideoCfg.DEVICE])
+    if passthrough:
+        # ASK THE CARD FOR MJPEG AND KEEP OPENCV FROM DECODING IT.
+        vid_source.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*MJPEG_FOURCC))
+        vid_source.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        vid_source.set(cv2.CAP_PROP_FPS, fps)
+    vid_source.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    vid_source.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+
+    if passthrough and vid_source.isOpened():
+        fourcc = fourcc_name(vid_source.get(cv2.CAP_PROP_FOURCC))
+        if fourcc != MJPEG_FOURCC:
+            vid_source.release()
+            exc = IOError(f"{video_config[VideoCfg.DEVICE]} delivers {fourcc} video.  MjpegPassthrough needs "
+                          f"{MJPEG_FOURCC}.")
+            log.exception(exc)
+            raise exc
+    return vid_source
@@ -0,0 +1,62 @@
+"""
+... RAW:: html
+
+    <h3 class="cls_header">VideoStreamer</h3>
+    <div class="highlight cls_author">
+        <pre>
+        Author: Jeffery Alkire
+        Date:   October 2026</pre>
+    </div>
+"""
+import logging as log
+
+from .FfmpegMuxer import FfmpegMuxer
+from .VideoCard import VideoCard
+from .VideoHandler import VideoHandler
+
+
+class VideoStreamer(VideoHandler):
+    """
+    A VideoStreamer object will start a thread that sends the video frames supplied by
+    :py:class:`VideoCard<pyvr.VideoCard.VideoCard>` straight to a
+    :py:class:`FfmpegMuxer<pyvr.FfmpegMuxer.FfmpegMuxer>` at the proper pace.
+
+    ... SEEALSO:: Code snippet from :py:func:`record(...)<pyvr.record>`
+    """
+    # A RECORDING STARTS WITH THE PRE-ROLL (SEE PreRollSecs IN pyvr.ini)
+    pre_roll: bool = True
+
+    # FRAME n IS PRESENTED n / fps SECONDS IN, SO A DROPPED FRAME WOULD PUT THE AUDIO OUT OF SYNC.
+    can_drop_frames: bool = False
+
+    def __init__(self, muxer: FfmpegMuxer, card: VideoCard) -> None:
+        """
+        :about: VideoStreamer constructor
+        :param muxer: ffmpeg process the raw frames are sent to.
+        :param card:  object used to retrieve the video frames from the hardware.
+        """
+        # THE VIDEO CARD SCALES THE FRAMES IF THE MUXER EXPECTS A DIFFERENT SIZE.
+        VideoHandler.__init__(self, card, (muxer.width, muxer.height))
+
+        log.info("Setup video streamer.")
+        self.muxer: FfmpegMuxer = muxer
+
+    def before_processing(self):
+        log.info("video-stream-thread started.")
+
+    def after_processing(self, monotonic_start_time):
+        tm = self.card.clock.now() - monotonic_start_time
+        calc_fps = round(self.frame_count / tm, 3)
+
+        log.info(f"Streamed {self.frame_count} frames in {round(tm, 1)} seconds. ({calc_fps} frames/second)")
+        log.info(f"{self.subscription.name}: {self.subscription.dropped} frames dropped, "
+                 f"{self.subscription.duplicated} duplicated.")
+        self.muxer.close_video()
+
+    def process_single_frame(self):
+        # NO FRAME IS READY.  THE LAST ONE IS SENT AGAIN (SEE OverloadPolicy IN pyvr.ini).
+        if not self.new_frame_avail and not self.missing_frame():
+            return
+
+        self.muxer.write_video(self.frame, self.frame_timestamp)
+        self.new_frame_avail = False
@@ -1,28 +1,50 @@
 """
 Routines that can be used to simplify or remove the interaction with the classes
 """
-import cv2
+import datetime as dt
 import logging as log
 import os
-import time
-
-import msutils as msu
+import sys
+import threading as thr
 
+from .AsyncFrameWriter import AsyncFrameWriter
 from .AudioPlayer import AudioPlayer
 from .AudioRecorder import AudioInput, AudioRecorder
-from .configuration import load_config, PreviewCfg
+from .AudioStreamer import AudioStreamer
+from .ConsoleControl import ConsoleControl, STATUS_SECS
+from .CaptureDaemon import CaptureDaemon
+from .configuration import load_config, load_encode_config, load_encode_profile, load_telemetry_config
+from .configuration import AudioCfg, EncodeCfg, EncodeMode, EncodeProfileCfg, PreviewCfg, TelemetryCfg, VideoCfg
+from .DeadlineScheduler import DeadlineScheduler, PacingPolicy
+from .EncodeQueue import EncodeQueue
+from .EncodeWorker import EncodeWorker
+from .encoding import audio_codec_args, combine_in_segments, drift_correction_filter, run_ffmpeg, video_codec_args, worker_count
+from .encoding import FFMPEG_PROC_NAME
+from .FfmpegMuxer import FfmpegMuxer
+from .imaging import resize_image
+from .LazyModule import LazyModule
+from .MediaClock import MediaClock, shared_clock
+from .PreviewStage import PreviewStage
+from .RecordingSchedule import RecordingSchedule, ScheduledRecording
+from .SegmentEncoder import SegmentEncoder
+from .SegmentManifest import SegmentManifest
+from .Telemetry import Telemetry, shared_telemetry
+from .TelemetryServer import TelemetryServer
+from .TimingLog import timing_filename
 from .VideoRecorder import VideoCard, VideoRecorder
 from .VideoPlayer import VideoPlayer
+from .VideoStreamer import VideoStreamer
+
+# SLOW IMPORTS ARE DEFERRED UNTIL THEY ARE USED.
+cv2 = LazyModule("cv2")
 
 # GLOBAL VARIABLES FOR FILE EXTENSION TYPES
 VIDEO_EXT = "mp4"
 AUDIO_EXT = "wav"
 RESULT_EXT = "mkv"
 
-FFMPEG_PROC_NAME = "ffmpeg"
-
 
-def record(filename_no_ext: str) -> None:
+def record(filename_no_ext: str, profile: str | None = None) -> None:
     """
     :about: This is the main entrypoint to the pyvr package.  It is likely the only function
             you will use. **Call it to record video and audio from you system.**
@@ -30,8 +52,15 @@ def record(filename_no_ext: str) -> None:
                             filename will be used to create 2 intermediate files (one .wav and
                             one .mp4) that are combined after the recording is complete into
                             the .mkv file.
+    :param profile: name of the encoding profile used for the .mkv file.  None for
+                    *Profile* in the [ENCODE] section of pyvr.ini.
     :Side Effect: Creation of a .mkv file recording the requested audio and video.
 
+    note::
+        When *Mode=Stream* is set in the [ENCODE] section of pyvr.ini, no intermediate files
+        are created.  The audio and video are encoded straight into the .mkv file while
+        recording (see :py:class:`FfmpegMuxer<pyvr.FfmpegMuxer.FfmpegMuxer>`).
+
     note::
         This routine makes a great example of how to interact with the classes in this package.
 
@@ -57,67 +86,336 @@ def record(filename_no_ext: str) -> None:
     width: int = int(preview_config[PreviewCfg.WIDTH])
     height: int = int(preview_config[PreviewCfg.HEIGHT])
     interval: float = float(preview_config[PreviewCfg.INTERVAL])
+    headless: bool = bool(preview_config[PreviewCfg.HEADLESS])
+
+    if load_encode_config()[EncodeCfg.MODE] == EncodeMode.STREAM:
+        record_stream(filename_no_ext, width, height, interval, profile)
+        return
 
     # Each with line creates its own thread.
     with VideoCard() as vc:
-        with VideoRecorder(f"{filename_no_ext}.{VIDEO_EXT}", vc) as vr:
+        encoder = segment_encoder(filename_no_ext, vc.clock.now(), True, profile)
+        manifest = encoder.manifest if encoder is not None else None
+        with VideoRecorder(f"{filename_no_ext}.{VIDEO_EXT}", vc, manifest) as vr:
             with AudioInput() as ai:
-                with AudioRecorder(ai, filename=f"{filename_no_ext}.{AUDIO_EXT}") as ar:
-                    while True:
-                        # Preview the video being recorded.
-                        f = vc.most_recent_frame()
-                        resized = cv2.resize(f, (width, height))
-                        cv2.imshow("Preview of Recording", resized)
+                with AudioRecorder(ai, filename=f"{filename_no_ext}.{AUDIO_EXT}", manifest=manifest) as ar:
+                    window_shown = watch_recording(vc, width, height, interval, headless)
+                    ar.processing = vr.processing = vc.viewing = False
+
+    if window_shown:
+        cv2.destroyWindow("Preview of Recording")
+    print("Processing final results.  Please be patient ...")
+    finish_recording(filename_no_ext, True, encoder, profile)
 
-                        # Stop/end recording when escape key is pressed.
-                        keypress = cv2.waitKey(1)
-                        if keypress & 0xFF == 27:
-                            break
 
-                        # Save some cpu for other people. Sleep and only show an occasional update.
-                        time.sleep(interval)
+def encode_queue() -> EncodeQueue | None:
+    """
+    :about: The queue recordings are added to when *Queue* is set in the [ENCODE] section
+            of pyvr.ini.
+    :returns: the queue or None if recordings are encoded as soon as they end.
+    """
+    encode_config = load_encode_config()
+    if not encode_config[EncodeCfg.QUEUE]:
+        return None
+    return EncodeQueue(encode_config[EncodeCfg.QUEUE_FILE])
 
-                    ar.processing = ai.new_audio_sample = vr.processing = vc.viewing = False
 
-    cv2.destroyWindow("Preview of Recording")
+def finish_recording(filename_no_ext: str,
+                     delete_files: bool,
+                     encoder: SegmentEncoder | None = None,
+                     profile: str | None = None
+                     ) -> None:
+    """
+    :about: Turn the intermediate files of a recording into the final .mkv file, or queue
+            them to be encoded by encode_worker.py when *Queue* is set in the [ENCODE]
+            section of pyvr.ini.
+    :param filename_no_ext: The name of the recording (without any extension).
+    :param delete_files: TRUE to remove the intermediate files once they are encoded
+    :param encoder: the encoder of a recording split into segments (see :py:func:`segment_encoder`)
+    :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+    """
+    queue = encode_queue()
+    if queue is not None:
+        queue.enqueue(filename_no_ext, delete_files, encoder is not None, profile)
+        print(f"{filename_no_ext} is queued to be encoded.")
+        return
+
     log.info("Combine and compress recording information.")
-    print("Processing final results.  Please be patient ...")
-    combine_video_and_audio(f"{filename_no_ext}.{VIDEO_EXT}",
-                            f"{filename_no_ext}.{AUDIO_EXT}",
-                            f"{filename_no_ext}.{RESULT_EXT}"
-                            )
-    # delete video and audio files.
-    os.remove(f"{filename_no_ext}.{VIDEO_EXT}")
-    os.remove(f"{filename_no_ext}.{AUDIO_EXT}")
+    if encoder is not None:
+        # EARLIER SEGMENTS WERE ENCODED WHILE RECORDING.  ONLY THE LAST ONE IS LEFT.
+        encoder.finish()
+        return
+
+    encode_recording(filename_no_ext, delete_files, profile=profile)
+
+
+def encode_recording(filename_no_ext: str, delete_files: bool, segmented: bool = False, profile: str | None = None) -> None:
+    """
+    :about: Encode the intermediate files of a recording into the final .mkv file.
+    :param filename_no_ext: The name of the recording (without any extension).
+    :param delete_files: TRUE to remove the intermediate files once they are encoded
+    :param segmented: TRUE if the recording was split into segments
+    :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+    :Side Effect: Creation of a .mkv file recording the requested audio and video.
+    """
+    resulting_file = f"{filename_no_ext}.{RESULT_EXT}"
+    if segmented:
+        # A SEGMENT THAT CANNOT BE ENCODED RAISES, SO THE JOB IS RETRIED.
+        resume_recording(filename_no_ext, delete_files, profile)
+    else:
+        # A FILE LEFT BY AN EARLIER ATTEMPT MUST NOT BE MISTAKEN FOR THIS ONE'S RESULT.
+        if os.path.isfile(resulting_file):
+            os.remove(resulting_file)
+        combine_video_and_audio(f"{filename_no_ext}.{VIDEO_EXT}", f"{filename_no_ext}.{AUDIO_EXT}", resulting_file, profile)
+
+    # THE INTERMEDIATE FILES ARE ONLY REMOVED ONCE THE RESULT EXISTS, SO A FAILED ENCODE CAN BE RETRIED.
+    if not os.path.isfile(resulting_file):
+        raise IOError(f"Encoding {filename_no_ext} did not create {resulting_file}.")
+    if delete_files and not segmented:
+        delete_intermediate_files(filename_no_ext)
+    log.info(f"Process complete. Results stored in {resulting_file}")
+
+
+def segment_encoder(filename_no_ext: str,
+                    start_time: float,
+                    delete_files: bool,
+                    profile: str | None = None
+                    ) -> SegmentEncoder | None:
+    """
+    :about: When *SegmentMins* is set in the [ENCODE] section of pyvr.ini, start encoding
+            the segments of a recording in the background as they are closed.
+    :param filename_no_ext: The name of the recording (without any extension).
+    :param start_time: clock time the recording starts (see :py:class:`MediaClock<pyvr.MediaClock.MediaClock>`)
+    :param delete_files: TRUE to remove the segment files once the recording is finished
+    :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+    :returns: the encoder (pass its manifest to the recorders) or None if the recording
+              is not split into segments.
+    """
+    segment_mins = float(load_encode_config()[EncodeCfg.SEGMENT_MINS])
+    if segment_mins <= 0:
+        return None
+
+    encoder = SegmentEncoder(SegmentManifest(filename_no_ext, segment_mins * 60, start_time),
+                             f"{filename_no_ext}.{RESULT_EXT}",
+                             delete_files,
+                             profile
+                             )
+    # QUEUED RECORDINGS ARE ENCODED BY encode_worker.py ONCE THEY END.
+    if encode_queue() is None:
+        encoder.start()
+    return encoder
+
+
+def resume_recording(filename_no_ext: str, delete_files: bool = False, profile: str | None = None) -> None:
+    """
+    :about: Finish a recording that was split into segments but interrupted (by a crash
+            or power failure) before its final file was made.  Every segment listed in
+            its manifest is encoded (if it was not already) and joined into the .mkv file.
+    :param filename_no_ext: The name of the recording (without any extension).
+    :param delete_files: TRUE to remove the segment files once the recording is finished
+    :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+    :Side Effect: Creation of a .mkv file from the segments that survived.
+
+    note::
+        The audio of an interrupted segment is always usable, but its video is only
+        readable if the recorder closed the file.  An interrupted segment that cannot be
+        read is left out of the final file.  Any other segment that cannot be encoded
+        raises an IOError (and can be resumed again later).
+    """
+    manifest = SegmentManifest.load(filename_no_ext)
+    if manifest.complete:
+        log.info(f"{filename_no_ext} is already complete.")
+        return
+
+    # SEGMENTS THAT WERE BEING RECORDED WHEN THE RECORDING WAS INTERRUPTED ARE TRIED AS WELL.
+    for segment in manifest.segments:
+        if len(segment["closed"]) < 2:
+            segment["interrupted"] = True
+        segment["closed"] = [part for part in ("video", "audio") if os.path.isfile(segment[part])]
+
+    with SegmentEncoder(manifest, f"{filename_no_ext}.{RESULT_EXT}", delete_files, profile):
+        print(f"Finishing {filename_no_ext}.  Please be patient ...")
+
+
+def delete_intermediate_files(filename_no_ext: str) -> None:
+    """
+    :about: Remove the intermediate video and audio files (and their timing sidecars).
+    :param filename_no_ext: The name of the recording (without any extension).
+    """
+    for media_file in (f"{filename_no_ext}.{VIDEO_EXT}", f"{filename_no_ext}.{AUDIO_EXT}"):
+        os.remove(media_file)
+        if os.path.isfile(timing_filename(media_file)):
+            os.remove(timing_filename(media_file))
 
+
+def record_stream(filename_no_ext: str, width: int, height: int, interval: float, profile: str | None = None) -> None:
+    """
+    :about: Record video and audio straight into the final .mkv file.  A single ffmpeg
+            process encodes and muxes while recording, so the file is ready moments after
+            the recording stops.
+    :param filename_no_ext: The name of the resulting file (without the .mkv extension).
+    :param width: width of the preview window
+    :param height: height of the preview window
+    :param interval: seconds between preview updates
+    :param profile: name of the encoding profile.  None for *Profile* in pyvr.ini.
+    :Side Effect: Creation of a .mkv file recording the requested audio and video.
+    """
+    headless: bool = bool(load_config()[2][PreviewCfg.HEADLESS])
+    ai = AudioInput()
+
+    # Each with line creates its own thread.
+    with VideoCard() as vc:
+        with FfmpegMuxer(f"{filename_no_ext}.{RESULT_EXT}", vc, ai, profile) as muxer:
+            with VideoStreamer(muxer, vc) as vs:
+                with ai:
+                    with AudioStreamer(ai, muxer) as ast:
+                        window_shown = watch_recording(vc, width, height, interval, headless, muxer.failed)
+                        ast.processing = vs.processing = vc.viewing = False
+
+    if window_shown:
+        cv2.destroyWindow("Preview of Recording")
     log.info(f"Process complete. Results stored in {filename_no_ext}.{RESULT_EXT}")
 
 
-def combine_video_and_audio(video_file: str, audio_file: str, resulting_file: str) -> None:
+def watch_recording(vc: VideoCard,
+                    width: int,
+                    height: int,
+                    interval: float,
+                    headless: bool,
+                    stopped: thr.Event | None = None
+                    ) -> bool:
+    """
+    :about: Show the recording in a preview window or, when headless, report its status
+            on the console.  Returns when the user ends the recording.
+    :param stopped: event set when the recording must end (ie: the streaming muxer failed)
+    :returns: TRUE if a preview window was opened (and must be closed).
+    """
+    if headless:
+        with ConsoleControl() as control:
+            monitor_recording(vc, control, stopped)
+        return False
+    return preview_recording(vc, width, height, interval, stopped)
+
+
+def recording_status(vc: VideoCard, started_at: dt.datetime, stop_recording_at: dt.datetime | None = None) -> str:
+    """
+    :about: One line describing a recording in progress.
+    :param vc: video card supplying the frames
+    :param started_at: when the recording started
+    :param stop_recording_at: when the recording will stop (None if unknown)
+    """
+    now = dt.datetime.now()
+    status = f"{now:%H:%M:%S} recording {str(now - started_at).split('.')[0]}"
+    if stop_recording_at is not None:
+        status += f", {str(max(dt.timedelta(0), stop_recording_at - now)).split('.')[0]} left"
+    status += f", {vc.ring.latest_seq + 1} frames"
+
+    # EACH RECORDER/STREAMER REPORTS THE FRAMES IT MISSED.  A PREVIEW ONLY EVER WANTS THE LATEST FRAME.
+    with vc.scale_lock:
+        subscribers = [subscriber for subscriber in vc.subscribers if not subscriber.latest_only]
+    for subscriber in subscribers:
+        status += f", {subscriber.name} ({subscriber.dropped} dropped, {subscriber.duplicated} duplicated)"
+    return status
+
+
+def monitor_recording(vc: VideoCard,
+                      control: ConsoleControl,
+                      stopped: thr.Event | None = None,
+                      stop_recording_at: dt.datetime | None = None
+                      ) -> None:
+    """
+    :about: Report the status of a recording as text every STATUS_SECS (and whenever
+            asked) until it is stopped.  Used instead of :py:func:`preview_recording` when
+            there is no display.  Nothing is drawn and no frames are scaled.
+    :param vc: video card supplying the frames
+    :param control: console commands and signals (see :py:class:`ConsoleControl<pyvr.ConsoleControl.ConsoleControl>`)
+    :param stopped: event set when the recording ends on its own (at its stop time)
+    :param stop_recording_at: when the recording will stop (None if unknown)
+    """
+    started_at = dt.datetime.now()
+    # ON A TERMINAL THE STATUS LINE IS REWRITTEN IN PLACE.  IN A LOG EACH REPORT IS A NEW LINE.
+    end = "\r" if sys.stdout.isatty() else "\n"
+    next_report = 0.0
+    while not (stopped is not None and stopped.is_set()):
+        if control.status_due() or vc.clock.now() >= next_report:
+            print(recording_status(vc, started_at, stop_recording_at), end=end, flush=True)
+            next_report = vc.clock.now() + STATUS_SECS
+
+        # WAKE AT LEAST ONCE A SECOND TO NOTICE THE RECORDING ENDING ON ITS OWN.
+        if control.wait(max(0.0, min(1.0, next_report - vc.clock.now()))):
+            break
+
+    print()
+    log.info(recording_status(vc, started_at, stop_recording_at))
+
+
+def preview_recording(vc: VideoCard, width: int, height: int, interval: float, stopped: thr.Event | None = None) -> bool:
+    """
+    :about: Show a preview of the video being recorded until the escape key is pressed.
+    :param vc: video card supplying the frames
+    :param width: width of the preview window
+    :param height: height of the preview window
+    :param interval: fewest seconds between preview updates
+    :param stopped: event set when the recording must end without the escape key
+    :returns: TRUE if the preview window was opened (a frame was shown).
+    """
+    with PreviewStage(vc, (width, height), interval) as preview:
+        # Stop/end recording when escape key is pressed.
+        while preview.wait() and not (stopped is not None and stopped.is_set()):
+            if not preview.show("Preview of Recording"):
+                break
+
+    return preview.frames_shown > 0
+
+
+def combine_video_and_audio(video_file: str, audio_file: str, resulting_file: str, profile: str | None = None) -> None:
     """
     :about: Routine to combine a video file (with no audio) and an audio file into a single
-            file using the H.265 codec creating a that is as small as possible without losing
-            its quality.
+            file.  By default the H.265 codec is used, creating a file that is as small as
+            possible without losing its quality.
 
-    :param video_file: filename of the video file as a string (must end in .mp4)
-    :param audio_file: filename of the audio file as a string (must end in .wav)
-    :param resulting_file: store the resulting combined file in this filename (must end in .mkv)
+    :param video_file: filename of the video file as a string (ie: .mp4)
+    :param audio_file: filename of the audio file as a string (ie: .wav)
+    :param resulting_file: store the resulting combined file in this filename (ie: .mkv)
+    :param profile: name of the encoding profile to use.  None for *Profile* in the
+                    [ENCODE] section of pyvr.ini.
     :Side Effect: Creation of a .mkv file recording the requested audio and video.
+
+    note::
+        An encoding profile chooses the codecs, preset, quality (CRF) and threads.  Define
+        them in [ENCODE.<name>] sections of pyvr.ini.  default, fast, sports, film and
+        remux (copy the video without encoding it) are built in.
+
+    note::
+        Set *Workers* in the [ENCODE] section of pyvr.ini to split the video into segments
+        that are encoded at the same time (0 uses every cpu core).  The default (1) encodes
+        the whole file in a single process.
+
+    note::
+        If the recorders left timing sidecars next to the input files, the audio is shifted
+        and its tempo adjusted to keep it in sync with the video.
     """
-    assert video_file.endswith(".mp4")
-    assert audio_file.endswith(".wav")
-    assert resulting_file.endswith(".mkv")
     assert os.path.isfile(video_file)
     assert os.path.isfile(audio_file)
 
     if os.path.isfile(resulting_file):
         os.remove(resulting_file)
 
+    audio_filter = drift_correction_filter(video_file, audio_file)
+    encode_profile = load_encode_profile(profile)
+
+    # A REMUX COPIES THE VIDEO.  THERE IS NOTHING TO SPLIT BETWEEN WORKERS.
+    workers: int = worker_count(int(load_encode_config()[EncodeCfg.WORKERS]))
+    if workers > 1 and not encode_profile[EncodeProfileCfg.REMUX.value]:
+        combine_in_segments(video_file, audio_file, resulting_file, workers, audio_filter, encode_profile)
+        return
+
     ffmpeg_args: [str] = \
         [
             "nice",
             FFMPEG_PROC_NAME,
             "-y",
+            "-loglevel", "error",
             "-threads", "1",
             "-i", video_file,  # video input file
             "-i", audio_file,  # audio input
@@ -125,10 +423,9 @@ def combine_video_and_audio(video_file: str, audio_file: str, resulting_file: st
             "-map", "1:a",  # Keep all audio streams
             "-map", "0:s?",  # Keep all subtitles
             "-c:s", "mov_text",  # subtitle codec (matches original)
-            "-c:v", "libx265",  # video codec (hevc/h.265)
-            "-c:a", "ac3",  # audio codec (aac)
-            "-threads", "1",
-            resulting_file  # output file name
         ]
+    ffmpeg_args += video_codec_args(encode_profile)
+    ffmpeg_args += audio_codec_args(encode_profile, audio_filter)
+    ffmpeg_args.append(resulting_file)  # output file name
 
-    msu.run_ffmpeg(ffmpeg_args)
+    run_ffmpeg(ffmpeg_args)
@@ -0,0 +1,438 @@
+"""
+Benchmarks for the capture, record and encode pipeline.  Each scenario records from a
+synthetic (or file) source for a fixed time using the same classes as
+:py:func:`record(...)<pyvr.record>` and measures how well the recorder keeps up.  Results
+are written as JSON so that they can be compared across versions.
+
+.. code-block:: bash
+    :caption: Run the default scenarios and fail if they are slower than a stored baseline.
+
+        python -m pyvr.bench --output bench.json --baseline baseline.json
+
+The time taken to import pyvr is measured as well (in a fresh interpreter).  The run
+fails if it is over budget or if importing pyvr loaded OpenCV, an audio library or
+msutils.  Those are only loaded when they are used (see
+:py:class:`LazyModule<pyvr.LazyModule.LazyModule>`).
+"""
+from collections import namedtuple
+
+import datetime as dt
+import json
+import logging as log
+import optparse as cl  # cl = command line.
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from .AudioRecorder import AudioInput, AudioRecorder
+from .configuration import load_config, PreviewCfg, VideoCfg, VideoSourceType
+from .LazyModule import LazyModule
+from .PreviewStage import PreviewStage
+from .VideoRecorder import VideoCard, VideoRecorder
+
+cv2 = LazyModule("cv2")
+
+# SECONDS import pyvr MAY TAKE (MOSTLY numpy) BEFORE THE BENCHMARK FAILS
+IMPORT_BUDGET_SECS = 0.5
+
+# MODULES THAT MUST NOT BE LOADED BY import pyvr
+DEFERRED_MODULES = ("cv2", "alsaaudio", "pyaudio", "sounddevice", "msutils")
+
+# RUN IN A FRESH INTERPRETER TO TIME import pyvr
+IMPORT_PROBE = f"""
+import json, sys, time
+began = time.perf_counter()
+import pyvr
+print(json.dumps({{"secs": time.perf_counter() - began,
+                  "loaded": [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))
+"""
+
+# RESOLUTIONS (width, height) THAT CAN BE REQUESTED BY NAME
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+# CONFIGURATION USED FOR EVERY RUN.  EACH SCENARIO OVERRIDES THE [VIDEO] VALUES.
+BENCH_INI = """
+[AUDIO]
+SecsOfBuffer=0.1
+SyncPlayer=No
+Library=Synthetic
+Signal=Noise
+SampleRate=48000
+AudioChannelCount=2
+RealTime=Yes
+
+[VIDEO]
+PreStartDelay=0
+Source=Synthetic
+RealTime=Yes
+Width=1280
+Height=720
+FPS=30
+Codec=mp4v
+
+[PREVIEW]
+Width=640
+Height=360
+IntervalInSecs=0.1
+"""
+
+# METRICS CHECKED AGAINST THE BASELINE: name -> (TRUE if larger values are worse, allowed absolute slack)
+REGRESSION_CHECKS = {
+    "latency_p50_ms": (True, 1.0),
+    "latency_p99_ms": (True, 2.0),
+    "write_p99_ms": (True, 1.0),
+    "dropped_frames": (True, 2),
+    "overload_frames": (True, 2),
+    "cpu_percent": (True, 5.0),
+    "rss_mb": (True, 16.0),
+    "resize_p99_ms": (True, 0.5),
+    "jitter_p99_ms": (True, 0.5),
+    "achieved_fps": (False, 0.5),
+    "import_secs": (True, 0.05),
+    "combine_secs_per_min": (True, 1.0),
+}
+
+# RECORDER OVERLOAD COUNTERS (SEE OverloadPolicy) ADDED TOGETHER AS overload_frames.  EACH IS A
+# FRAME THE RECORDER FELL BEHIND ON.
+OVERLOAD_KINDS = ("overload_duplicated", "overload_dropped", "overload_degraded_ticks")
+
+Scenario = namedtuple("Scenario", "resolution codec fps source")
+"""
+**Named tuple** describing a single benchmark run.  *resolution* is a key of RESOLUTIONS,
+*codec* is the fourcc of the intermediate video file, *fps* the frames per second and
+*source* a :py:class:`VideoSourceType<pyvr.configuration.VideoSourceType>` value.
+"""
+
+
+def scenario_name(scenario: Scenario) -> str:
+    """
+    :about: The name a scenario is stored under in the results.
+    """
+    return f"{scenario.resolution}-{scenario.codec}-{scenario.fps}fps-{scenario.source}"
+
+
+def percentile(samples: [float], pct: float) -> float:
+    """
+    :about: Nearest rank percentile of a list of samples.
+    :param samples: the measurements
+    :param pct: the percentile wanted (0 - 100)
+    :returns: the percentile or 0 if there are no samples.
+    """
+    if len(samples) == 0:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def current_rss_mb() -> float:
+    """
+    :about: Resident memory of this process in megabytes.  Falls back to the peak resident
+            memory when /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def apply_scenario(scenario: Scenario, source_file: str | None) -> None:
+    """
+    :about: Change the loaded [VIDEO] configuration to match the scenario.  The classes
+            read their configuration when they are constructed, so this must be called
+            before they are created.
+    :param scenario: the scenario to run
+    :param source_file: video file replayed when the scenario's source is a file
+    """
+    _, video_config, _ = load_config()
+    width, height = RESOLUTIONS[scenario.resolution]
+
+    video_config[VideoCfg.WIDTH] = str(width)
+    video_config[VideoCfg.HEIGHT] = str(height)
+    video_config[VideoCfg.FPS] = str(scenario.fps)
+    video_config[VideoCfg.CODEC] = scenario.codec
+    video_config[VideoCfg.SOURCE] = scenario.source
+    video_config[VideoCfg.DEVICE] = scenario.source
+    if scenario.source == VideoSourceType.FILE:
+        video_config[VideoCfg.SOURCE_FILE] = source_file
+
+
+def run_scenario(scenario: Scenario,
+                 duration: float,
+                 work_dir: str,
+                 source_file: str | None = None,
+                 combine: bool = False
+                 ) -> dict:
+    """
+    :about: Record for duration seconds and measure the pipeline while it runs.
+    :param scenario: the scenario to run
+    :param duration: seconds to record
+    :param work_dir: directory for the intermediate files
+    :param source_file: video file replayed when the scenario's source is a file
+    :param combine: TRUE to also time :py:func:`combine_video_and_audio(...)<pyvr.combine_video_and_audio>`
+    :returns: a dictionary of measurements.
+    """
+    apply_scenario(scenario, source_file)
+    _, _, preview_config = load_config()
+    preview_size = (int(preview_config[PreviewCfg.WIDTH]), int(preview_config[PreviewCfg.HEIGHT]))
+    interval = float(preview_config[PreviewCfg.INTERVAL])
+
+    name = scenario_name(scenario)
+    video_file = os.path.join(work_dir, f"{name}.mp4")
+    audio_file = os.path.join(work_dir, f"{name}.wav")
+    log.info(f"Benchmark {name} for {duration} seconds.")
+    print(f"Running {name} ...")
+
+    write_ms: [float] = []
+    latency_ms: [float] = []
+    resize_ms: [float] = []
+    peak_rss: float = current_rss_mb()
+
+    cpu_start = os.times()
+    wall_start = time.monotonic()
+
+    with VideoCard() as vc:
+        vr = VideoRecorder(video_file, vc)
+        record_frame = vr.process_single_frame
+
+        def timed_process_single_frame():
+            # TIME EACH WRITE.  THE RECORDER COUNTS THE FRAMES IT COULD NOT KEEP UP WITH ITSELF.
+            began = time.perf_counter()
+            record_frame()
+            write_ms.append((time.perf_counter() - began) * 1000)
+            if vr.frame_is_new:
+                latency_ms.append((vc.clock.now() - vr.frame_timestamp) * 1000)
+
+        vr.process_single_frame = timed_process_single_frame
+
+        with vr:
+            with AudioInput() as ai:
+                with AudioRecorder(ai, filename=audio_file) as ar:
+                    with PreviewStage(vc, preview_size, interval) as preview:
+                        stop_at = time.monotonic() + duration
+                        while time.monotonic() < stop_at and preview.wait():
+                            # DO THE SAME WORK AS THE PREVIEW WINDOW (WITHOUT DISPLAYING IT).
+                            began = time.perf_counter()
+                            if preview.new_frame() is not None:
+                                resize_ms.append((time.perf_counter() - began) * 1000)
+
+                            peak_rss = max(peak_rss, current_rss_mb())
+
+                    ar.processing = vr.processing = vc.viewing = False
+
+    wall = time.monotonic() - wall_start
+    cpu_end = os.times()
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+
+    write_p99 = percentile(write_ms, 99)
+    results = {
+        "frames": vr.frame_count,
+        "achieved_fps": round(vr.frame_count / duration, 2),
+        "latency_p50_ms": round(percentile(latency_ms, 50), 3),
+        "latency_p99_ms": round(percentile(latency_ms, 99), 3),
+        "write_p50_ms": round(percentile(write_ms, 50), 3),
+        "write_p99_ms": round(write_p99, 3),
+        "sustainable_fps": round(1000 / write_p99, 1) if write_p99 > 0 else None,
+        "dropped_frames": vr.subscription.dropped + vr.subscription.duplicated,
+        "overload_frames": sum(vr.overloads.get(kind, 0) for kind in OVERLOAD_KINDS),
+        "spare_buffers": vc.ring.spares_allocated,
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "rss_mb": round(peak_rss, 1),
+        "resize_p50_ms": round(percentile(resize_ms, 50), 3),
+        "resize_p99_ms": round(percentile(resize_ms, 99), 3),
+        "jitter_p99_ms": vr.scheduler.stats()["jitter_p99_ms"],
+        "late_ticks": vr.scheduler.stats()["late_ticks"],
+    }
+
+    if combine:
+        from . import combine_video_and_audio
+
+        began = time.monotonic()
+        combine_video_and_audio(video_file, audio_file, os.path.join(work_dir, f"{name}.mkv"))
+        results["combine_secs_per_min"] = round((time.monotonic() - began) * 60 / duration, 2)
+
+    log.info(f"Benchmark {name}: {results}")
+    return results
+
+
+def measure_import(runs: int = 3) -> dict:
+    """
+    :about: Time import pyvr in a fresh interpreter.  The fastest of several runs is kept
+            so that a busy disk cache does not cause a false failure.
+    :param runs: number of interpreters started
+    :returns: the import time and the deferred modules that were loaded anyway.
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_dir, os.environ.get("PYTHONPATH")])))
+
+    samples: [float] = []
+    loaded: [str] = []
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True, check=True)
+        measured = json.loads(probe.stdout.splitlines()[-1])
+        samples.append(measured["secs"])
+        loaded = measured["loaded"]
+
+    results = {"import_secs": round(min(samples), 3), "deferred_modules_loaded": loaded}
+    log.info(f"Benchmark import: {results}")
+    return results
+
+
+def run_benchmarks(scenarios: [Scenario],
+                   duration: float,
+                   source_file: str | None = None,
+                   combine: bool = False,
+                   label: str = ""
+                   ) -> dict:
+    """
+    :about: Run each scenario in turn.
+    :param scenarios: the scenarios to run
+    :param duration: seconds to record each scenario
+    :param source_file: video file replayed by scenarios whose source is a file
+    :param combine: TRUE to also time the final encode
+    :param label: free form text stored with the results (a version number for example)
+    :returns: the results of every scenario along with a description of the machine.
+    """
+    work_dir = tempfile.mkdtemp(prefix="pyvr-bench-")
+    try:
+        ini_file = os.path.join(work_dir, "bench.ini")
+        with open(ini_file, "w") as f:
+            f.write(BENCH_INI)
+        load_config(ini_file)
+
+        results = {"import": measure_import()}
+        results.update({scenario_name(s): run_scenario(s, duration, work_dir, source_file, combine) for s in scenarios})
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "label": label,
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "duration": duration,
+        "scenarios": results,
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> [str]:
+    """
+    :about: Compare results to a baseline.  Only scenarios and metrics present in both
+            are compared.
+    :param results: results from :py:func:`run_benchmarks`
+    :param baseline: results from an earlier run
+    :param tolerance: fraction a metric may get worse before it is a regression (0.2 = 20%)
+    :returns: a description of each regression found.
+    """
+    regressions = []
+    for name, measured in results["scenarios"].items():
+        expected = baseline.get("scenarios", {}).get(name)
+        if expected is None:
+            log.info(f"Scenario {name} is not in the baseline.")
+            continue
+
+        for metric, (larger_is_worse, slack) in REGRESSION_CHECKS.items():
+            if measured.get(metric) is None or expected.get(metric) is None:
+                continue
+
+            now, then = measured[metric], expected[metric]
+            if larger_is_worse:
+                worse = now > then * (1 + tolerance) + slack
+            else:
+                worse = now < then * (1 - tolerance) - slack
+
+            if worse:
+                regressions.append(f"{name}: {metric} was {then}, now {now}")
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    :about: Command line entry point (python -m pyvr.bench --help)
+    :returns: the exit code.  1 if a regression was found or import pyvr was too slow.
+    """
+    parser = cl.OptionParser(usage="python -m pyvr.bench [options]")
+    parser.add_option("-r", "--resolutions", default="720p,1080p,4k",
+                      help="comma separated resolutions (720p, 1080p, 4k)")
+    parser.add_option("-c", "--codecs", default="mp4v", help="comma separated fourcc codecs")
+    parser.add_option("-f", "--fps", default="30,60", help="comma separated frames per second")
+    parser.add_option("-s", "--source", default=VideoSourceType.SYNTHETIC.value,
+                      help="video source (synthetic or file)")
+    parser.add_option("--source-file", dest="source_file", help="video file replayed when --source=file")
+    parser.add_option("-d", "--duration", type="float", default=10.0, help="seconds to record each scenario")
+    parser.add_option("--combine", action="store_true", default=False, help="also time the final encode")
+    parser.add_option("-l", "--label", default="", help="text (a version number) stored with the results")
+    parser.add_option("-o", "--output", help="write the results (JSON) to this file")
+    parser.add_option("-b", "--baseline", help="compare the results to this file (JSON)")
+    parser.add_option("--import-budget", dest="import_budget", type="float", default=IMPORT_BUDGET_SECS,
+                      help=f"seconds import pyvr may take (default {IMPORT_BUDGET_SECS})")
+    parser.add_option("-t", "--tolerance", type="float", default=0.2,
+                      help="fraction a metric may get worse before failing (default 0.2)")
+    opts, _ = parser.parse_args(argv)
+
+    source = VideoSourceType(opts.source.lower()).value
+    if source == VideoSourceType.DEVICE:
+        parser.error("benchmarks run against synthetic or file sources")
+    if source == VideoSourceType.FILE and opts.source_file is None:
+        parser.error("--source-file is required when --source=file")
+    for resolution in opts.resolutions.split(","):
+        if resolution.lower() not in RESOLUTIONS:
+            parser.error(f"unknown resolution {resolution}")
+
+    scenarios = [Scenario(resolution.lower(), codec, int(fps), source)
+                 for resolution in opts.resolutions.split(",")
+                 for codec in opts.codecs.split(",")
+                 for fps in opts.fps.split(",")]
+
+    results = run_benchmarks(scenarios, opts.duration, opts.source_file, opts.combine, opts.label)
+
+    print(json.dumps(results["scenarios"], indent=4))
+    if opts.output is not None:
+        with open(opts.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    exit_code = 0
+    measured_import = results["scenarios"]["import"]
+    if measured_import["import_secs"] > opts.import_budget:
+        print(f"SLOW IMPORT  import pyvr took {measured_import['import_secs']} secs (budget {opts.import_budget})")
+        exit_code = 1
+    for module in measured_import["deferred_modules_loaded"]:
+        print(f"SLOW IMPORT  import pyvr loaded {module}")
+        exit_code = 1
+
+    if opts.baseline is not None:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(results, baseline, opts.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION  {regression}")
+        if len(regressions) > 0:
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    log.basicConfig(filename="pyvr-bench.log",
+                    filemode="w",
+                    format="%(asctime)s %(filename)15.15s %(funcName)15.15s %(levelname)5.5s %(lineno)4.4s %(message)s",
+                    datefmt="%Y%m%d %H%M%S",
+                    level=log.INFO
+                    )
+    sys.exit(main())
@@ -4,9 +4,11 @@ Read pyvr.ini and set up the configuration for the pyvr package.
 import configparser as cp
 import enum
 import logging as log
+import re
 import sys
 
-_AUDIO_CFG = _VIDEO_CFG = _PREVIEW_CFG = None
+_AUDIO_CFG = _VIDEO_CFG = _PREVIEW_CFG = _ENCODE_CFG = _TELEMETRY_CFG = None
+_ENCODE_PROFILES = None
 
 
 def ensure_exists(_: str) -> None:
@@ -17,6 +19,15 @@ def ensure_exists(_: str) -> None:
     pass
 
 
+def normalize_flag(section: dict, key: str) -> None:
+    """
+    Turn a yes/no style setting into a value that can be tested with bool().
+    Values starting with n (no) or f (false) become empty strings.
+    """
+    if section[key].lower().startswith("n") or section[key].lower().startswith("f"):
+        section[key] = ""
+
+
 class AudioCfg(str, enum.Enum):
     """
     Enumeration of the audio parameters that can be set via the .ini file
@@ -29,6 +40,13 @@ class AudioCfg(str, enum.Enum):
     CHANNEL_COUNT = "AudioChannelCount"
     SYNC_PLAYER = "SyncPlayer"
     PRE_START_DELAY = "PreStartDelay"
+    QUEUE_SECS = "QueueSecs"
+    PERIOD_SIZE = "PeriodSize"
+    SIGNAL = "Signal"
+    TONE_HZ = "ToneHz"
+    REAL_TIME = "RealTime"
+    SHARED_NAME = "SharedName"
+    PRE_ROLL_SECS = "PreRollSecs"
 
 
 class VideoCfg(str, enum.Enum):
@@ -42,6 +60,39 @@ class VideoCfg(str, enum.Enum):
     HEIGHT = "Height"
     WIDTH = "Width"
     PRE_START_DELAY = "PreStartDelay"
+    FRAME_BUFFER_COUNT = "FrameBufferCount"
+    SOURCE = "Source"
+    SOURCE_FILE = "SourceFile"
+    REAL_TIME = "RealTime"
+    SHARED_NAME = "SharedName"
+    PRE_ROLL_SECS = "PreRollSecs"
+    PRE_ROLL_DIR = "PreRollDir"
+    OVERLOAD_POLICY = "OverloadPolicy"
+    OVERLOAD_FRAMES = "OverloadFrames"
+    DEGRADE_STEP = "DegradeStep"
+    WRITER_QUEUE_FRAMES = "WriterQueueFrames"
+    WRITER_BATCH_FRAMES = "WriterBatchFrames"
+    MJPEG_PASSTHROUGH = "MjpegPassthrough"
+
+
+class VideoSourceType(str, enum.Enum):
+    """
+    Valid values for the *Source* setting in the [VIDEO] section.
+    """
+    DEVICE = "device"  # a linux video device (ie: /dev/video0)
+    SYNTHETIC = "synthetic"  # generated test pattern
+    FILE = "file"  # frames replayed from a video file
+    SHARED = "shared"  # frames published by the capture daemon
+
+
+class OverloadPolicy(str, enum.Enum):
+    """
+    Valid values for the *OverloadPolicy* setting in the [VIDEO] section.  What a recorder
+    does when a frame is due and it does not have one.
+    """
+    DUPLICATE = "duplicate"  # write the last frame again to keep a constant frame rate.
+    DROP = "drop"  # write nothing.  Missed ticks are skipped instead of caught up.
+    DEGRADE = "degrade"  # duplicate, and take fewer new frames while far behind.
 
 
 class PreviewCfg(str, enum.Enum):
@@ -53,49 +104,203 @@ class PreviewCfg(str, enum.Enum):
     HEIGHT = "Height"
     WIDTH = "Width"
     PLAYER_SCALE = "PreRecordScaling"
+    DELAY_SCALED = "DelayScaledFrames"
+    HEADLESS = "Headless"
+
+
+class EncodeCfg(str, enum.Enum):
+    """
+    Enumeration of the encoding parameters that can be set via the .ini file
+    and their corresponding name in the ini file.  The whole [ENCODE] section
+    is optional.
+    """
+    MODE = "Mode"
+    STREAM_PRESET = "StreamPreset"
+    WORKERS = "Workers"
+    SEGMENT_MINS = "SegmentMins"
+    QUEUE = "Queue"
+    QUEUE_FILE = "QueueFile"
+    QUEUE_WORKERS = "QueueWorkers"
+    QUEUE_NICE = "QueueNice"
+    QUEUE_RETRIES = "QueueRetries"
+    PROFILE = "Profile"
+
+
+class TelemetryCfg(str, enum.Enum):
+    """
+    Enumeration of the telemetry parameters that can be set via the .ini file
+    and their corresponding name in the ini file.  The whole [TELEMETRY] section
+    is optional.
+    """
+    PORT = "Port"
+    ADDRESS = "Address"
+    DUMP_FILE = "DumpFile"
+    DUMP_SECS = "DumpSecs"
+
+
+class EncodeMode(str, enum.Enum):
+    """
+    Valid values for the *Mode* setting in the [ENCODE] section.
+    """
+    TRANSCODE = "transcode"  # record .mp4/.wav files and combine them when recording stops.
+    STREAM = "stream"  # encode and mux into the final .mkv while recording.
+
+
+class EncodeProfileCfg(str, enum.Enum):
+    """
+    Enumeration of the settings of an encoding profile.  Profiles are defined in
+    [ENCODE.<name>] sections of the .ini file.  An empty value leaves the choice to
+    ffmpeg.
+    """
+    VIDEO_CODEC = "VideoCodec"
+    PRESET = "Preset"
+    CRF = "CRF"
+    THREADS = "Threads"
+    AUDIO_CODEC = "AudioCodec"
+    AUDIO_BITRATE = "AudioBitrate"
+    REMUX = "Remux"
+
+
+# SECTIONS NAMED [ENCODE.<name>] DEFINE (OR CHANGE) AN ENCODING PROFILE
+PROFILE_SECTION_PREFIX = "ENCODE."
+
+# PROFILES AVAILABLE WITHOUT ANY SETUP.  default MATCHES THE ORIGINAL HARD CODED ENCODE.
+BUILTIN_PROFILES = {
+    "default": {"VideoCodec": "libx265", "Preset": "", "CRF": "", "Threads": "1",
+                "AudioCodec": "ac3", "AudioBitrate": "", "Remux": ""},
+    "fast": {"VideoCodec": "libx264", "Preset": "veryfast", "CRF": "23", "Threads": "0",
+             "AudioCodec": "ac3", "AudioBitrate": "", "Remux": ""},
+    "sports": {"VideoCodec": "libx265", "Preset": "ultrafast", "CRF": "26", "Threads": "0",
+               "AudioCodec": "ac3", "AudioBitrate": "", "Remux": ""},
+    "film": {"VideoCodec": "libx265", "Preset": "slow", "CRF": "20", "Threads": "0",
+             "AudioCodec": "ac3", "AudioBitrate": "640k", "Remux": ""},
+    "remux": {"VideoCodec": "copy", "Preset": "", "CRF": "", "Threads": "0",
+              "AudioCodec": "flac", "AudioBitrate": "", "Remux": "yes"},
+}
+
+
+def load_profiles(config: cp.ConfigParser) -> dict:
+    """
+    Combine the built-in encoding profiles with the [ENCODE.<name>] sections of the .ini
+    file and check their values.  A section only needs the settings it changes.  New
+    profiles start from the default profile.
+    :returns: dictionary of profiles (by lower case name).
+    """
+    profiles = {name: dict(profile) for name, profile in BUILTIN_PROFILES.items()}
+    for section in config.sections():
+        if section.upper().startswith(PROFILE_SECTION_PREFIX):
+            name = section[len(PROFILE_SECTION_PREFIX):].lower()
+            log.debug(f"Load [{section}] section from pyvr.ini")
+            profile = profiles.setdefault(name, dict(BUILTIN_PROFILES["default"]))
+            for key in EncodeProfileCfg:
+                profile[key.value] = config[section].get(key.value, profile[key.value]).strip()
+
+    for name, profile in profiles.items():
+        normalize_flag(profile, EncodeProfileCfg.REMUX.value)
+        if profile[EncodeProfileCfg.CRF.value] and not 0 <= int(profile[EncodeProfileCfg.CRF.value]) <= 51:
+            raise ValueError(f"CRF of encode profile {name} must be 0 to 51")
+        if int(profile[EncodeProfileCfg.THREADS.value]) < 0:
+            raise ValueError(f"Threads of encode profile {name} must be 0 (automatic) or more")
+        if profile[EncodeProfileCfg.AUDIO_BITRATE.value] and not re.fullmatch(r"\d+[kKM]?", profile[EncodeProfileCfg.AUDIO_BITRATE.value]):
+            raise ValueError(f"AudioBitrate of encode profile {name} must be a number like 192k")
+        if not profile[EncodeProfileCfg.VIDEO_CODEC.value] or not profile[EncodeProfileCfg.AUDIO_CODEC.value]:
+            raise ValueError(f"encode profile {name} needs a VideoCodec and an AudioCodec")
+
+    return profiles
 
 
 # LOAD CONFIGURATION
-def load_config() -> (dict, dict):
+def load_config(filename: str = "pyvr.ini") -> (dict, dict):
     """
     Load pyvr.ini from the local directory and massage data to be used by the recorder.
+    :param filename: the configuration file to load.  Only the first call reads it.
     :returns: 2 dictionaries of configuration data.  The first is for the audio
                 configurations and the second is for the video config.
     """
-    global _AUDIO_CFG, _VIDEO_CFG, _PREVIEW_CFG
+    global _AUDIO_CFG, _VIDEO_CFG, _PREVIEW_CFG, _ENCODE_CFG, _ENCODE_PROFILES, _TELEMETRY_CFG
     if _AUDIO_CFG is not None or _VIDEO_CFG is not None:
         return _AUDIO_CFG, _VIDEO_CFG, _PREVIEW_CFG
 
-    log.debug("Loading config (pyvr.ini) file.")
+    log.debug(f"Loading config ({filename}) file.")
     config = cp.ConfigParser()
-    config.read("pyvr.ini")
+    config.read(filename)
 
     try:
         log.debug("Load [AUDIO] section from pyvr.ini")
         # LOAD EACH SECTION AND ENSURE REQUIRED VALUES WERE PROVIDED
         audio_config = config["AUDIO"]
-        ensure_exists(audio_config[AudioCfg.DEVICE_NAME])
         audio_config.setdefault(AudioCfg.SECS_OF_BUFFER, "1")
         audio_config.setdefault(AudioCfg.AUDIO_LIBRARY, "PyAudio")
+        audio_config.setdefault(AudioCfg.SHARED_NAME, "pyvr-audio")
+        if audio_config[AudioCfg.AUDIO_LIBRARY].lower() == "shared":
+            audio_config.setdefault(AudioCfg.DEVICE_NAME, audio_config[AudioCfg.SHARED_NAME])
+        if audio_config[AudioCfg.AUDIO_LIBRARY].lower() != "synthetic":
+            ensure_exists(audio_config[AudioCfg.DEVICE_NAME])
         audio_config.setdefault(AudioCfg.SYNC_PLAYER, "")
         audio_config.setdefault(AudioCfg.SAMPLE_RATE, "0")
         audio_config.setdefault(AudioCfg.PRE_START_DELAY, "0")
+        audio_config.setdefault(AudioCfg.QUEUE_SECS, "10")
+        audio_config.setdefault(AudioCfg.PERIOD_SIZE, "256")
+        audio_config.setdefault(AudioCfg.PRE_ROLL_SECS, "0")
+        float(audio_config[AudioCfg.PRE_ROLL_SECS])
 
-        if audio_config[AudioCfg.SYNC_PLAYER].lower().startswith("n") \
-                or audio_config[AudioCfg.SYNC_PLAYER].lower().startswith("f"):
-            audio_config[AudioCfg.SYNC_PLAYER] = ""
+        normalize_flag(audio_config, AudioCfg.SYNC_PLAYER)
 
         if audio_config[AudioCfg.AUDIO_LIBRARY].lower() == "alsaaudio":
             ensure_exists(audio_config[AudioCfg.CHANNEL_COUNT])
 
+        if audio_config[AudioCfg.AUDIO_LIBRARY].lower() == "synthetic":
+            audio_config.setdefault(AudioCfg.DEVICE_NAME, "synthetic")
+            audio_config.setdefault(AudioCfg.CHANNEL_COUNT, "2")
+            audio_config.setdefault(AudioCfg.SIGNAL, "tone")
+            audio_config.setdefault(AudioCfg.TONE_HZ, "440")
+            audio_config.setdefault(AudioCfg.REAL_TIME, "yes")
+            normalize_flag(audio_config, AudioCfg.REAL_TIME)
+            if int(audio_config[AudioCfg.SAMPLE_RATE]) == 0:
+                audio_config[AudioCfg.SAMPLE_RATE] = "48000"
+
         log.debug("Load [VIDEO] section from pyvr.ini")
         video_config = config["VIDEO"]
-        ensure_exists(video_config[VideoCfg.DEVICE])
+        video_config.setdefault(VideoCfg.SOURCE, VideoSourceType.DEVICE.value)
+        video_config[VideoCfg.SOURCE] = VideoSourceType(video_config[VideoCfg.SOURCE].lower()).value
+        video_config.setdefault(VideoCfg.REAL_TIME, "yes")
+        normalize_flag(video_config, VideoCfg.REAL_TIME)
+        if video_config[VideoCfg.SOURCE] == VideoSourceType.DEVICE:
+            ensure_exists(video_config[VideoCfg.DEVICE])
+        else:
+            video_config.setdefault(VideoCfg.DEVICE, video_config[VideoCfg.SOURCE])
+        if video_config[VideoCfg.SOURCE] == VideoSourceType.FILE:
+            ensure_exists(video_config[VideoCfg.SOURCE_FILE])
+        video_config.setdefault(VideoCfg.SHARED_NAME, "pyvr-video")
+        if video_config[VideoCfg.SOURCE] == VideoSourceType.SHARED:
+            # THE SIZE AND RATE ARE WHATEVER THE CAPTURE DAEMON PUBLISHES.
+            video_config.setdefault(VideoCfg.WIDTH, "0")
+            video_config.setdefault(VideoCfg.HEIGHT, "0")
+            video_config.setdefault(VideoCfg.FPS, "0")
         ensure_exists(video_config[VideoCfg.WIDTH])
         ensure_exists(video_config[VideoCfg.HEIGHT])
         ensure_exists(video_config[VideoCfg.FPS])
         ensure_exists(video_config[VideoCfg.CODEC])
         video_config.setdefault(VideoCfg.PRE_START_DELAY, "0.0")
+        video_config.setdefault(VideoCfg.FRAME_BUFFER_COUNT, "8")
+        video_config.setdefault(VideoCfg.PRE_ROLL_SECS, "0")
+        float(video_config[VideoCfg.PRE_ROLL_SECS])
+        video_config.setdefault(VideoCfg.PRE_ROLL_DIR, "")
+        video_config.setdefault(VideoCfg.OVERLOAD_POLICY, OverloadPolicy.DUPLICATE.value)
+        video_config[VideoCfg.OVERLOAD_POLICY] = OverloadPolicy(video_config[VideoCfg.OVERLOAD_POLICY].lower()).value
+        video_config.setdefault(VideoCfg.OVERLOAD_FRAMES, "5")
+        video_config.setdefault(VideoCfg.DEGRADE_STEP, "2")
+        int(video_config[VideoCfg.OVERLOAD_FRAMES])
+        int(video_config[VideoCfg.DEGRADE_STEP])
+        video_config.setdefault(VideoCfg.WRITER_QUEUE_FRAMES, "30")
+        video_config.setdefault(VideoCfg.WRITER_BATCH_FRAMES, "4")
+        int(video_config[VideoCfg.WRITER_QUEUE_FRAMES])
+        int(video_config[VideoCfg.WRITER_BATCH_FRAMES])
+        video_config.setdefault(VideoCfg.MJPEG_PASSTHROUGH, "no")
+        normalize_flag(video_config, VideoCfg.MJPEG_PASSTHROUGH)
+        if video_config[VideoCfg.MJPEG_PASSTHROUGH] \
+                and video_config[VideoCfg.SOURCE] not in (VideoSourceType.DEVICE, VideoSourceType.FILE):
+            raise ValueError(f"{VideoCfg.MJPEG_PASSTHROUGH.value} needs Source=Device or Source=File")
 
         log.debug("Load [PREVIEW] section from pyvr.ini")
         preview_config = config["PREVIEW"]
@@ -103,6 +308,57 @@ def load_config() -> (dict, dict):
         ensure_exists(preview_config[PreviewCfg.WIDTH])
         ensure_exists(preview_config[PreviewCfg.HEIGHT])
         preview_config.setdefault(PreviewCfg.PLAYER_SCALE, "100")
+        preview_config.setdefault(PreviewCfg.DELAY_SCALED, "yes")
+        normalize_flag(preview_config, PreviewCfg.DELAY_SCALED)
+        preview_config.setdefault(PreviewCfg.HEADLESS, "no")
+        normalize_flag(preview_config, PreviewCfg.HEADLESS)
+
+        log.debug("Load [ENCODE] section from pyvr.ini")
+        if not config.has_section("ENCODE"):
+            config.add_section("ENCODE")
+        encode_config = config["ENCODE"]
+        encode_config.setdefault(EncodeCfg.MODE, EncodeMode.TRANSCODE.value)
+        encode_config.setdefault(EncodeCfg.STREAM_PRESET, "veryfast")
+        encode_config.setdefault(EncodeCfg.WORKERS, "1")
+        encode_config.setdefault(EncodeCfg.SEGMENT_MINS, "0")
+        encode_config.setdefault(EncodeCfg.QUEUE, "no")
+        normalize_flag(encode_config, EncodeCfg.QUEUE)
+        encode_config.setdefault(EncodeCfg.QUEUE_FILE, "pyvr-encode.db")
+        encode_config.setdefault(EncodeCfg.QUEUE_WORKERS, "1")
+        encode_config.setdefault(EncodeCfg.QUEUE_NICE, "10")
+        encode_config.setdefault(EncodeCfg.QUEUE_RETRIES, "3")
+        encode_config.setdefault(EncodeCfg.PROFILE, "default")
+        encode_config[EncodeCfg.PROFILE] = encode_config[EncodeCfg.PROFILE].lower()
+        int(encode_config[EncodeCfg.WORKERS])
+        float(encode_config[EncodeCfg.SEGMENT_MINS])
+        int(encode_config[EncodeCfg.QUEUE_WORKERS])
+        int(encode_config[EncodeCfg.QUEUE_NICE])
+        int(encode_config[EncodeCfg.QUEUE_RETRIES])
+        encode_config[EncodeCfg.MODE] = EncodeMode(encode_config[EncodeCfg.MODE].lower()).value
+
+        encode_profiles = load_profiles(config)
+        if encode_config[EncodeCfg.PROFILE] not in encode_profiles:
+            raise ValueError(f"unknown encode profile {encode_config[EncodeCfg.PROFILE]}")
+
+        log.debug("Load [TELEMETRY] section from pyvr.ini")
+        if not config.has_section("TELEMETRY"):
+            config.add_section("TELEMETRY")
+        telemetry_config = config["TELEMETRY"]
+        telemetry_config.setdefault(TelemetryCfg.PORT, "0")
+        telemetry_config.setdefault(TelemetryCfg.ADDRESS, "127.0.0.1")
+        telemetry_config.setdefault(TelemetryCfg.DUMP_FILE, "")
+        telemetry_config.setdefault(TelemetryCfg.DUMP_SECS, "10")
+        int(telemetry_config[TelemetryCfg.PORT])
+        float(telemetry_config[TelemetryCfg.DUMP_SECS])
+
+    except ValueError as ve:
+        print()
+        print("*** pyvr.ini contains an invalid value.  Unable to continue. ***")
+        print(f"    {str(ve)}")
+        print()
+        log.critical("pyvr.ini contains an invalid value.  Unable to continue.")
+        log.exception(ve)
+        sys.exit(1)
 
     except KeyError as ke:
         print()
@@ -118,4 +374,38 @@ def load_config() -> (dict, dict):
     _AUDIO_CFG = audio_config
     _VIDEO_CFG = video_config
     _PREVIEW_CFG = preview_config
+    _ENCODE_CFG = encode_config
+    _ENCODE_PROFILES = encode_profiles
+    _TELEMETRY_CFG = telemetry_config
     return _AUDIO_CFG, _VIDEO_CFG, _PREVIEW_CFG
+
+
+def load_encode_config() -> dict:
+    """
+    Load pyvr.ini (if it has not been loaded already) and return the optional [ENCODE] section.
+    :returns: dictionary of encoding configuration data.
+    """
+    load_config()
+    return _ENCODE_CFG
+
+
+def load_encode_profile(name: str | None = None) -> dict:
+    """
+    Load pyvr.ini (if it has not been loaded already) and return an encoding profile.
+    :param name: the profile wanted.  None for the *Profile* set in the [ENCODE] section.
+    :returns: dictionary of the profile's settings (see EncodeProfileCfg).
+    """
+    load_config()
+    name = (name or _ENCODE_CFG[EncodeCfg.PROFILE]).lower()
+    if name not in _ENCODE_PROFILES:
+        raise ValueError(f"unknown encode profile {name}.  Choose from {', '.join(sorted(_ENCODE_PROFILES))}")
+    return _ENCODE_PROFILES[name]
+
+
+def load_telemetry_config() -> dict:
+    """
+    Load pyvr.ini (if it has not been loaded already) and return the optional [TELEMETRY] section.
+    :returns: dictionary of telemetry configuration data.
+    """
+    load_config()
+    return _TELEMETRY_CFG
@@ -0,0 +1,311 @@
+"""
+Routines used by the final encode of a recording.  They measure and correct audio/video
+drift and can split the encode into segments that are encoded in parallel and then
+losslessly joined back together.
+"""
+import concurrent.futures as cf
+import json
+import logging as log
+import os
+import shutil
+import subprocess as proc
+import tempfile
+
+from .configuration import EncodeProfileCfg
+from .TimingLog import fit_timeline, read_timing, timing_filename
+
+FFMPEG_PROC_NAME = "ffmpeg"
+FFPROBE_PROC_NAME = "ffprobe"
+
+# DO NOT BOTHER SPLITTING VIDEO INTO SEGMENTS SHORTER THAN THIS.
+MIN_SEGMENT_SECS = 10
+
+# IGNORE DRIFT AND OFFSETS SMALLER THAN THESE.
+MIN_DRIFT_RATIO = 1e-6
+MIN_OFFSET_SECS = 0.001
+
+
+def worker_count(configured: int) -> int:
+    """
+    :about: Determine how many encodes to run at the same time.
+    :param configured: the *Workers* value from pyvr.ini.  0 means one per cpu core.
+    :returns: the number of workers to use (at least 1).
+    """
+    if configured <= 0:
+        return os.cpu_count() or 1
+    return configured
+
+
+def run_ffmpeg(ffmpeg_args: [str]) -> None:
+    """
+    :about: Run ffmpeg and wait for it to finish.  What ffmpeg reports on stderr is written
+            to the log, so a failed encode can be diagnosed from pyvr.log.
+    :param ffmpeg_args: the command line (starting with the program to run)
+    :raises CalledProcessError: if ffmpeg fails.  Its stderr is included.
+    """
+    log.debug(f"Run: {' '.join(ffmpeg_args)}")
+    result = proc.run(ffmpeg_args, stderr=proc.PIPE, text=True)
+    if result.stderr:
+        log.log(log.ERROR if result.returncode != 0 else log.WARNING, f"ffmpeg: {result.stderr.strip()}")
+    if result.returncode != 0:
+        log.error(f"ffmpeg failed (exit code {result.returncode}): {' '.join(ffmpeg_args)}")
+        raise proc.CalledProcessError(result.returncode, ffmpeg_args, stderr=result.stderr)
+
+
+def drift_correction_filter(video_file: str, audio_file: str) -> str | None:
+    """
+    :about: Use the timing sidecars written while recording to build an ffmpeg audio filter
+            that lines the audio up with the video.  The audio is delayed or trimmed to
+            remove the offset between the tracks and its tempo is adjusted to remove any
+            difference between the rate of the audio device's clock and the video's.
+    :param video_file: filename of the intermediate video file
+    :param audio_file: filename of the intermediate audio file
+    :returns: the filter (for -af) or None if no correction is needed or possible.
+    """
+    video_timing = timing_filename(video_file)
+    audio_timing = timing_filename(audio_file)
+    if not os.path.isfile(video_timing) or not os.path.isfile(audio_timing):
+        return None
+
+    video_rate, video_points = read_timing(video_timing)
+    audio_rate, audio_points = read_timing(audio_timing)
+    if len(video_points) == 0 or len(audio_points) == 0:
+        return None
+
+    video_start, video_scale = fit_timeline(video_rate, video_points)
+    audio_start, audio_scale = fit_timeline(audio_rate, audio_points)
+
+    # POSITION OF THE AUDIO IN THE FINISHED FILE = offset + stretch * (POSITION IN THE .wav FILE)
+    offset = (audio_start - video_start) / video_scale
+    stretch = audio_scale / video_scale
+    log.info(f"Measured audio offset {round(offset * 1000, 1)} ms, drift {round((stretch - 1) * 1e6, 1)} ppm.")
+
+    filters = []
+    if abs(stretch - 1) > MIN_DRIFT_RATIO:
+        filters.append(f"atempo={1 / stretch:.9f}")
+    if offset > MIN_OFFSET_SECS:
+        filters.append(f"adelay={round(offset * 1000)}:all=1")
+    elif offset < -MIN_OFFSET_SECS:
+        filters.append(f"atrim=start={-offset:.6f}")
+        filters.append("asetpts=PTS-STARTPTS")
+
+    return ",".join(filters) if filters else None
+
+
+def video_codec_args(profile: dict) -> [str]:
+    """
+    :about: The ffmpeg output options that encode the video as an encoding profile asks.
+    :param profile: the profile (see :py:func:`load_encode_profile<pyvr.configuration.load_encode_profile>`)
+    :returns: the options (-c:v and friends).
+    """
+    if profile[EncodeProfileCfg.REMUX.value]:
+        return ["-c:v", "copy"]
+
+    args = ["-c:v", profile[EncodeProfileCfg.VIDEO_CODEC.value]]
+    if profile[EncodeProfileCfg.PRESET.value]:
+        args += ["-preset", profile[EncodeProfileCfg.PRESET.value]]
+    if profile[EncodeProfileCfg.CRF.value]:
+        args += ["-crf", profile[EncodeProfileCfg.CRF.value]]
+    return args + ["-threads", profile[EncodeProfileCfg.THREADS.value]]
+
+
+def audio_codec_args(profile: dict, audio_filter: str | None = None) -> [str]:
+    """
+    :about: The ffmpeg output options that encode the audio as an encoding profile asks.
+    :param profile: the profile (see :py:func:`load_encode_profile<pyvr.configuration.load_encode_profile>`)
+    :param audio_filter: optional ffmpeg audio filter (see :py:func:`drift_correction_filter`)
+    :returns: the options (-c:a and friends).
+    """
+    codec = profile[EncodeProfileCfg.AUDIO_CODEC.value]
+    if codec == "copy":
+        if audio_filter is not None:
+            log.warning("The audio is copied, so its drift is not corrected.  Use a lossless AudioCodec (flac).")
+        return ["-c:a", "copy"]
+
+    args = ["-c:a", codec]
+    if profile[EncodeProfileCfg.AUDIO_BITRATE.value]:
+        args += ["-b:a", profile[EncodeProfileCfg.AUDIO_BITRATE.value]]
+    if audio_filter is not None:
+        args += ["-af", audio_filter]
+    return args
+
+
+def probe_video(video_file: str) -> (int, float):
+    """
+    :about: Count the frames in the first video stream of a file and find its frame rate.
+    :param video_file: the file to examine
+    :returns: the number of frames and the frames per second.
+    """
+    ffprobe_args: [str] = \
+        [
+            FFPROBE_PROC_NAME,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-count_packets",
+            "-show_entries", "stream=nb_read_packets,r_frame_rate",
+            "-of", "json",
+            video_file
+        ]
+    result = proc.run(ffprobe_args, capture_output=True, text=True)
+    if result.returncode != 0:
+        log.error(f"ffprobe failed (exit code {result.returncode}) on {video_file}: {result.stderr.strip()}")
+        raise proc.CalledProcessError(result.returncode, ffprobe_args, result.stdout, result.stderr)
+    stream = json.loads(result.stdout)["streams"][0]
+
+    numerator, denominator = stream["r_frame_rate"].split("/")
+    return int(stream["nb_read_packets"]), int(numerator) / int(denominator)
+
+
+def plan_segments(frame_count: int, fps: float, workers: int) -> [(int, int)]:
+    """
+    :about: Split a video into (nearly) equal ranges of frames.  One range per worker
+            unless that would make the ranges shorter than MIN_SEGMENT_SECS.
+    :param frame_count: number of frames in the video
+    :param fps: frames per second of the video
+    :param workers: number of encodes that will run at the same time
+    :returns: a list of (first frame, number of frames) tuples.
+    """
+    min_frames = max(1, int(fps * MIN_SEGMENT_SECS))
+    segment_count = max(1, min(workers, frame_count // min_frames))
+
+    segments = []
+    first = 0
+    for idx in range(segment_count):
+        count = (frame_count - first) // (segment_count - idx)
+        segments.append((first, count))
+        first += count
+
+    return segments
+
+
+def encode_segment(video_file: str,
+                   first_frame: int,
+                   frame_count: int,
+                   segment_file: str,
+                   profile: dict
+                   ) -> str:
+    """
+    :about: Encode a range of frames from the video (no audio) into its own file.  The
+            frames are chosen by number (not by time) so the segments meet exactly, with no
+            frame lost or repeated, whatever the timestamps of the video.
+    :param video_file: the intermediate video file
+    :param first_frame: index of the first frame to encode
+    :param frame_count: number of frames to encode
+    :param segment_file: store the encoded frames in this file
+    :param profile: the encoding profile
+    :returns: the name of the segment file
+    """
+    ffmpeg_args: [str] = \
+        [
+            "nice",
+            FFMPEG_PROC_NAME,
+            "-y",
+            "-loglevel", "error",
+            "-threads", "1",
+            "-i", video_file,
+            "-map", "0:v:0",  # Use 1st video stream
+            "-vf", f"trim=start_frame={first_frame}:end_frame={first_frame + frame_count},setpts=PTS-STARTPTS",
+            "-an",
+        ]
+    ffmpeg_args += video_codec_args(profile)
+    ffmpeg_args.append(segment_file)
+    run_ffmpeg(ffmpeg_args)
+    return segment_file
+
+
+def join_segments(segment_files: [str],
+                  resulting_file: str,
+                  audio_file: str | None = None,
+                  video_file: str | None = None,
+                  audio_args: list[str] | None = None
+                  ) -> None:
+    """
+    :about: Join encoded files (one after another) into a single file without re-encoding
+            them.  Every stream of the files is kept, unless an audio file is given.  Then
+            only their video is used and it is joined with that audio (and the subtitles of
+            video_file) instead.
+    :param segment_files: the files to join, in order
+    :param resulting_file: store the joined files in this filename
+    :param audio_file: optional audio (all of its streams are kept)
+    :param video_file: optional original video (for subtitles).  Only used with audio_file.
+    :param audio_args: options that encode audio_file (see :py:func:`audio_codec_args`)
+    :Side Effect: Creation of resulting_file.
+    """
+    concat_list = f"{resulting_file}.segments.txt"
+    with open(concat_list, "w") as f:
+        for segment_file in segment_files:
+            f.write(f"file '{os.path.abspath(segment_file)}'\n")
+
+    ffmpeg_args: [str] = \
+        [
+            "nice",
+            FFMPEG_PROC_NAME,
+            "-y",
+            "-loglevel", "error",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", concat_list,  # encoded segments
+        ]
+    if audio_file is None:
+        ffmpeg_args += \
+            [
+                "-map", "0",  # keep every stream
+                "-c", "copy",  # already encoded
+            ]
+    else:
+        ffmpeg_args += \
+            [
+                "-i", audio_file,  # audio input
+                "-i", video_file or audio_file,  # original video (for subtitles)
+                "-map", "0:v:0",  # Use 1st video stream
+                "-map", "1:a",  # Keep all audio streams
+                "-map", "2:s?",  # Keep all subtitles
+                "-c:s", "mov_text",  # subtitle codec (matches original)
+                "-c:v", "copy",  # video is already encoded
+            ]
+        ffmpeg_args += audio_args or ["-c:a", "copy"]
+    ffmpeg_args.append(resulting_file)  # output file name
+    try:
+        run_ffmpeg(ffmpeg_args)
+    finally:
+        os.remove(concat_list)
+
+
+def combine_in_segments(video_file: str,
+                        audio_file: str,
+                        resulting_file: str,
+                        workers: int,
+                        audio_filter: str | None,
+                        profile: dict
+                        ) -> None:
+    """
+    :about: Encode the video in segments using several ffmpeg processes at once.  Then join
+            the segments (without re-encoding them) with the audio and any subtitles.  The
+            resulting file has the same layout as a single-process encode.
+    :param video_file: filename of the intermediate video file
+    :param audio_file: filename of the intermediate audio file
+    :param resulting_file: store the resulting combined file in this filename
+    :param workers: number of encodes to run at the same time
+    :param audio_filter: optional ffmpeg audio filter (see :py:func:`drift_correction_filter`)
+    :param profile: the encoding profile (see :py:func:`load_encode_profile<pyvr.configuration.load_encode_profile>`)
+    :Side Effect: Creation of resulting_file.
+    """
+    frame_count, fps = probe_video(video_file)
+    segments = plan_segments(frame_count, fps, workers)
+    log.info(f"Encode {frame_count} frames in {len(segments)} segments using {workers} workers.")
+
+    work_dir = tempfile.mkdtemp(prefix=".pyvr-segments-", dir=os.path.dirname(resulting_file) or ".")
+    try:
+        segment_files = [os.path.join(work_dir, f"segment{idx:04}.mkv") for idx in range(len(segments))]
+        with cf.ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = [pool.submit(encode_segment, video_file, first, count, segment_file, profile)
+                       for (first, count), segment_file in zip(segments, segment_files)]
+
+            for done, future in enumerate(cf.as_completed(pending), start=1):
+                log.info(f"Encoded {os.path.basename(future.result())} ({done} of {len(segments)})")
+                print(f"    encoded segment {done} of {len(segments)}")
+
+        join_segments(segment_files, resulting_file, audio_file, video_file, audio_codec_args(profile, audio_filter))
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
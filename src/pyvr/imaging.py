@@ -0,0 +1,46 @@
+"""
+Routines that scale video frames for display.  A frame that is already the size wanted is
+returned untouched.  Large reductions halve the frame (averaging each 2x2 block) until it
+is less than twice the size wanted, which costs far less than one INTER_AREA resize to an
+odd size and does not alias the way a single INTER_LINEAR resize does.
+"""
+import numpy as np
+
+from .LazyModule import LazyModule
+
+# OPENCV IS LOADED THE FIRST TIME IT IS USED.
+cv2 = LazyModule("cv2")
+
+
+def halve_image(image: np.ndarray) -> np.ndarray:
+    """
+    :about: One level of a box filter pyramid.  Each 2x2 block of pixels becomes one pixel
+            (an odd row or column at the edge is dropped).
+    :param image: the image to reduce
+    :returns: an image half as wide and half as high.
+    """
+    height, width = image.shape[:2]
+    return cv2.resize(image, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+
+
+def resize_image(image: np.ndarray, size: (int, int)) -> np.ndarray:
+    """
+    :about: Scale an image to a new size as cheaply as its quality allows.
+
+            - the same size: the image itself is returned (nothing is copied).
+            - half the size or less: halve it (see :py:func:`halve_image`) until the rest
+              of the reduction is less than 2x, then finish with INTER_LINEAR.
+            - a smaller reduction or an enlargement: INTER_LINEAR.
+    :param image: the image to scale
+    :param size: (width, height) wanted
+    :returns: the scaled image.
+    """
+    width, height = size
+    if image.shape[1] == width and image.shape[0] == height:
+        return image
+
+    while image.shape[1] >= 2 * width and image.shape[0] >= 2 * height:
+        image = halve_image(image)
+    if image.shape[1] == width and image.shape[0] == height:
+        return image
+    return cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
@@ -0,0 +1,86 @@
+"""
+Helpers for the shared memory used by the capture daemon (see
+:py:class:`CaptureDaemon<pyvr.CaptureDaemon.CaptureDaemon>`) and the processes that attach
+to it.  The daemon creates (and finally removes) each block.  Other processes only attach.
+"""
+import logging as log
+import numpy as np
+
+from multiprocessing import resource_tracker, shared_memory
+
+# BLOCKS ARE LAID OUT ON BOUNDARIES OF THIS MANY BYTES
+ALIGNMENT = 64
+
+
+def aligned(offset: int) -> int:
+    """
+    :about: Round an offset up to the next ALIGNMENT boundary.
+    """
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def create_shared_memory(name: str, size: int) -> shared_memory.SharedMemory:
+    """
+    :about: Create a named block of shared memory.  A block left behind by a daemon that
+            did not shut down cleanly is replaced.
+    :param name: name of the block (it appears in /dev/shm)
+    :param size: size of the block in bytes
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        log.warning(f"Replacing stale shared memory {name}.")
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    log.debug(f"Created shared memory {name} ({size // 2**20} MB)")
+    return shm
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    :about: Attach to a block created by the capture daemon.
+    :param name: name of the block
+    :raises IOError: if the capture daemon is not running.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        exc = IOError(f"Shared memory {name} not found.  Is the capture daemon running?")
+        log.exception(exc)
+        raise exc
+
+    # The daemon owns the block.  Keep python from removing it when this process exits.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def release_shared_memory(shm: shared_memory.SharedMemory, owner: bool) -> None:
+    """
+    :about: Detach from a block of shared memory and remove it if this process created it.
+    :param shm: the block
+    :param owner: TRUE if this process created the block
+    """
+    try:
+        shm.close()
+    except BufferError:
+        # Frames handed out earlier are still referenced.  The mapping goes away with the process.
+        log.debug(f"Shared memory {shm.name} is still in use.  It is released when the process exits.")
+
+    if owner:
+        shm.unlink()
+
+
+def shared_array(shm: shared_memory.SharedMemory, offset: int, shape: tuple, dtype) -> (np.ndarray, int):
+    """
+    :about: Map a numpy array onto part of a block of shared memory.
+    :param shm: the block
+    :param offset: where the array starts (in bytes)
+    :param shape: shape of the array
+    :param dtype: numpy type of the elements
+    :returns: the array and the (aligned) offset just past it.
+    """
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+    return array, aligned(offset + array.nbytes)
@@ -1,15 +1,17 @@
 import calendar as cal
-import cv2
 import datetime as dt
 import enum
 import logging as log
 import optparse as cl  # cl = command line.
-import os
-import time
+import shlex
+import threading as thr
 import typing as typ
 
 import pyvr
 
+# OPENCV IS ONLY LOADED WHEN THE PREVIEW WINDOW IS SHOWN (NOT IN HEADLESS MODE).
+cv2 = pyvr.LazyModule("cv2")
+
 # SETUP LOGGER BEFORE IMPORTS SO THEY CAN USE THESE SETTINGS
 log.basicConfig(filename="pyvr.log",
                 filemode="w",
@@ -25,8 +27,12 @@ class CommandLineOpts(str, enum.Enum):
     """
     DELETE = "delete"
     FILE_NAME = "filename"
+    HEADLESS = "headless"
     RECORD_LENGTH = "record_length"
+    PROFILE = "profile"
     PROMPT = "prompt"
+    QUEUE_FILE = "queue_file"
+    RESUME = "resume"
     START_TIME = "start_time"
     STOP_TIME = "stop_time"
 
@@ -91,7 +97,7 @@ def is_valid_time(time_str: str) -> bool:
         return False
 
 
-def parse_command_line() -> dict:
+def command_line_parser() -> cl.OptionParser:
     parser = cl.OptionParser()
     parser.set_defaults(filename="recording")
     parser.add_option("--prompt",
@@ -106,7 +112,8 @@ def parse_command_line() -> dict:
                       )
     parser.add_option("--start",
                       dest=CommandLineOpts.START_TIME,
-                      help="The time at which the recording should start (hh:mm). Note: 24 hour clock."
+                      help="The time at which the recording should start (hh:mm). Note: 24 hour clock. "
+                           "A time more than 12 hours ago means tomorrow."
                       )
     parser.add_option("--dur",
                       dest=CommandLineOpts.RECORD_LENGTH,
@@ -122,8 +129,35 @@ def parse_command_line() -> dict:
                       action="store_true",
                       help="Delete to original video and audio files."
                       )
-    options, _ = parser.parse_args()
+    parser.add_option("--headless",
+                      dest=CommandLineOpts.HEADLESS,
+                      default=False,
+                      action="store_true",
+                      help="No preview window.  Report status as text and take commands (status, stop, quit) "
+                           "from stdin or signals.  (Also Headless=Yes in the [PREVIEW] section of pyvr.ini)"
+                      )
+    parser.add_option("--queue",
+                      dest=CommandLineOpts.QUEUE_FILE,
+                      help="File listing several recordings to make, one per line, using the "
+                           "--file, --start, --dur, --stop, --del and --profile options. (# starts a comment)"
+                      )
+    parser.add_option("--profile",
+                      dest=CommandLineOpts.PROFILE,
+                      help="Encoding profile for the .mkv file (default Profile in the [ENCODE] section of "
+                           "pyvr.ini).  Built in: default, fast, sports, film and remux.  Add more in "
+                           "[ENCODE.<name>] sections."
+                      )
+    parser.add_option("--resume",
+                      dest=CommandLineOpts.RESUME,
+                      default=False,
+                      action="store_true",
+                      help="Do not record.  Finish the interrupted recording named by --file from the "
+                           "segments listed in its manifest.  (SegmentMins in the [ENCODE] section of pyvr.ini)"
+                      )
+    return parser
+
 
+def validate_options(parser: cl.OptionParser, options: cl.Values) -> dict:
     # VALIDATE OPTION VALUES WHERE APPROPRIATE
     if options.start_time and not is_valid_time(options.start_time):
         parser.error("invalid start time.")
@@ -137,16 +171,55 @@ def parse_command_line() -> dict:
     if options.record_length and options.stop_time:
         parser.error("--dur and --stop are mutually exclusive.")
 
+    if options.profile:
+        try:
+            pyvr.load_encode_profile(options.profile)
+        except ValueError as ve:
+            parser.error(str(ve))
+
     return vars(options)
 
 
+def parse_command_line() -> dict:
+    parser = command_line_parser()
+    options, _ = parser.parse_args()
+    return validate_options(parser, options)
+
+
+def scheduled_recording(cl_opts: dict) -> pyvr.ScheduledRecording:
+    return pyvr.ScheduledRecording(cl_opts[CommandLineOpts.FILE_NAME],
+                                   compute_start_time(cl_opts[CommandLineOpts.START_TIME]),
+                                   compute_end_time(cl_opts[CommandLineOpts.START_TIME],
+                                                    cl_opts[CommandLineOpts.RECORD_LENGTH],
+                                                    cl_opts[CommandLineOpts.STOP_TIME]
+                                                    ),
+                                   cl_opts[CommandLineOpts.DELETE],
+                                   cl_opts[CommandLineOpts.PROFILE]
+                                   )
+
+
+def load_queue(queue_file: str) -> pyvr.RecordingSchedule:
+    schedule = pyvr.RecordingSchedule()
+    parser = command_line_parser()
+    with open(queue_file, "r") as f:
+        for line in f:
+            args = shlex.split(line, comments=True)
+            if len(args) > 0:
+                options, _ = parser.parse_args(args)
+                schedule.add(scheduled_recording(validate_options(parser, options)))
+
+    return schedule
+
+
 def compute_start_time(start_time: str) -> dt.datetime:
     if start_time is None:
         # BY DEFAULT START RIGHT NOW
         start_at: dt.datetime = dt.datetime.now()
     else:
         splits = [int(x) for x in start_time.split(":")]
-        start_at = dt.datetime.now().replace(hour=splits[0], minute=splits[1])
+        start_at = dt.datetime.now().replace(hour=splits[0], minute=splits[1], second=0, microsecond=0)
+        if start_at < dt.datetime.now() - dt.timedelta(hours=12):
+            start_at += dt.timedelta(days=1)
 
     return start_at
 
@@ -155,10 +228,13 @@ def compute_end_time(start_time: typ.Optional[str], duration: str, stop_time: ty
     if duration is None and stop_time is None:
         return None
 
+    start_at = compute_start_time(start_time)
     if stop_time is not None:
         splits = [int(x) for x in stop_time.split(":")]
-        return dt.datetime.now().replace(hour=splits[0], minute=splits[1])
-    start_at = compute_start_time(start_time)
+        stop_at = start_at.replace(hour=splits[0], minute=splits[1], second=0, microsecond=0)
+        if stop_at <= start_at:
+            stop_at += dt.timedelta(days=1)
+        return stop_at
 
     # DURATION MUST BE DEFINED, OR WE WOULDN'T BE HERE.
     hrs = mins = secs = 0
@@ -180,10 +256,68 @@ def display_time_remaining(seconds_left: int) -> None:
     print(f"Time remaining: \033[92m\033[1m{hours}:{mins:02}:{secs:02}\033[0m\r", end="")
 
 
+def preview_recording(vc: pyvr.VideoCard,
+                      stop_recording_at: dt.datetime,
+                      stopped: thr.Event,
+                      width: int,
+                      height: int,
+                      interval: float
+                      ) -> bool:
+    # Save some cpu for other people. Only show an occasional update (and only new frames).
+    # RETURNS TRUE IF THE PREVIEW WINDOW WAS OPENED (A FRAME WAS SHOWN).
+    with pyvr.PreviewStage(vc, (width, height), interval) as preview:
+        while preview.wait() and not stopped.is_set():
+            # Stop/end recording when escape key is pressed.
+            if not preview.show("Preview Recording"):
+                break
+
+            # THE STOP TIMER ENDS THE RECORDING.  THIS IS ONLY A COUNTDOWN.
+            if stop_recording_at is not None:
+                seconds_left = (stop_recording_at - dt.datetime.now()).total_seconds()
+                display_time_remaining(max(0, int(seconds_left)))
+
+    return preview.frames_shown > 0
+
+
+def record_until_stopped(vc: pyvr.VideoCard,
+                         recording: pyvr.ScheduledRecording,
+                         schedule: pyvr.RecordingSchedule,
+                         handlers: list,
+                         control: pyvr.ConsoleControl | None,
+                         width: int,
+                         height: int,
+                         interval: float,
+                         stopped: thr.Event | None = None
+                         ) -> bool:
+    # THE RECORDING ENDS WHEN stopped IS SET (BY THE STOP TIMER OR A FAILED STREAMING MUXER).
+    stopped = stopped if stopped is not None else thr.Event()
+
+    def stop_recording() -> None:
+        # RUNS ON THE STOP TIMER'S THREAD AT THE STOP TIME.
+        stopped.set()
+        for handler in handlers:
+            handler.stop_processing()
+
+    stop_cancelled = schedule.stop_timer(recording, stop_recording)
+    window_shown: bool = False
+    if control is None:
+        window_shown = preview_recording(vc, recording.stop_at, stopped, width, height, interval)
+    else:
+        pyvr.monitor_recording(vc, control, stopped, recording.stop_at)
+        control.next_recording()
+    if stop_cancelled is not None:
+        stop_cancelled.set()
+    for handler in handlers:
+        handler.processing = False
+    return window_shown
+
+
 def record(filename_no_ext: str,
            start_recording_at: dt.datetime,
            stop_recording_at: dt.datetime,
-           delete_files: bool
+           delete_files: bool,
+           headless: bool = False,
+           profile: str | None = None
            ) -> None:
     """
     :about: This is the main entrypoint to the pyvr package.  It is likely the only function
@@ -195,6 +329,8 @@ def record(filename_no_ext: str,
     :param start_recording_at: date/time the recording should start
     :param stop_recording_at: date/time the recording should complete
     :param delete_files:
+    :param headless: TRUE to record without a preview window
+    :param profile: name of the encoding profile (None for *Profile* in pyvr.ini)
     :Side Effect: Creation of a .mkv file recording the requested audio and video.
 
     ... note::
@@ -215,75 +351,115 @@ def record(filename_no_ext: str,
                                         if keypress & 0xFF == ord('q'):
                                             break
     """
+    schedule = pyvr.RecordingSchedule()
+    schedule.add(pyvr.ScheduledRecording(filename_no_ext, start_recording_at, stop_recording_at, delete_files, profile))
+    record_schedule(schedule, headless)
+
+
+def record_schedule(schedule: pyvr.RecordingSchedule, headless: bool = False) -> None:
+    """
+    :about: Make every recording in a schedule.  The capture devices are opened shortly
+            before the first recording starts and stay open until the last one ends.
+    :param schedule: the recordings to make
+    :param headless: TRUE to record without a preview window (also *Headless* in pyvr.ini)
+    """
+    _, _, preview_config = pyvr.load_config()
+    # PIPELINE STATISTICS ARE PUBLISHED WHILE RECORDING (SEE [TELEMETRY] IN pyvr.ini)
+    with pyvr.TelemetryServer():
+        if headless or preview_config[pyvr.PreviewCfg.HEADLESS]:
+            # NO WINDOW.  SIGNALS AND COMMANDS TYPED ON STDIN CONTROL THE RECORDINGS.
+            with pyvr.ConsoleControl(on_quit=schedule.cancel) as control:
+                run_schedule(schedule, control)
+        else:
+            run_schedule(schedule, None)
+
+
+def run_schedule(schedule: pyvr.RecordingSchedule, control: pyvr.ConsoleControl | None) -> None:
     log.debug("*** *** *** Begin recording *** *** ***")
 
     # LOAD PREVIEW CONFIG ATTRIBUTES FROM pyvr.ini
-    _, _, preview_config = pyvr.load_config()
+    audio_config, video_config, preview_config = pyvr.load_config()
     width: int = int(preview_config[pyvr.PreviewCfg.WIDTH])
     height: int = int(preview_config[pyvr.PreviewCfg.HEIGHT])
     interval: float = float(preview_config[pyvr.PreviewCfg.INTERVAL])
+    stream: bool = pyvr.load_encode_config()[pyvr.EncodeCfg.MODE] == pyvr.EncodeMode.STREAM
 
-    # WAIT UNTIL WE SHOULD START RECORDING
-    if start_recording_at is not None:
-        begin: bool = False
-        while not begin:
-            current_time = dt.datetime.now()
-            if current_time > start_recording_at:
-                begin = True
-            else:
-                # SLEEP (ALMOST) ONE MINUTE AND CHECK AGAIN.
-                time.sleep(59)
+    # WAIT UNTIL THE DEVICES SHOULD WARM UP.  WITH A PRE-ROLL THEY OPEN EVEN EARLIER.
+    pre_roll_secs: float = max(float(audio_config[pyvr.AudioCfg.PRE_ROLL_SECS]),
+                               float(video_config[pyvr.VideoCfg.PRE_ROLL_SECS]))
+    if not schedule.wait_until(schedule.warm_up_at(pre_roll_secs)):
+        return
+
+    # COMBINING THE FILES RUNS IN THE BACKGROUND SO THE NEXT RECORDING IS NOT DELAYED.
+    finishing: [thr.Thread] = []
+    window_shown: bool = False
 
     # Each with line creates its own thread.
     with pyvr.VideoCard() as vc:
-        with pyvr.VideoRecorder(f"{filename_no_ext}.{pyvr.VIDEO_EXT}", vc) as vr:
-            print(f"Record resolution: ({vc.width}, {vc.height})")
-            with pyvr.AudioInput() as ai:
-                with pyvr.AudioRecorder(ai, filename=f"{filename_no_ext}.{pyvr.AUDIO_EXT}") as ar:
-                    while True:
-                        # Preview the video being recorded.
-                        f = vc.most_recent_frame()
-                        resized = cv2.resize(f, (width, height))
-                        cv2.imshow("Preview Recording", resized)
-
-                        # Stop/end recording when escape key is pressed.
-                        keypress = cv2.waitKey(1)
-                        if keypress & 0xFF == 27:
-                            break
-
-                        # Stop recording if the end recording time is reached.
-                        if stop_recording_at is not None:
-                            current_time = dt.datetime.now()
-                            seconds_left: int = (stop_recording_at - current_time).seconds
-                            display_time_remaining(seconds_left)
-
-                            if seconds_left < 1 or current_time > stop_recording_at:
-                                break
-
-                        # Save some cpu for other people. Sleep and only show an occasional update.
-                        time.sleep(interval)
-
-                    ar.processing = False
-                ai.new_audio_sample = False
-            vr.processing = False
-        vc.viewing = False
+        print(f"Record resolution: ({vc.width}, {vc.height})")
+        with pyvr.AudioInput() as ai:
+            while (recording := schedule.next_recording()) is not None:
+                if not schedule.wait_until(recording.start_at):
+                    break
+
+                print(f"Recording {recording.filename_no_ext}")
+                if stream:
+                    # ENCODE STRAIGHT INTO THE .mkv FILE WHILE RECORDING. NO INTERMEDIATE FILES.
+                    stopped = thr.Event()
+                    try:
+                        with pyvr.FfmpegMuxer(f"{recording.filename_no_ext}.{pyvr.RESULT_EXT}",
+                                              vc,
+                                              ai,
+                                              recording.profile,
+                                              stopped
+                                              ) as muxer:
+                            with pyvr.VideoStreamer(muxer, vc) as vs:
+                                with pyvr.AudioStreamer(ai, muxer) as ast:
+                                    window_shown |= record_until_stopped(vc, recording, schedule, [vs, ast], control,
+                                                                         width, height, interval, stopped)
+                    except IOError:
+                        # FFMPEG FAILED (ALREADY LOGGED).  THE REST OF THE SCHEDULE STILL RECORDS.
+                        print()
+                        print(f"Recording {recording.filename_no_ext} failed.  See pyvr.log.")
+                        continue
+                    print()
+                    log.info(f"Process complete. Results stored in {recording.filename_no_ext}.{pyvr.RESULT_EXT}")
+                    continue
+
+                encoder = pyvr.segment_encoder(recording.filename_no_ext,
+                                               vc.clock.now(),
+                                               recording.delete_files,
+                                               recording.profile
+                                               )
+                manifest = encoder.manifest if encoder is not None else None
+                with pyvr.VideoRecorder(f"{recording.filename_no_ext}.{pyvr.VIDEO_EXT}", vc, manifest) as vr:
+                    with pyvr.AudioRecorder(ai,
+                                            filename=f"{recording.filename_no_ext}.{pyvr.AUDIO_EXT}",
+                                            manifest=manifest
+                                            ) as ar:
+                        window_shown |= record_until_stopped(vc, recording, schedule, [vr, ar], control,
+                                                             width, height, interval)
+
+                print()
+                print("Processing final results in the background.")
+                finishing.append(thr.Thread(name="finish-recording-thread",
+                                            target=pyvr.finish_recording,
+                                            args=(recording.filename_no_ext,
+                                                  recording.delete_files,
+                                                  encoder,
+                                                  recording.profile
+                                                  )
+                                            ))
+                finishing[-1].start()
 
-    print()
-    cv2.destroyWindow("Preview Recording")
-    time.sleep(0.5)
-    log.info("Combine and compress recording information.")
-    print("Processing final results.  Please be patient ...")
-    pyvr.combine_video_and_audio(f"{filename_no_ext}.{pyvr.VIDEO_EXT}",
-                                 f"{filename_no_ext}.{pyvr.AUDIO_EXT}",
-                                 f"{filename_no_ext}.{pyvr.RESULT_EXT}"
-                                 )
-
-    # delete video and audio files.
-    if delete_files:
-        os.remove(f"{filename_no_ext}.{pyvr.VIDEO_EXT}")
-        os.remove(f"{filename_no_ext}.{pyvr.AUDIO_EXT}")
+        vc.viewing = False
 
-    log.info(f"Process complete. Results stored in {filename_no_ext}.{pyvr.RESULT_EXT}")
+    if window_shown:
+        cv2.destroyWindow("Preview Recording")
+    if len(finishing) > 0:
+        print("Finishing recordings.  Please be patient ...")
+    for thread in finishing:
+        thread.join()
 
 
 def prompt_for_duration() -> str:
@@ -466,16 +642,23 @@ def main() -> None:
                False
                )
 
+    elif cl_opts[CommandLineOpts.RESUME]:
+        pyvr.resume_recording(cl_opts[CommandLineOpts.FILE_NAME],
+                              cl_opts[CommandLineOpts.DELETE],
+                              cl_opts[CommandLineOpts.PROFILE]
+                              )
+
+    elif cl_opts[CommandLineOpts.QUEUE_FILE]:
+        record_schedule(load_queue(cl_opts[CommandLineOpts.QUEUE_FILE]), cl_opts[CommandLineOpts.HEADLESS])
+
     else:
-        record_at: dt.datetime = compute_start_time(cl_opts[CommandLineOpts.START_TIME])
-        record_until: dt.datetime = compute_end_time(cl_opts[CommandLineOpts.START_TIME],
-                                                     cl_opts[CommandLineOpts.RECORD_LENGTH],
-                                                     cl_opts[CommandLineOpts. STOP_TIME]
-                                                     )
-        record(cl_opts[CommandLineOpts.FILE_NAME],
-               record_at,
-               record_until,
-               cl_opts[CommandLineOpts.DELETE]
+        recording = scheduled_recording(cl_opts)
+        record(recording.filename_no_ext,
+               recording.start_at,
+               recording.stop_at,
+               recording.delete_files,
+               cl_opts[CommandLineOpts.HEADLESS],
+               recording.profile
                )
 
 
@@ -0,0 +1,8 @@
+"""
+The pyvr package lives in src/.  The tests import it from there (no install needed) and
+never touch capture or audio hardware.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,93 @@
+"""
+AudioChannel: chunks are handed over in order.  When the channel is full, generated audio
+waits for room while audio from a device discards the oldest chunk.  Neither is counted
+silently.
+"""
+import threading as thr
+import time
+
+from pyvr.AudioChannel import AudioChannel
+
+
+def test_chunks_come_out_in_order():
+    channel = AudioChannel(4)
+    for idx in range(3):
+        assert channel.put(bytes([idx]), float(idx))
+
+    assert [channel.get(timeout=0).timestamp for _ in range(3)] == [0.0, 1.0, 2.0]
+    assert channel.get(timeout=0) is None
+    assert channel.high_water == 3
+
+
+def test_full_device_channel_drops_the_oldest_chunk():
+    channel = AudioChannel(2, wait_when_full=False)
+    for idx in range(5):
+        assert channel.put(bytes([idx]), float(idx))
+
+    assert channel.overflows == 3
+    assert channel.chunks_dropped == 3
+    assert [channel.get(timeout=0).data for _ in range(2)] == [b"\x03", b"\x04"]
+
+
+def test_full_device_channel_warns_every_time(caplog):
+    channel = AudioChannel(1, wait_when_full=False)
+    with caplog.at_level("WARNING"):
+        for idx in range(4):
+            channel.put(bytes([idx]), float(idx))
+
+    assert len([record for record in caplog.records if "Audio channel full" in record.message]) == 3
+
+
+def test_full_generated_channel_waits_for_room():
+    channel = AudioChannel(1, wait_when_full=True)
+    channel.put(b"\x00", 0.0)
+
+    producer = thr.Thread(target=channel.put, args=(b"\x01", 1.0))
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive()
+    assert channel.overflows == 1
+
+    assert channel.get(timeout=1).data == b"\x00"
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert channel.get(timeout=0).data == b"\x01"
+    assert channel.chunks_dropped == 0
+
+
+def test_close_wakes_a_waiting_producer():
+    channel = AudioChannel(1, wait_when_full=True)
+    channel.put(b"\x00", 0.0)
+    accepted = []
+
+    producer = thr.Thread(target=lambda: accepted.append(channel.put(b"\x01", 1.0)))
+    producer.start()
+    time.sleep(0.05)
+    channel.close()
+    producer.join(timeout=1)
+
+    assert accepted == [False]
+    assert channel.get(timeout=0).data == b"\x00"
+    assert channel.get(timeout=0) is None
+
+
+def test_pre_roll_keeps_the_newest_chunks():
+    channel = AudioChannel(10)
+    channel.start_pre_roll(3)
+    for idx in range(8):
+        channel.put(bytes([idx]), float(idx))
+    assert channel.overflows == 0
+
+    channel.end_pre_roll(keep=True)
+    channel.put(b"\x08", 8.0)
+    assert [channel.get(timeout=0).data[0] for _ in range(4)] == [5, 6, 7, 8]
+
+
+def test_pre_roll_can_be_discarded():
+    channel = AudioChannel(10)
+    channel.start_pre_roll(3)
+    for idx in range(5):
+        channel.put(bytes([idx]), float(idx))
+
+    channel.end_pre_roll(keep=False)
+    assert channel.get(timeout=0) is None
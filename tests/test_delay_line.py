@@ -0,0 +1,74 @@
+"""
+DelayLine: the output trails the input by *depth* frames, and the depth can change while
+playing without reallocating.
+"""
+import numpy as np
+
+from pyvr.DelayLine import DelayLine
+
+HEIGHT = 2
+WIDTH = 3
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((HEIGHT, WIDTH, 3), value, dtype=np.uint8)
+
+
+def push(line: DelayLine, value: int) -> int | None:
+    """ Push a frame (filled with value) and return the value of the frame that comes out. """
+    delayed = line.push(frame(value))
+    return None if delayed is None else int(delayed[0, 0, 0])
+
+
+def test_output_trails_input_by_depth():
+    line = DelayLine(8, HEIGHT, WIDTH)
+    assert line.set_depth(3) == 3
+
+    assert [push(line, value) for value in range(6)] == [None, None, None, 0, 1, 2]
+    assert len(line) == 3
+
+
+def test_depth_is_limited_by_capacity():
+    line = DelayLine(5, HEIGHT, WIDTH)
+    assert line.set_depth(100) == 4
+    assert line.set_depth(-1) == 0
+
+
+def test_growing_depth_holds_the_output():
+    line = DelayLine(8, HEIGHT, WIDTH)
+    line.set_depth(1)
+    assert [push(line, value) for value in range(4)] == [None, 0, 1, 2]
+
+    # THE OUTPUT WAITS ON ITS CURRENT FRAME UNTIL THE EXTRA FRAMES ARE BUFFERED.
+    line.set_depth(3)
+    assert [push(line, value) for value in range(4, 8)] == [2, 2, 3, 4]
+    assert len(line) == 3
+
+
+def test_shrinking_depth_skips_ahead():
+    line = DelayLine(8, HEIGHT, WIDTH)
+    line.set_depth(4)
+    assert [push(line, value) for value in range(6)] == [None, None, None, None, 0, 1]
+
+    line.set_depth(1)
+    assert [push(line, value) for value in range(6, 8)] == [5, 6]
+    assert len(line) == 1
+
+
+def test_memory_never_changes():
+    line = DelayLine(4, HEIGHT, WIDTH)
+    block = line.block
+    for depth in (0, 3, 1, 2):
+        line.set_depth(depth)
+        for value in range(5):
+            push(line, value)
+
+    assert line.block is block
+    assert line.block.shape == (4, HEIGHT, WIDTH, 3)
+
+
+def test_frames_of_another_size_are_scaled():
+    line = DelayLine(2, HEIGHT, WIDTH)
+    delayed = line.push(np.full((HEIGHT * 2, WIDTH * 2, 3), 9, dtype=np.uint8))
+    assert delayed.shape == (HEIGHT, WIDTH, 3)
+    assert np.all(delayed == 9)
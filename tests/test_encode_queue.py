@@ -0,0 +1,109 @@
+"""
+EncodeQueue: jobs are claimed once, in order.  A failed job is retried after a delay until
+it runs out of retries, and a job left running by a worker that died is queued again.
+"""
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+
+from pyvr.EncodeQueue import EncodeQueue, DONE, FAILED, QUEUED, RUNNING
+
+# import pyvr.EncodeQueue FINDS THE CLASS (RE-EXPORTED BY pyvr), NOT THE MODULE.
+encode_queue_module = sys.modules["pyvr.EncodeQueue"]
+
+
+def dead_pid() -> int:
+    """ The id of a process that has already exited. """
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    return finished.pid
+
+
+def test_jobs_are_claimed_once_in_order(tmp_path):
+    queue = EncodeQueue(str(tmp_path / "queue.db"))
+    first = queue.enqueue("first", True)
+    second = queue.enqueue("second", False, segmented=True, profile="fast")
+
+    job = queue.claim()
+    assert job.job_id == first
+    assert job.filename_no_ext == "first"
+    assert job.delete_files and not job.segmented
+    assert job.attempts == 0 and job.profile is None
+
+    job = queue.claim()
+    assert job.job_id == second
+    assert not job.delete_files and job.segmented
+    assert job.profile == "fast"
+
+    assert queue.claim() is None
+    assert queue.counts() == {RUNNING: 2}
+
+
+def test_completed_job_is_not_claimed_again(tmp_path):
+    queue = EncodeQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("recording", True)
+    queue.complete(queue.claim())
+
+    assert queue.claim() is None
+    assert queue.counts() == {DONE: 1}
+    assert queue.next_retry() is None
+
+
+def test_failed_job_is_retried_after_a_delay(tmp_path, monkeypatch):
+    queue = EncodeQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("recording", True)
+
+    before = time.time()
+    assert queue.fail(queue.claim(), "ffmpeg failed", retries=2)
+    assert queue.claim() is None
+    assert queue.next_retry() >= before + encode_queue_module.RETRY_DELAY_SECS
+
+    monkeypatch.setattr(encode_queue_module, "RETRY_DELAY_SECS", 0.0)
+    with closing(sqlite3.connect(queue.filename)) as db:
+        db.execute("UPDATE jobs SET not_before = 0")
+        db.commit()
+
+    job = queue.claim()
+    assert job.attempts == 1
+    assert queue.fail(job, "ffmpeg failed again", retries=2)
+
+    job = queue.claim()
+    assert job.attempts == 2
+    assert not queue.fail(job, "ffmpeg failed a third time", retries=2)
+    assert queue.claim() is None
+    assert queue.counts() == {FAILED: 1}
+
+
+def test_job_of_a_dead_worker_is_recovered(tmp_path):
+    queue = EncodeQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("orphan", True)
+    queue.enqueue("busy", True)
+    orphan = queue.claim()
+    queue.claim()
+
+    with closing(sqlite3.connect(queue.filename)) as db:
+        db.execute("UPDATE jobs SET worker_pid = ? WHERE job_id = ?", (dead_pid(), orphan.job_id))
+        db.commit()
+
+    # THE OTHER JOB BELONGS TO THIS (RUNNING) PROCESS AND IS LEFT ALONE.
+    assert queue.recover() == 1
+    assert queue.counts() == {QUEUED: 1, RUNNING: 1}
+    assert queue.claim().job_id == orphan.job_id
+
+
+def test_queue_created_before_profiles_is_upgraded(tmp_path):
+    filename = str(tmp_path / "queue.db")
+    with closing(sqlite3.connect(filename)) as db:
+        db.execute("CREATE TABLE jobs (job_id INTEGER PRIMARY KEY AUTOINCREMENT, filename_no_ext TEXT NOT NULL,"
+                   " delete_files INTEGER NOT NULL, segmented INTEGER NOT NULL, state TEXT NOT NULL,"
+                   " attempts INTEGER NOT NULL DEFAULT 0, not_before REAL NOT NULL DEFAULT 0, worker_pid INTEGER,"
+                   " last_error TEXT, queued_at REAL NOT NULL, updated_at REAL NOT NULL)")
+        db.execute("INSERT INTO jobs (filename_no_ext, delete_files, segmented, state, queued_at, updated_at)"
+                   " VALUES ('old', 1, 0, 'queued', 0, 0)")
+        db.commit()
+
+    job = EncodeQueue(filename).claim()
+    assert job.filename_no_ext == "old"
+    assert job.profile is None
@@ -0,0 +1,121 @@
+"""
+FrameRing: sequencing, held frames, spare buffers and frames of the wrong size.  Frames
+are pushed by hand, so no capture device (or thread) is needed.
+"""
+import numpy as np
+
+from pyvr.FrameRing import FrameRing
+
+HEIGHT = 4
+WIDTH = 6
+
+
+def capture(ring: FrameRing, value: int) -> int:
+    """ Decode a frame (filled with value) into the next slot and publish it. """
+    slot = ring.next_slot()
+    slot[:] = value
+    return ring.commit(slot, float(value))
+
+
+def test_frames_are_numbered_in_order():
+    ring = FrameRing(4, HEIGHT, WIDTH)
+    assert ring.latest() is None
+    assert [capture(ring, value) for value in range(3)] == [0, 1, 2]
+
+    frame = ring.frame(1)
+    assert frame.seq == 1
+    assert frame.timestamp == 1.0
+    assert np.all(frame.image == 1)
+    assert ring.latest().seq == 2
+
+
+def test_overwritten_frames_are_gone():
+    ring = FrameRing(4, HEIGHT, WIDTH)
+    for value in range(10):
+        capture(ring, value)
+
+    assert ring.oldest_seq() == 10 - 4 + 1
+    assert ring.frame(2) is None
+    assert ring.frame(11) is None
+    assert np.all(ring.frame(9).image == 9)
+
+
+def test_held_frame_survives_wrap_around():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    capture(ring, 7)
+    held = ring.acquire(0)
+    assert not held.image.flags.writeable
+
+    for value in range(1, 8):
+        capture(ring, value + 10)
+
+    assert np.all(held.image == 7)
+    ring.release(0)
+    assert ring.acquire(0) is None
+
+
+def test_reserved_spares_avoid_allocation():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    ring.reserve_spares(2)
+    capture(ring, 1)
+    capture(ring, 2)
+    ring.acquire(0)
+    ring.acquire(1)
+
+    for value in range(3, 10):
+        capture(ring, value)
+
+    assert ring.spares_reserved == 2
+    assert ring.spares_allocated == 0
+
+
+def test_ring_is_not_reallocated_under_a_held_frame():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    capture(ring, 5)
+    held = ring.acquire(0)
+
+    ring.next_slot()
+    seq = ring.commit(np.full((HEIGHT * 2, WIDTH * 2, 3), 9, dtype=np.uint8), 1.0)
+
+    assert seq == 1
+    assert ring.shape == (HEIGHT, WIDTH, 3)
+    assert ring.frames_resized == 1
+    assert np.all(ring.frame(1).image == 9)
+    assert np.all(held.image == 5)
+
+
+def test_ring_is_reallocated_when_nothing_is_held():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    capture(ring, 5)
+
+    ring.next_slot()
+    seq = ring.commit(np.full((HEIGHT * 2, WIDTH * 2, 3), 9, dtype=np.uint8), 1.0)
+
+    assert ring.shape == (HEIGHT * 2, WIDTH * 2, 3)
+    assert ring.frame(0) is None
+    assert ring.frame(seq).image.shape == (HEIGHT * 2, WIDTH * 2, 3)
+
+
+def test_frame_that_cannot_be_scaled_is_rejected():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    capture(ring, 5)
+    ring.acquire(0)
+
+    ring.next_slot()
+    assert ring.commit(np.zeros((HEIGHT, WIDTH), dtype=np.uint8), 1.0) == -1
+    assert ring.frames_rejected == 1
+    assert ring.latest_seq == 0
+
+
+def test_ring_counts_dropped_and_duplicated_frames():
+    ring = FrameRing(4, HEIGHT, WIDTH)
+    for value in range(8):
+        capture(ring, value)
+
+    frame = ring.wait_for_frame(-1, timeout=0)
+    assert frame.seq == ring.oldest_seq()
+    assert ring.dropped == ring.oldest_seq()
+
+    frame = ring.wait_for_frame(7, timeout=0)
+    assert frame.seq == 7
+    assert ring.duplicated == 1
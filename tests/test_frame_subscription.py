@@ -0,0 +1,87 @@
+"""
+FrameSubscription: each subscriber receives the frames in order and counts its own
+dropped and duplicated frames.  Frames are pushed by hand, so no capture device (or
+thread) is needed.
+"""
+from pyvr.FrameRing import FrameRing
+from pyvr.FrameSubscription import FrameSubscription
+
+HEIGHT = 4
+WIDTH = 6
+
+
+class FakeCard:
+    """ Just enough of a VideoCard for a FrameSubscription (frames are never scaled). """
+    def __init__(self, ring: FrameRing) -> None:
+        self.ring = ring
+        self.width = WIDTH
+        self.height = HEIGHT
+
+    def unsubscribe(self, subscription: FrameSubscription) -> None:
+        pass
+
+
+def capture(ring: FrameRing, value: int) -> int:
+    """ Decode a frame (filled with value) into the next slot and publish it. """
+    slot = ring.next_slot()
+    slot[:] = value
+    return ring.commit(slot, float(value))
+
+
+def test_subscription_receives_every_frame_in_order():
+    ring = FrameRing(8, HEIGHT, WIDTH)
+    subscription = FrameSubscription(FakeCard(ring), "recorder")
+    for value in range(3):
+        capture(ring, value)
+
+    assert [subscription.next_frame(timeout=0).seq for _ in range(3)] == [0, 1, 2]
+    assert subscription.frames == 3
+    assert subscription.dropped == 0
+    assert subscription.duplicated == 0
+
+
+def test_subscription_counts_its_own_drops_and_duplicates():
+    ring = FrameRing(4, HEIGHT, WIDTH)
+    slow = FrameSubscription(FakeCard(ring), "slow")
+    fast = FrameSubscription(FakeCard(ring), "fast")
+    capture(ring, 0)
+    assert slow.next_frame(timeout=0).seq == 0
+    assert fast.next_frame(timeout=0).seq == 0
+
+    for value in range(1, 10):
+        capture(ring, value)
+        fast.next_frame(timeout=0)
+
+    # THE SLOW SUBSCRIBER HOLDS FRAME 0 AND MISSED FRAMES THE RING HAS SINCE OVERWRITTEN.
+    frame = slow.next_frame(timeout=0)
+    assert frame.seq == ring.oldest_seq()
+    assert slow.dropped == frame.seq - 1
+    assert fast.dropped == 0
+
+    # NOTHING NEW: THE SAME FRAME IS RETURNED AGAIN AND COUNTED AS A DUPLICATE.
+    assert fast.next_frame(timeout=0).seq == 9
+    assert fast.duplicated == 1
+    assert slow.duplicated == 0
+
+
+def test_skip_backlog_counts_skipped_frames_as_dropped():
+    ring = FrameRing(8, HEIGHT, WIDTH)
+    subscription = FrameSubscription(FakeCard(ring), "degraded")
+    capture(ring, 0)
+    subscription.next_frame(timeout=0)
+    for value in range(1, 6):
+        capture(ring, value)
+
+    assert subscription.skip_backlog() == 4
+    assert subscription.dropped == 4
+    assert subscription.next_frame(timeout=0).seq == 5
+
+
+def test_closing_a_subscription_releases_its_frame():
+    ring = FrameRing(3, HEIGHT, WIDTH)
+    capture(ring, 0)
+    with FrameSubscription(FakeCard(ring), "preview", latest_only=True) as subscription:
+        assert subscription.next_frame(timeout=0).seq == 0
+        assert ring.pinned == {0: ring.slot_buffer[0]}
+
+    assert ring.pinned == {}
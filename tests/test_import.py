@@ -0,0 +1,17 @@
+"""
+import pyvr must stay fast and must not load OpenCV, an audio library or msutils.  They
+are only loaded when they are used (see pyvr.LazyModule).
+"""
+from pyvr.bench import measure_import, DEFERRED_MODULES, IMPORT_BUDGET_SECS
+
+
+def test_import_defers_slow_modules():
+    measured = measure_import(runs=1)
+    assert measured["deferred_modules_loaded"] == []
+    for module in ("cv2", "sounddevice", "alsaaudio", "pyaudio", "msutils"):
+        assert module in DEFERRED_MODULES
+
+
+def test_import_is_within_budget():
+    # THE FASTEST OF SEVERAL FRESH INTERPRETERS, SO A COLD DISK CACHE DOES NOT FAIL THE TEST.
+    assert measure_import(runs=3)["import_secs"] < IMPORT_BUDGET_SECS
@@ -0,0 +1,92 @@
+"""
+PcmWriter: the .wav header is valid while recording (not only once the file is closed)
+and a recording over 4GB switches to RF64.
+"""
+import os
+import struct
+import wave
+
+from pyvr.PcmWriter import PcmWriter, DATA_SIZE_OFFSET, DS64_OFFSET, HEADER_BYTES, RIFF_LIMIT
+
+SAMPLE_RATE = 8000
+CHANNELS = 2
+
+
+def audio(frames: int, value: int = 1) -> bytes:
+    return struct.pack(f"<{frames * CHANNELS}h", *([value] * frames * CHANNELS))
+
+
+def test_closed_file_is_a_valid_wav(tmp_path):
+    filename = str(tmp_path / "audio.wav")
+    with PcmWriter(filename, CHANNELS, SAMPLE_RATE) as writer:
+        writer.write(audio(1000, 7))
+        writer.write_silence(500)
+
+    assert os.path.getsize(filename) == HEADER_BYTES + 1500 * CHANNELS * 2
+    with wave.open(filename, "rb") as wav:
+        assert wav.getnchannels() == CHANNELS
+        assert wav.getframerate() == SAMPLE_RATE
+        assert wav.getsampwidth() == 2
+        assert wav.getnframes() == 1500
+        assert wav.readframes(1000) == audio(1000, 7)
+        assert wav.readframes(500) == bytes(500 * CHANNELS * 2)
+
+
+def test_header_is_valid_while_recording(tmp_path):
+    filename = str(tmp_path / "audio.wav")
+    writer = PcmWriter(filename, CHANNELS, SAMPLE_RATE)
+    writer.open()
+    try:
+        # A LITTLE OVER TWO HEADER UPDATES WORTH OF AUDIO.  THE FILE IS NOT CLOSED (A CRASH).
+        writer.write(audio(SAMPLE_RATE))
+        writer.write(audio(SAMPLE_RATE))
+        writer.write(audio(100))
+
+        with wave.open(filename, "rb") as wav:
+            assert wav.getnframes() == 2 * SAMPLE_RATE
+            assert wav.readframes(2 * SAMPLE_RATE) == audio(2 * SAMPLE_RATE)
+    finally:
+        writer.close()
+
+    with wave.open(filename, "rb") as wav:
+        assert wav.getnframes() == 2 * SAMPLE_RATE + 100
+
+
+def test_switches_to_rf64_over_4gb(tmp_path):
+    filename = str(tmp_path / "audio.wav")
+    writer = PcmWriter(filename, CHANNELS, SAMPLE_RATE)
+    writer.open()
+    writer.write(audio(10))
+
+    # PRETEND 5GB WAS WRITTEN RATHER THAN WRITING IT.
+    writer.data_bytes = 5 * 2**30
+    writer.update_header()
+    os.close(writer.fd)
+    writer.fd = None
+
+    with open(filename, "rb") as f:
+        header = f.read(HEADER_BYTES)
+
+    assert writer.rf64
+    assert header[0:4] == b"RF64"
+    assert struct.unpack_from("<I", header, 4)[0] == RIFF_LIMIT
+    assert header[8:12] == b"WAVE"
+    assert header[DS64_OFFSET:DS64_OFFSET + 4] == b"ds64"
+    riff_bytes, data_bytes, frames, _ = struct.unpack_from("<QQQI", header, DS64_OFFSET + 8)
+    assert riff_bytes == HEADER_BYTES - 8 + 5 * 2**30
+    assert data_bytes == 5 * 2**30
+    assert frames == 5 * 2**30 // (CHANNELS * 2)
+    assert header[DATA_SIZE_OFFSET - 4:DATA_SIZE_OFFSET] == b"data"
+    assert struct.unpack_from("<I", header, DATA_SIZE_OFFSET)[0] == RIFF_LIMIT
+
+
+def test_small_file_stays_riff(tmp_path):
+    filename = str(tmp_path / "audio.wav")
+    with PcmWriter(filename, CHANNELS, SAMPLE_RATE) as writer:
+        writer.write(audio(10))
+
+    with open(filename, "rb") as f:
+        header = f.read(HEADER_BYTES)
+    assert not writer.rf64
+    assert header[0:4] == b"RIFF"
+    assert header[DS64_OFFSET:DS64_OFFSET + 4] == b"JUNK"
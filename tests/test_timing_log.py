@@ -0,0 +1,75 @@
+"""
+TimingLog: the sidecars written while recording, the line fitted through them and the
+audio filter built from two of them to remove offset and drift.
+"""
+import random
+
+import pytest
+
+from pyvr.encoding import drift_correction_filter
+from pyvr.TimingLog import TimingLog, fit_timeline, read_timing, timing_filename
+
+
+def write_sidecar(media_file: str, rate: float, points: [(int, float)]) -> None:
+    sidecar = TimingLog(media_file, rate)
+    sidecar.open()
+    for position, timestamp in points:
+        sidecar.write(position, timestamp)
+    sidecar.close()
+
+
+def test_sidecar_round_trip(tmp_path):
+    media_file = str(tmp_path / "video.mp4")
+    write_sidecar(media_file, 30.0, [(0, 10.0), (30, 11.0), (60, 12.000001)])
+
+    assert timing_filename(media_file) == media_file + ".timing"
+    rate, points = read_timing(timing_filename(media_file))
+    assert rate == 30.0
+    assert points == [(0, 10.0), (30, 11.0), (60, 12.000001)]
+
+
+def test_fit_finds_start_and_drift():
+    # THE DEVICE'S CLOCK RUNS 100 PPM SLOW: 1 SECOND OF SAMPLES TAKES 1.0001 SECONDS.
+    points = [(position, 5.0 + 1.0001 * position / 48000) for position in range(0, 48000 * 600, 4800)]
+    start, scale = fit_timeline(48000, points)
+    assert start == pytest.approx(5.0, abs=1e-9)
+    assert scale == pytest.approx(1.0001, abs=1e-12)
+
+
+def test_fit_ignores_jitter():
+    jitter = random.Random(6)
+    points = [(frame, 2.0 + frame / 30 + jitter.uniform(-0.005, 0.005)) for frame in range(0, 30 * 600, 30)]
+    start, scale = fit_timeline(30, points)
+    assert start == pytest.approx(2.0, abs=0.002)
+    assert scale == pytest.approx(1.0, abs=1e-5)
+
+
+def test_fit_with_too_few_points():
+    assert fit_timeline(30, []) == (0.0, 1.0)
+    assert fit_timeline(30, [(60, 7.0)]) == (5.0, 1.0)
+    assert fit_timeline(30, [(60, 7.0), (60, 7.5)]) == (pytest.approx(5.25), 1.0)
+
+
+def test_drift_correction_filter(tmp_path):
+    video_file = str(tmp_path / "recording.mp4")
+    audio_file = str(tmp_path / "recording.wav")
+    write_sidecar(video_file, 30.0, [(frame, 10.0 + frame / 30) for frame in range(0, 30 * 60, 30)])
+    # THE AUDIO STARTED 0.25 SECONDS AFTER THE VIDEO AND ITS CLOCK RUNS 50 PPM SLOW.
+    write_sidecar(audio_file, 48000.0, [(sample, 10.25 + 1.00005 * sample / 48000)
+                                        for sample in range(0, 48000 * 60, 4800)])
+
+    audio_filter = drift_correction_filter(video_file, audio_file)
+    tempo, delay = audio_filter.split(",")
+    assert tempo.startswith("atempo=")
+    assert float(tempo[len("atempo="):]) == pytest.approx(1 / 1.00005, abs=1e-9)
+    assert delay == "adelay=250:all=1"
+
+
+def test_no_filter_without_drift_or_sidecars(tmp_path):
+    video_file = str(tmp_path / "recording.mp4")
+    audio_file = str(tmp_path / "recording.wav")
+    assert drift_correction_filter(video_file, audio_file) is None
+
+    write_sidecar(video_file, 30.0, [(frame, 10.0 + frame / 30) for frame in range(0, 300, 30)])
+    write_sidecar(audio_file, 48000.0, [(sample, 10.0 + sample / 48000) for sample in range(0, 480000, 4800)])
+    assert drift_correction_filter(video_file, audio_file) is None